@@ -0,0 +1,119 @@
+#!/usr/bin/python
+
+# Benchmark the memory used by the divisions of a task. The attributes of a task node, a file node and an edge
+# are divided, either by copying all of the attributes for each division, or by sharing the attributes between
+# the divisions (as is done when the graph is constructed), and the memory used by the attributes of all of the
+# divisions is reported. The peak memory and time taken by gkno to generate a makefile for the freebayes pipeline
+# divided into shards from a synthetic reference index are then reported, both with nodes added to the graph for
+# each division and with symbolic divisions (--symbolic-divisions). The makefiles generated in both cases are
+# checked to be the same (other than the random text added to intermediate filenames).
+#
+# Usage: python benchmarks/divisionMemory.py [number of divisions ...]
+
+from __future__ import print_function
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from copy import copy, deepcopy
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'src'))
+import gkno.graph as gr
+import gkno.toolConfiguration as tc
+
+# Build the attributes of a task node, a file node and an edge, as they are before the task is divided.
+def buildAttributes():
+  task      = gr.taskNodeAttributes()
+  task.tool = 'freebayes'
+
+  node                   = gr.dataNodeAttributes('file')
+  node.values            = ['$(OUTPATH)/sample.vcf']
+  node.isIntermediate    = True
+  node.description       = 'The output variant calls.'
+
+  edge                          = tc.argumentAttributes()
+  edge.longFormArgument         = '--vcf'
+  edge.shortFormArgument        = '-v'
+  edge.description              = 'Output VCF-format results to this file.'
+  edge.extensions               = ['vcf']
+  edge.constructionInstructions = {'method' : 'from tool argument', 'use argument' : '--fasta-reference', 'modify extension' : 'replace'}
+  return task, node, edge
+
+# Divide the attributes, setting the attributes that differ for each division. When sharing, a single copy of
+# the attributes is shared by all of the divisions.
+def divide(attributes, divisions, shared):
+  if shared: attributes = [copy(value) for value in attributes]
+  children = [attributes] if shared else []
+  for i in range(1, divisions):
+    child               = [gr.divisionAttributes(value) if shared else deepcopy(value) for value in attributes]
+    child[0].divisionID = i
+    child[0].isChild    = True
+    child[1].values     = [str('$(OUTPATH)/sample.' + str(i) + '.vcf')]
+    child[1].divisionID = i
+    children.append(child)
+  return children
+
+# Remove the random text and the fingerprint (which includes the command line) from a makefile.
+def normalise(makefile):
+  return re.sub('[A-Z0-9]{8}', '', re.sub('### gkno fingerprint: .*', '', makefile))
+
+# Determine the memory used by an object and all of the objects it refers to. Objects are only counted once, so
+# objects shared between divisions do not add to the total.
+def getSize(value, observed):
+  if id(value) in observed: return 0
+  observed.add(id(value))
+  size = sys.getsizeof(value)
+  if isinstance(value, dict): size += sum([getSize(key, observed) + getSize(item, observed) for key, item in value.items()])
+  elif isinstance(value, (list, tuple, set)): size += sum([getSize(item, observed) for item in value])
+  elif hasattr(value, '__dict__'): size += getSize(value.__dict__, observed)
+  elif hasattr(value, '__slots__'): size += sum([getSize(item, observed) for item in value.__getstate__().values()])
+  return size
+
+# Run gkno for the freebayes pipeline divided into shards and return the time taken, the peak resident set size
+# (in kilobytes) and the makefile. If no makefile was generated (e.g. gkno has not been built), return None.
+def runGkno(divisions, arguments):
+  directory = tempfile.mkdtemp()
+  try:
+    index = os.path.join(directory, 'reference.fa.fai')
+    with open(index, 'w') as filehandle:
+      for i in range(divisions): print('contig', i, '\t100000\t0\t60\t61', sep = '', file = filehandle)
+    command = [sys.executable, os.path.join(root, 'src', 'gkno.py'), 'freebayes', '-ps', 'test', '-dnl', '-dne', '-nsh', str(divisions), '-shr', index]
+    command.extend(arguments)
+    environment = dict(os.environ, GKNOCOMMITID = os.getenv('GKNOCOMMITID', 'benchmark'))
+    with open(os.devnull, 'w') as devnull:
+      start   = time.time()
+      process = subprocess.Popen(command, cwd = directory, env = environment, stdout = devnull, stderr = devnull)
+      pid, status, usage = os.wait4(process.pid, 0)
+      elapsed = time.time() - start
+    makefiles = [filename for filename in os.listdir(directory) if filename.endswith('.make')]
+    if not makefiles: return None
+    with open(os.path.join(directory, makefiles[0])) as filehandle: makefile = filehandle.read().replace(directory, '')
+    return elapsed, usage.ru_maxrss, makefile
+  finally: shutil.rmtree(directory)
+
+if __name__ == '__main__':
+  sizes = [int(size) for size in sys.argv[1:]] if len(sys.argv) > 1 else [100, 1000, 3000]
+
+  # Compare the memory used by the attributes of the divisions.
+  print('%10s%16s%16s' % ('divisions', 'copied (KB)', 'shared (KB)'))
+  for divisions in sizes:
+    attributes = buildAttributes()
+    copied     = getSize(divide(attributes, divisions, False), set(id(value) for value in attributes))
+    shared     = getSize(divide(attributes, divisions, True), set(id(value) for value in attributes))
+    print('%10d%16.1f%16.1f' % (divisions, copied / 1024., shared / 1024.))
+  print()
+
+  # Report the time and peak memory for gkno to construct the divided pipeline, with and without symbolic divisions.
+  print('%10s%16s%16s%16s%16s' % ('shards', 'time (s)', 'peak RSS (MB)', 'symbolic (s)', 'symbolic (MB)'))
+  for divisions in sizes:
+    result   = runGkno(divisions, [])
+    symbolic = runGkno(divisions, ['--symbolic-divisions'])
+    if not result or not symbolic: print('ERROR - gkno failed to generate a makefile (has gkno been built?)'); exit(1)
+    print('%10d%16.2f%16.1f%16.2f%16.1f' % (divisions, result[0], result[1] / 1024., symbolic[0], symbolic[1] / 1024.))
+    if normalise(result[2]) != normalise(symbolic[2]): print('ERROR - the makefiles generated with symbolic divisions differ'); exit(1)
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+
+# Benchmark checking that input files exist. A set of files spread across a number of directories is created, and
+# the time taken to find the missing files by checking each file in turn (as the files were previously checked) is
+# compared with the time taken by fileHandling.getMissingFiles. Network filesystems are simulated by adding a delay
+# to every call that reads file system metadata.
+#
+# Usage: python benchmarks/fileExistence.py [number of files] [number of directories] [latency (ms)]
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'src', 'gkno'))
+import fileHandling as fh
+
+# Add a delay to a function that reads file system metadata.
+def addLatency(function, latency):
+  def delayed(path):
+    time.sleep(latency)
+    return function(path)
+  return delayed
+
+# Create the files in the requested number of directories. Every tenth file is not created, so is missing.
+def createFiles(directory, numberOfFiles, numberOfDirectories):
+  filenames = []
+  for i in range(numberOfFiles):
+    path     = os.path.join(directory, 'directory' + str(i % numberOfDirectories))
+    filename = os.path.join(path, 'sample' + str(i) + '.bam')
+    if not os.path.exists(path): os.mkdir(path)
+    if i % 10: open(filename, 'w').close()
+    filenames.append(filename)
+  return filenames
+
+if __name__ == '__main__':
+  numberOfFiles       = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+  numberOfDirectories = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+  latency             = float(sys.argv[3]) / 1000. if len(sys.argv) > 3 else 0.002
+
+  directory = tempfile.mkdtemp()
+  try:
+    filenames      = createFiles(directory, numberOfFiles, numberOfDirectories)
+    os.listdir     = addLatency(os.listdir, latency)
+    os.path.exists = addLatency(os.path.exists, latency)
+
+    start       = time.time()
+    serial      = [filename for filename in filenames if not os.path.exists(filename)]
+    serialTime  = time.time() - start
+
+    print('%10s%14s%14s' % ('threads', 'serial (s)', 'batched (s)'))
+    for threads in [1, 4, 16]:
+      start   = time.time()
+      missing = fh.fileHandling.getMissingFiles(filenames, threads)
+      if [filename for filename in filenames if filename in missing] != serial: print('ERROR - the missing files are incorrect'); exit(1)
+      print('%10d%14.2f%14.2f' % (threads, serialTime, time.time() - start))
+  finally: shutil.rmtree(directory)
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+# Check the memory used by the pipeline graph. A large synthetic pipeline is built in which each task has option
+# nodes and an output file node, with edges holding a copy of the argument attributes (as when the graph is
+# constructed from the configuration files). The pipeline is built in a separate process and the increase in the
+# peak resident set size is reported for each size, along with the memory used per node and edge. If the memory
+# used per node and edge exceeds the limit, the check fails.
+#
+# Usage: python benchmarks/graphMemory.py [number of tasks ...]
+
+from __future__ import print_function
+
+import os
+import resource
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import gkno.graph as gr
+import gkno.pipelineConfiguration as pc
+import gkno.toolConfiguration as tc
+
+# The maximum memory (in bytes) allowed per node and edge in the graph.
+limit = 1536
+
+# Build a chain of tasks. Each task has four option nodes and outputs a file, which is used by the next task.
+def buildGraph(numberOfTasks):
+  graph          = gr.pipelineGraph('benchmark')
+  optionArgument = tc.argumentAttributes()
+  optionArgument.longFormArgument = '--option'
+  optionArgument.dataType         = 'integer'
+  fileArgument   = tc.argumentAttributes()
+  fileArgument.longFormArgument   = '--out'
+  fileArgument.isOutput           = True
+  fileArgument.extensions         = ['bam']
+  for task in range(numberOfTasks):
+    taskId          = str('task' + str(task))
+    attributes      = pc.taskAttributes()
+    attributes.task = taskId
+    attributes.tool = 'tool'
+    graph.graph.add_node(taskId, attributes = attributes)
+    for option in range(4):
+      optionId              = str(taskId + '.option' + str(option))
+      nodeAttributes        = gr.dataNodeAttributes('option')
+      nodeAttributes.values = [str(option)]
+      graph.graph.add_node(optionId, attributes = nodeAttributes)
+      graph.addEdge(optionId, taskId, optionArgument)
+    fileId                = str(taskId + '.out')
+    nodeAttributes        = gr.dataNodeAttributes('file')
+    nodeAttributes.values = [str('output' + str(task) + '.bam')]
+    graph.graph.add_node(fileId, attributes = nodeAttributes)
+    graph.addEdge(taskId, fileId, fileArgument)
+    if task > 0: graph.addEdge(str('task' + str(task - 1) + '.out'), taskId, fileArgument)
+  return graph
+
+# Build the graph and write the number of nodes and edges and the increase in the peak resident set size (in
+# kilobytes).
+def measure(numberOfTasks):
+  start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  graph = buildGraph(numberOfTasks)
+  print(graph.graph.number_of_nodes(), graph.graph.number_of_edges(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start)
+
+if __name__ == '__main__':
+
+  # When called with --measure, build a single graph in this process.
+  if len(sys.argv) == 3 and sys.argv[1] == '--measure': measure(int(sys.argv[2])); exit(0)
+  sizes = [int(size) for size in sys.argv[1:]] if len(sys.argv) > 1 else [10000, 50000]
+
+  print('%10s%12s%12s%16s%16s' % ('tasks', 'nodes', 'edges', 'peak RSS (MB)', 'bytes/element'))
+  for numberOfTasks in sizes:
+    nodes, edges, rss = [int(value) for value in subprocess.check_output([sys.executable, __file__, '--measure', str(numberOfTasks)]).split()]
+    perElement        = rss * 1024. / (nodes + edges)
+    print('%10d%12d%12d%16.1f%16.0f' % (numberOfTasks, nodes, edges, rss / 1024., perElement))
+    if perElement > limit: print('ERROR - memory per node and edge exceeds the limit of', limit, 'bytes'); exit(1)
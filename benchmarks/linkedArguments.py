@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+# Benchmark pairing the values of linked arguments (e.g. the two fastq files from paired end sequencing). Lists of
+# paired fastq files with a range of naming conventions are generated and the second list shuffled. The time taken to
+# reorder the second list by finding the most similar value for every value in the first list (as values were
+# previously reordered) is compared with the time taken by stringOperations.pairValues.
+#
+# Usage: python benchmarks/linkedArguments.py [number of pairs]
+
+from __future__ import print_function
+
+import os
+import random
+import sys
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'src', 'gkno'))
+import stringOperations as strOps
+
+# Generate the paired fastq files. The files are spread over a number of directories and use different conventions
+# for identifying the mates.
+def getPairs(numberOfPairs):
+  conventions = [('_R1', '_R2'), ('_1', '_2'), ('.1', '.2'), ('_read1', '_read2')]
+  first       = []
+  second      = []
+  for i in range(numberOfPairs):
+    path         = os.path.join('/data', 'run' + str(i % 7))
+    mate1, mate2 = conventions[i % len(conventions)]
+    sample       = 'sample' + str(i) + '_S' + str(i % 96 + 1) + '_L00' + str(i % 4 + 1)
+    first.append(os.path.join(path, sample + mate1 + '.fastq.gz'))
+    second.append(os.path.join(path, sample + mate2 + '.fastq.gz'))
+  return first, second
+
+if __name__ == '__main__':
+  numberOfPairs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+  first, second = getPairs(numberOfPairs)
+  shuffled      = list(second)
+  random.seed(0)
+  random.shuffle(shuffled)
+
+  start             = time.time()
+  similar           = [strOps.findMostSimilar(shuffled, value) for value in first]
+  similarTime       = time.time() - start
+  start             = time.time()
+  paired, ambiguous = strOps.pairValues(shuffled, first)
+  pairedTime        = time.time() - start
+
+  print('%10s%20s%16s%14s' % ('pairs', 'most similar (s)', 'paired (s)', 'ambiguous'))
+  print('%10d%20.2f%16.3f%14d' % (numberOfPairs, similarTime, pairedTime, len(ambiguous)))
+  if paired != second: print('ERROR - the values were not correctly paired'); exit(1)
+  if similar != second: print('WARNING - the most similar values were not correctly paired')
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+# Benchmark the values supplied in '.list' files. A list of BAM files is written and the memory used to hold the
+# values, either read into a list (as the values were previously stored) or held as a memory mapped list, is
+# reported, along with the time taken to read all of the values. The time and peak memory for gkno to generate a
+# makefile for the freebayes pipeline using the list of BAM files as input are then reported.
+#
+# Usage: python benchmarks/listValues.py [number of values ...]
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'src'))
+import gkno.listValues as lv
+
+# Write a list of BAM files.
+def writeList(directory, numberOfValues):
+  filename = os.path.join(directory, 'samples.list')
+  with open(filename, 'w') as filehandle:
+    for i in range(numberOfValues): print('/data/project/samples/sample', i, '/sample', i, '.sorted.bam', sep = '', file = filehandle)
+  return filename
+
+# Determine the memory used by the values.
+def getSize(values):
+  if isinstance(values, lv.listValues): return sys.getsizeof(values) + sys.getsizeof(values.__dict__) + sum([sys.getsizeof(value) for value in [values.starts, values.ends]])
+  return sys.getsizeof(values) + sum([sys.getsizeof(value) for value in values])
+
+# Run gkno for the freebayes pipeline using the list of BAM files as input and return the time taken and the peak
+# resident set size (in kilobytes). If no makefile was generated (e.g. gkno has not been built), return None.
+def runGkno(directory, filename):
+  command     = [sys.executable, os.path.join(root, 'src', 'gkno.py'), 'freebayes', '-ps', 'test', '-dnl', '-dne', '-i', filename]
+  environment = dict(os.environ, GKNOCOMMITID = os.getenv('GKNOCOMMITID', 'benchmark'))
+  with open(os.devnull, 'w') as devnull:
+    start   = time.time()
+    process = subprocess.Popen(command, cwd = directory, env = environment, stdout = devnull, stderr = devnull)
+    pid, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.time() - start
+  if not [filename for filename in os.listdir(directory) if filename.endswith('.make')]: return None
+  return elapsed, usage.ru_maxrss
+
+if __name__ == '__main__':
+  sizes = [int(size) for size in sys.argv[1:]] if len(sys.argv) > 1 else [10000, 100000]
+
+  print('%10s%14s%14s%14s%14s%14s%16s' % ('values', 'list (MB)', 'mapped (MB)', 'list (s)', 'mapped (s)', 'gkno (s)', 'peak RSS (MB)'))
+  for numberOfValues in sizes:
+    directory = tempfile.mkdtemp()
+    try:
+      filename = writeList(directory, numberOfValues)
+
+      # Read the values into a list, as the values were previously stored.
+      start    = time.time()
+      values   = [value.strip() for value in open(filename)]
+      listTime = time.time() - start
+      listSize = getSize(values)
+
+      # Index the list and read all of the values.
+      start      = time.time()
+      with open(filename) as filehandle: mapped = lv.listValues(filehandle)
+      if list(mapped) != values: print('ERROR - the values read from the memory mapped list are incorrect'); exit(1)
+      mappedTime = time.time() - start
+      mappedSize = getSize(mapped)
+
+      result = runGkno(directory, filename)
+      if not result: print('ERROR - gkno failed to generate a makefile (has gkno been built?)'); exit(1)
+      print('%10d%14.1f%14.1f%14.2f%14.2f%14.2f%16.1f' % (numberOfValues, listSize / 1048576., mappedSize / 1048576., listTime, mappedTime, result[0], result[1] / 1024.))
+    finally: shutil.rmtree(directory)
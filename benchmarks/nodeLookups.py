@@ -0,0 +1,69 @@
+#!/usr/bin/python
+
+# Benchmark finding nodes in the pipeline graph. A synthetic pipeline is built in which each task has input file,
+# output file and option nodes, and the time taken by a pass over all tasks that looks up the nodes of each task,
+# along with the file and option nodes in the graph, is reported. The results, and their order, are checked against a
+# scan of every node in the graph.
+#
+# Usage: python benchmarks/nodeLookups.py [number of tasks ...]
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import gkno.graph as gr
+
+# Build a chain of tasks. Each task has two option nodes and outputs two files, one of which is used by the next task.
+def buildGraph(numberOfTasks):
+  graph = gr.pipelineGraph('benchmark')
+  for task in range(numberOfTasks):
+    taskId = str('task' + str(task))
+    graph.graph.add_node(taskId, attributes = gr.taskNodeAttributes())
+    for option in range(2):
+      optionId = str(taskId + '.option' + str(option))
+      graph.graph.add_node(optionId, attributes = gr.dataNodeAttributes('option'))
+      graph.graph.add_edge(optionId, taskId)
+    for output in range(2):
+      fileId = str(taskId + '.output' + str(output))
+      graph.graph.add_node(fileId, attributes = gr.dataNodeAttributes('file'))
+      graph.graph.add_edge(taskId, fileId)
+    if task > 0: graph.graph.add_edge(str('task' + str(task - 1) + '.output0'), taskId)
+  return graph
+
+# Find the nodes of a type by examining every node in the graph.
+def scanNodes(graph, nodeType):
+  return [nodeId for nodeId in graph.graph.nodes() if graph.getGraphNodeAttribute(nodeId, 'nodeType') == nodeType]
+
+# Perform a pass over all tasks finding the nodes for each task, then find the file and option nodes in the graph.
+def lookupPass(graph, tasks):
+  total = 0
+  for task in tasks: total += len(graph.getInputFileNodes(task)) + len(graph.getOutputFileNodes(task)) + len(graph.getOptionNodes(task))
+  return total + len(graph.getNodes('file')) + len(graph.getNodes('option'))
+
+if __name__ == '__main__':
+  sizes = [int(size) for size in sys.argv[1:]] if len(sys.argv) > 1 else [100, 1000, 10000]
+
+  print('%10s%14s%14s' % ('tasks', 'first (s)', 'repeat (s)'))
+  for numberOfTasks in sizes:
+    graph = buildGraph(numberOfTasks)
+    tasks = graph.getNodes('task')
+
+    # Check the indexed lookups against a scan of the graph, including the order of the nodes.
+    for nodeType in ['task', 'file', 'option']:
+      if graph.getNodes(nodeType) != scanNodes(graph, nodeType): print('ERROR - incorrect', nodeType, 'nodes'); exit(1)
+
+    # Time the first pass over the tasks (populating the stored task nodes) and a repeated pass.
+    start  = time.time()
+    lookupPass(graph, tasks)
+    first  = time.time() - start
+    start  = time.time()
+    lookupPass(graph, tasks)
+    repeat = time.time() - start
+
+    # Remove a file node and check that the nodes of the task using it are updated.
+    graph.graph.remove_node('task0.output0')
+    if 'task0.output0' in graph.getInputFileNodes('task1') or 'task0.output0' in graph.getNodes('file'): print('ERROR - removed node found'); exit(1)
+    print('%10d%14.4f%14.4f' % (numberOfTasks, first, repeat))
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+
+# Benchmark downloading a resource tarball from a local HTTP server standing in for the resource server. The server
+# supports range requests and can be made to drop connections part way through a download. The time taken and the
+# additional disk space used to download and extract the tarball, first by downloading the tarball and then extracting
+# it (as resources were previously fetched) and then by extracting the files as the tarball is streamed, are reported.
+# The streamed download is then repeated with dropped connections, and with an incorrect checksum, to check that the
+# download resumes and that an incorrect tarball is rejected.
+#
+# Usage: python benchmarks/resourceDownload.py [tarball size (MB)]
+
+from __future__ import print_function
+
+import BaseHTTPServer
+import SocketServer
+import hashlib
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import urllib
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'src', 'gkno'))
+import resourceDownload as rd
+
+# Define an HTTP server that serves a single file, supporting range requests. If requested, the connection is closed
+# after a number of bytes have been sent for the given number of requests.
+class server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  daemon_threads = True
+  filename       = None
+  dropAfter      = None
+  drops          = 0
+  requests       = []
+
+class handler(BaseHTTPServer.BaseHTTPRequestHandler):
+  def do_GET(self):
+    size  = os.path.getsize(self.server.filename)
+    start = int(self.headers['Range'].split('=')[1].split('-')[0]) if self.headers.get('Range') else 0
+    self.server.requests.append(start)
+    self.send_response(206 if start else 200)
+    self.send_header('Content-Length', str(size - start))
+    if start: self.send_header('Content-Range', 'bytes ' + str(start) + '-' + str(size - 1) + '/' + str(size))
+    self.end_headers()
+
+    # Send the file, dropping the connection if required.
+    limit = None
+    if self.server.drops:
+      self.server.drops -= 1
+      limit              = self.server.dropAfter
+    with open(self.server.filename, 'rb') as filehandle:
+      filehandle.seek(start)
+      sent = 0
+      while True:
+        data = filehandle.read(65536)
+        if not data: break
+        if limit is not None and sent + len(data) > limit:
+          self.wfile.write(data[:limit - sent])
+          self.wfile.flush()
+          self.connection.shutdown(2)
+          return
+        self.wfile.write(data)
+        sent += len(data)
+
+  def log_message(self, *arguments): pass
+
+# Write a tarball containing a release directory with files of random data and return the sha256 checksum.
+def writeTarball(directory, size):
+  release = os.path.join(directory, 'source', 'release')
+  os.makedirs(release)
+  for i in range(4):
+    with open(os.path.join(release, 'file' + str(i)), 'wb') as filehandle: filehandle.write(os.urandom(size / 4))
+  filename = os.path.join(directory, 'release.tar.gz')
+  tar      = tarfile.open(filename, 'w:gz')
+  tar.add(release, 'release')
+  tar.close()
+  return filename, hashlib.sha256(open(filename, 'rb').read()).hexdigest()
+
+# Return the size of the files in a directory.
+def getDirectorySize(directory):
+  return sum(os.path.getsize(os.path.join(path, name)) for path, directories, names in os.walk(directory) for name in names)
+
+if __name__ == '__main__':
+  size      = int(sys.argv[1]) * 1048576 if len(sys.argv) > 1 else 64 * 1048576
+  directory = tempfile.mkdtemp()
+  try:
+    filename, checksum = writeTarball(directory, size)
+    httpServer         = server(('127.0.0.1', 0), handler)
+    httpServer.filename = filename
+    thread             = threading.Thread(target = httpServer.serve_forever)
+    thread.daemon      = True
+    thread.start()
+    url = 'http://127.0.0.1:' + str(httpServer.server_address[1]) + '/release.tar.gz'
+    rd.resourceDownload.retries = 3
+    print('%-34s%12s%20s' % ('method', 'time (s)', 'peak extra (MB)'))
+
+    # Download the tarball and then extract it.
+    target = os.path.join(directory, 'downloaded')
+    os.mkdir(target)
+    start = time.time()
+    tarball, headers = urllib.urlretrieve(url, os.path.join(target, 'release.tar.gz'))
+    tar = tarfile.open(tarball)
+    tar.extractall(target)
+    tar.close()
+    peak = getDirectorySize(target)
+    os.remove(tarball)
+    print('%-34s%12.2f%20.1f' % ('download then extract', time.time() - start, (peak - getDirectorySize(target)) / 1048576.))
+
+    # Extract the tarball as it is downloaded.
+    target = os.path.join(directory, 'streamed')
+    os.mkdir(target)
+    start = time.time()
+    error = rd.resourceDownload(url, {'sha256': checksum}).extract(target)
+    if error: print('ERROR - the streamed download failed:', error); exit(1)
+    print('%-34s%12.2f%20.1f' % ('streamed', time.time() - start, 0.))
+
+    # Extract the tarball with two dropped connections.
+    target = os.path.join(directory, 'resumed')
+    os.mkdir(target)
+    httpServer.dropAfter, httpServer.drops, httpServer.requests = size / 3, 2, []
+    start = time.time()
+    error = rd.resourceDownload(url, {'sha256': checksum}).extract(target)
+    if error: print('ERROR - the resumed download failed:', error); exit(1)
+    print('%-34s%12.2f%20.1f' % ('streamed, 2 dropped connections', time.time() - start, 0.))
+    if len(httpServer.requests) != 3 or not httpServer.requests[2]: print('ERROR - the download was not resumed'); exit(1)
+    for name in os.listdir(os.path.join(directory, 'source', 'release')):
+      if open(os.path.join(directory, 'source', 'release', name), 'rb').read() != open(os.path.join(target, 'release', name), 'rb').read():
+        print('ERROR - the resumed download is incorrect'); exit(1)
+
+    # Check that a tarball with an incorrect checksum is rejected and that no files are extracted.
+    target = os.path.join(directory, 'rejected')
+    os.mkdir(target)
+    error = rd.resourceDownload(url, {'sha256': '0' * 64}).extract(target)
+    if not error or os.listdir(target): print('ERROR - the tarball with an incorrect checksum was not rejected'); exit(1)
+    httpServer.shutdown()
+  finally: shutil.rmtree(directory)
@@ -0,0 +1,330 @@
+#!/usr/bin/python
+
+# Benchmark how gkno scales with the size and structure of a pipeline. Synthetic tool and pipeline configuration files
+# are generated, described by the number of tasks, the depth of nested pipelines, the number of shared graph nodes, the
+# number of streamed connections, the number of greedy tasks, the number of divisions (shards) and the number of input
+# files. The generated configuration files are written to a sandbox copy of gkno (the synthetic tools have no
+# executable, so the real tools do not need to be installed), and gkno is run for each pipeline with the stage profile
+# (--gkno-profile), so that the time spent in every stage of gkno is recorded, along with the peak memory and the size
+# of the generated makefile.
+#
+# The results can be recorded as a baseline (--record), and are otherwise compared with the baseline. A benchmark that
+# is slower than the baseline by more than the threshold (along with the stages that have slowed), or a makefile that
+# differs in size, is reported as a regression.
+# The times depend on the machine, so the baseline should be recorded on the machine used for the comparison.
+#
+# Usage: python benchmarks/syntheticPipelines.py [--record] [--baseline file] [--threshold fraction] [--repeats n]
+#                                                [--keep] [benchmark ...]
+#        python benchmarks/syntheticPipelines.py --tasks n [--depth n] [--shared n] [--streams n] [--greedy n]
+#                                                [--divisions n] [--inputs n]
+
+from __future__ import print_function
+
+import argparse
+import compileall
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# The benchmarks in the suite. Each benchmark exercises one feature of the pipeline, other than the last, which
+# combines them.
+benchmarks = [
+  ('chain',    {'tasks' : 500}),
+  ('nested',   {'tasks' : 20, 'depth' : 10}),
+  ('shared',   {'tasks' : 500, 'shared' : 100}),
+  ('streamed', {'tasks' : 500, 'streams' : 200}),
+  ('greedy',   {'tasks' : 100, 'greedy' : 20, 'inputs' : 2000}),
+  ('divided',  {'tasks' : 20, 'divisions' : 2000}),
+  ('combined', {'tasks' : 50, 'depth' : 3, 'shared' : 10, 'streams' : 10, 'greedy' : 3, 'divisions' : 200, 'inputs' : 20})
+]
+
+# The parameters describing a pipeline, and their default values.
+defaults = {'tasks' : 10, 'depth' : 0, 'shared' : 0, 'streams' : 0, 'greedy' : 0, 'divisions' : 1, 'inputs' : 1}
+
+# The default baseline file, the fraction by which a stage can be slower than the baseline before it is considered a
+# regression and the minimum increase (in seconds) that is considered a regression, so that noise in short stages is
+# ignored.
+baselineFile  = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'syntheticPipelines.json')
+threshold     = 0.25
+minimumChange = 0.05
+
+# The commit written to the makefile header. A fixed value is used, so that the size of the makefile does not depend
+# on the environment.
+commitId = 'benchmark'
+
+# Define an input or output argument for a synthetic tool.
+def getFileArgument(description, longForm, shortForm, streamInstruction):
+  return {'description' : description, 'long form argument' : longForm, 'short form argument' : shortForm, 'command line argument' : longForm,
+  'required' : True, 'data type' : 'string', 'extensions' : ['dat'], streamInstruction : {'default' : {'argument' : 'omit', 'value' : 'omit'}}}
+
+# Define an option for a synthetic tool.
+def getOption(description, longForm, shortForm, dataType):
+  return {'description' : description, 'long form argument' : longForm, 'short form argument' : shortForm, 'command line argument' : longForm,
+  'required' : False, 'data type' : dataType}
+
+# Generate the synthetic tools. The process tool reads and writes a single file, and the merge tool combines multiple
+# files. Both tools can read from and write to a stream, and neither has an executable that needs to be installed.
+def getTools():
+  tools = {}
+  for tool, text, isMerge in [('synthetic-process', '_p', False), ('synthetic-merge', '_m', True)]:
+    inputArgument  = getFileArgument('The input file.', '--in', '-i', 'if input is stream')
+    outputArgument = getFileArgument('The output file.', '--out', '-o', 'if output to stream')
+    outputArgument['construct filename'] = {'method' : 'from tool argument', 'use argument' : '--in', 'modify extension' : 'replace',
+    'modify text' : [{'add text' : [text]}]}
+    if isMerge: inputArgument['allow multiple values'] = True
+    options = [getOption('The region to process.', '--region', '-rg', 'string'), getOption('The level.', '--level', '-l', 'integer'),
+    getOption('The label.', '--label', '-b', 'string')]
+    tools[tool] = {'id' : tool, 'configuration type' : 'tool', 'description' : 'A synthetic tool for benchmarking gkno.', 'categories' : ['Benchmark'],
+    'tools' : [], 'path' : 'none', 'executable' : tool, 'arguments' : {'Inputs' : [inputArgument], 'Outputs' : [outputArgument], 'Options' : options},
+    'argument order' : ['--in', '--out', '--region', '--level', '--label'],
+    'parameter sets' : [{'id' : 'default', 'description' : 'The default parameter set.', 'data' : []}]}
+  return tools
+
+# Generate the pipelines for a benchmark. The innermost pipeline is a chain of tasks and each additional level of nesting
+# adds a pipeline that runs the pipeline it contains, followed by its own chain of tasks. The first task of the
+# innermost pipeline is divided into shards, streamed connections and greedy tasks are spread evenly along each chain,
+# and the --level option of the tasks is shared between the shared graph nodes. Return the pipelines, keyed by name,
+# and the name of the outermost pipeline.
+def getPipelines(name, parameters):
+  pipelines = {}
+  for level in range(parameters['depth'] + 1):
+    pipeline  = 'synthetic-' + name + ('-' + str(level) if parameters['depth'] else '')
+    tasks     = []
+    unique    = []
+    connect   = []
+    data      = []
+
+    # The ids of the pipeline input and output nodes include the level, as configuration node ids pointing to nodes in
+    # nested pipelines must be unique.
+    inputId  = 'input-' + str(level)
+    outputId = 'output-' + str(level)
+
+    # Include the nested pipeline as the first task, and connect its output to the first task of the chain.
+    previous = None
+    if level:
+      tasks.append({'task' : 'nested', 'pipeline' : 'synthetic-' + name + '-' + str(level - 1)})
+      unique.append({'id' : inputId, 'task' : 'nested', 'node id' : 'input-' + str(level - 1)})
+      previous = 'nested.output-' + str(level - 1)
+
+    # Determine which tasks are greedy and which tasks output to a stream. If the innermost pipeline is divided, the
+    # divisions are consolidated half way along the chain. As in the freebayes pipelines, the first greedy task is then
+    # the divided task, and the remaining greedy tasks follow the consolidation. Tasks do not output to a stream if they
+    # are followed by a greedy or consolidating task.
+    numberOfTasks = parameters['tasks']
+    consolidate   = set([numberOfTasks // 2]) if parameters['divisions'] > 1 and not level else set()
+    if consolidate and parameters['greedy']: greedy = set([0] + getSpread(numberOfTasks - 1, parameters['greedy'] - 1, max(consolidate) + 1))
+    else: greedy = set(getSpread(numberOfTasks - 1, parameters['greedy'], 1))
+    streams       = set(getSpread(numberOfTasks - 1, parameters['streams'], 0)) - set([i - 1 for i in greedy | consolidate])
+    for i in range(numberOfTasks):
+      task       = getTaskName(i)
+      attributes = {'task' : task, 'tool' : 'synthetic-merge' if i in greedy | consolidate else 'synthetic-process'}
+      if i in greedy:
+        attributes['greedy task']     = True
+        attributes['greedy argument'] = '--in'
+      if i in consolidate: attributes['consolidate divisions'] = True
+      if i in streams: attributes['output to stream'] = True
+      if (i - 1) in streams: attributes['input is stream'] = True
+      if i == 0 and not level: attributes['shard argument'] = '--region'
+      tasks.append(attributes)
+
+      # Connect the task to the output of the previous task (or the pipeline input).
+      if not previous: unique.append({'id' : inputId, 'task' : task, 'task argument' : '--in'})
+      else: connect.append({'source' : previous, 'target' : task, 'argument' : '--in'})
+      outputNode = outputId if i == numberOfTasks - 1 else task + '-output'
+      unique.append({'id' : outputNode, 'task' : task, 'task argument' : '--out'})
+      previous = outputNode
+
+    # Share the --level option of the tasks between the shared graph nodes.
+    shared = []
+    for j in range(parameters['shared']):
+      sharing = [{'task' : getTaskName(i), 'task argument' : '--level'} for i in range(j, numberOfTasks, parameters['shared'])]
+      if not sharing: continue
+      shared.append({'id' : 'level-' + str(j + 1), 'arguments sharing node' : sharing})
+      data.append({'id' : 'level-' + str(j + 1), 'node' : 'level-' + str(j + 1), 'values' : [j + 1]})
+
+    # Define the pipeline. The output of the pipeline is the output of the final task.
+    arguments = {'Inputs' : [{'description' : 'The input file.', 'long form argument' : '--in', 'short form argument' : '-i', 'node id' : inputId}],
+    'Outputs' : [{'description' : 'The output file.', 'long form argument' : '--out', 'short form argument' : '-o', 'node id' : outputId}]}
+    pipelines[pipeline] = {'id' : pipeline, 'configuration type' : 'pipeline', 'description' : 'A synthetic pipeline for benchmarking gkno.',
+    'categories' : ['Benchmark'], 'pipeline tasks' : tasks, 'arguments' : arguments, 'unique graph nodes' : unique, 'shared graph nodes' : shared,
+    'connect nodes' : connect, 'parameter sets' : [{'id' : 'default', 'description' : 'The default parameter set.', 'data' : data}]}
+
+  # Return the pipelines and the outermost pipeline.
+  return pipelines, pipeline
+
+# Return the name of a task. The name does not end in a number, since the tasks created for the divisions of a task
+# are named by appending the division to the task name (e.g. the second division of task-1 would otherwise be named
+# task-12).
+def getTaskName(index):
+  return 'task-' + str(index + 1) + '-synthetic'
+
+# Spread a number of values evenly over the indices from the start to the end (inclusive).
+def getSpread(end, number, start):
+  if number <= 0 or end < start: return []
+  number = min(number, end - start + 1)
+  return sorted(set([start + int(i * (end - start + 1) / number) for i in range(number)]))
+
+# Create a sandbox copy of gkno, containing the source and the gkno configuration file, but only the synthetic tools and
+# pipelines. The sandbox is marked as built, with no compiled tools or resources, and the source is compiled, so that
+# the first run of gkno is not slowed by compiling it.
+def createSandbox(directory, tools, pipelines):
+  shutil.copytree(os.path.join(root, 'src'), os.path.join(directory, 'src'), ignore = shutil.ignore_patterns('*.pyc', 'user_settings.json'))
+  for path in ['config_files/tools', 'config_files/pipes', 'resources', 'tools']: os.makedirs(os.path.join(directory, path))
+  shutil.copy(os.path.join(root, 'config_files', 'tools', 'gknoConfiguration.json'), os.path.join(directory, 'config_files', 'tools'))
+  compileall.compile_dir(os.path.join(directory, 'src'), quiet = True)
+  settings = {'isBuilt' : True, 'resources' : {}, 'compiled tools' : []}
+  with open(os.path.join(directory, 'src', 'gkno', 'conf', 'user_settings.json'), 'w') as filehandle: json.dump(settings, filehandle)
+  for path, configurations in [('tools', tools), ('pipes', pipelines)]:
+    for name, configuration in configurations.items():
+      with open(os.path.join(directory, 'config_files', path, name + '.json'), 'w') as filehandle: json.dump(configuration, filehandle, indent = 2)
+
+# Run gkno for a pipeline in the sandbox and return the stage profile (with the CPU time for each stage), along with
+# the size of the makefile (excluding the paths of the sandbox and the run directory). If gkno fails, return None and the output from gkno.
+def runGkno(sandbox, pipeline, parameters):
+  directory = tempfile.mkdtemp(dir = sandbox)
+  try:
+    inputs = []
+    for i in range(parameters['inputs']):
+      inputs.append('sample' + str(i + 1) + '.dat')
+      open(os.path.join(directory, inputs[-1]), 'w').close()
+    command = [sys.executable, os.path.join(sandbox, 'src', 'gkno.py'), pipeline, '-dnl', '-dne', '-gp', 'profile.json']
+    for value in inputs: command.extend(['--in', value])
+    if parameters['divisions'] > 1:
+      with open(os.path.join(directory, 'reference.fa.fai'), 'w') as filehandle:
+        for i in range(parameters['divisions']): print('contig', i + 1, '\t100000\t0\t60\t61', sep = '', file = filehandle)
+      command.extend(['-nsh', str(parameters['divisions']), '-shr', 'reference.fa.fai'])
+    environment = dict(os.environ, GKNOCOMMITID = commitId)
+    process     = subprocess.Popen(command, cwd = directory, env = environment, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    output      = process.communicate()[0]
+    makefiles   = [filename for filename in os.listdir(directory) if filename.endswith('.make')]
+    if process.returncode != 0 or not makefiles: return None, output
+
+    # Read the profile and the makefile.
+    with open(os.path.join(directory, 'profile.json')) as filehandle: profile = json.load(filehandle)
+    with open(os.path.join(directory, makefiles[0])) as filehandle: makefile = filehandle.read()
+
+    # The makefile size excludes the paths of the run directory and the sandbox, since these differ between runs.
+    makefile = makefile.replace(directory, '').replace(sandbox, '')
+    result = {'wallTime' : profile['wallTime'], 'cpuTime' : profile['cpuTime'], 'peakMemory' : profile['peakMemory'],
+    'makefileBytes' : len(makefile), 'makefileLines' : makefile.count('\n'),
+    'stages' : dict([(stage['name'], stage['cpuTime']) for stage in profile['stages']]),
+    'order' : [stage['name'] for stage in profile['stages']]}
+    return result, output
+  finally: shutil.rmtree(directory)
+
+# Run a benchmark the requested number of times, keeping the fastest time for each stage.
+def runBenchmark(sandbox, pipeline, parameters, repeats):
+  best = None
+  for i in range(repeats):
+    result, output = runGkno(sandbox, pipeline, parameters)
+    if not result: print(output); print('ERROR - gkno failed to generate a makefile for pipeline', pipeline); exit(1)
+    if not best: best = result; continue
+    best['wallTime']   = min(best['wallTime'], result['wallTime'])
+    best['cpuTime']    = min(best['cpuTime'], result['cpuTime'])
+    best['peakMemory'] = min(best['peakMemory'], result['peakMemory'])
+    for stage, time in result['stages'].items(): best['stages'][stage] = min(best['stages'].get(stage, time), time)
+  return best
+
+# Compare the results of a benchmark with the baseline and return a list of regressions. The CPU time is compared, as
+# it is less affected than the wall time by other processes. Time is also moved between stages (e.g. by garbage
+# collection), so the benchmark has only regressed if the total time has increased, in which case the stages that have
+# slowed are also listed.
+def compare(name, result, baseline):
+  regressions = []
+  if isSlower(result['cpuTime'], baseline['cpuTime']):
+    regressions.append(name + ': took ' + '%.3fs' % result['cpuTime'] + ' (baseline ' + '%.3fs' % baseline['cpuTime'] + ')')
+    for stage in result['order']:
+      if stage in baseline['stages'] and isSlower(result['stages'][stage], baseline['stages'][stage]):
+        regressions.append(name + ': ' + stage + ' took ' + '%.3fs' % result['stages'][stage] + ' (baseline ' + '%.3fs' % baseline['stages'][stage] + ')')
+  if result['makefileBytes'] != baseline['makefileBytes']:
+    regressions.append(name + ': the makefile is ' + str(result['makefileBytes']) + ' bytes (baseline ' + str(baseline['makefileBytes']) + ' bytes)')
+  return regressions
+
+# Determine if a time is slower than the baseline time.
+def isSlower(time, baselineTime):
+  return time - baselineTime > max(threshold * baselineTime, minimumChange)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Benchmark gkno with synthetic pipelines.')
+  parser.add_argument('benchmarks', nargs = '*', help = 'The benchmarks to run (default: all of the benchmarks in the suite).')
+  parser.add_argument('--record', action = 'store_true', help = 'Record the results as the baseline.')
+  parser.add_argument('--baseline', default = baselineFile, help = 'The baseline file.')
+  parser.add_argument('--threshold', type = float, default = threshold, help = 'The fraction by which a stage can be slower than the baseline.')
+  parser.add_argument('--repeats', type = int, default = 3, help = 'The number of times to run each benchmark.')
+  parser.add_argument('--keep', action = 'store_true', help = 'Keep the sandbox containing the generated configuration files.')
+  for parameter in sorted(defaults): parser.add_argument('--' + parameter, type = int, help = 'The ' + parameter + ' of a custom benchmark.')
+  options   = parser.parse_args()
+  threshold = options.threshold
+
+  # Determine the benchmarks to run. If any parameters are given, a single custom benchmark is run.
+  custom = dict([(parameter, getattr(options, parameter)) for parameter in defaults if getattr(options, parameter) is not None])
+  if custom: selected = [('custom', custom)]
+  else:
+    names    = [name for name, parameters in benchmarks]
+    selected = [benchmark for benchmark in benchmarks if not options.benchmarks or benchmark[0] in options.benchmarks]
+    for name in options.benchmarks:
+      if name not in names: print('ERROR - unknown benchmark', name, '(available:', ', '.join(names) + ')'); exit(1)
+  selected = [(name, dict(defaults, **parameters)) for name, parameters in selected]
+
+  # Read the baseline.
+  baseline = {}
+  if os.path.exists(options.baseline):
+    with open(options.baseline) as filehandle: baseline = json.load(filehandle)
+
+  # Generate the configuration files and create the sandbox.
+  sandbox   = tempfile.mkdtemp()
+  pipelines = {}
+  outermost = {}
+  for name, parameters in selected:
+    configurations, outermost[name] = getPipelines(name, parameters)
+    pipelines.update(configurations)
+  createSandbox(sandbox, getTools(), pipelines)
+
+  # Run the benchmarks.
+  results     = {}
+  regressions = []
+  try:
+    print('%10s%8s%8s%8s%8s%8s%11s%8s%12s%12s%16s%16s%10s' % ('benchmark', 'tasks', 'depth', 'shared', 'streams', 'greedy', 'divisions',
+    'inputs', 'wall (s)', 'CPU (s)', 'peak RSS (MB)', 'makefile (KB)', 'baseline'))
+    for name, parameters in selected:
+      result = runBenchmark(sandbox, outermost[name], parameters, options.repeats)
+      result['parameters'] = parameters
+      results[name]        = result
+
+      # Compare the results with the baseline, if the baseline was recorded for the same parameters.
+      status = 'none'
+      if name in baseline and baseline[name]['parameters'] == parameters:
+        benchmarkRegressions = compare(name, result, baseline[name])
+        regressions.extend(benchmarkRegressions)
+        status = 'REGRESSED' if benchmarkRegressions else 'ok'
+      print('%10s%8d%8d%8d%8d%8d%11d%8d%12.2f%12.2f%16.1f%16.1f%10s' % (name, parameters['tasks'], parameters['depth'], parameters['shared'],
+      parameters['streams'], parameters['greedy'], parameters['divisions'], parameters['inputs'], result['wallTime'], result['cpuTime'],
+      result['peakMemory'] / 1024., result['makefileBytes'] / 1024., status))
+  finally:
+    if options.keep: print('Sandbox:', sandbox)
+    else: shutil.rmtree(sandbox)
+
+  # Write the CPU time spent in each stage.
+  stages = []
+  for name, parameters in selected:
+    for stage in results[name]['order']:
+      if stage not in stages: stages.append(stage)
+  print()
+  print('%-34s' % 'stage (CPU s)' + ''.join(['%10s' % name for name, parameters in selected]))
+  for stage in stages: print('%-34s' % stage + ''.join(['%10.3f' % results[name]['stages'].get(stage, 0.) for name, parameters in selected]))
+
+  # Record the baseline, or report any regressions.
+  if options.record:
+    baseline.update(results)
+    with open(options.baseline, 'w') as filehandle: json.dump(baseline, filehandle, indent = 2, separators = (',', ': '), sort_keys = True)
+    print()
+    print('Baseline written to', options.baseline)
+  elif regressions:
+    print()
+    for regression in regressions: print('REGRESSION -', regression)
+    exit(1)
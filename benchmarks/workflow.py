@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+# Benchmark the generation of the workflow for synthetic pipelines. Pipelines of different shapes and
+# sizes are built directly in a pipeline graph (each task is connected to its successor tasks through a
+# file node) and the time taken to order the tasks is reported.
+#
+# Usage: python benchmarks/workflow.py [number of tasks ...]
+
+from __future__ import print_function
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import gkno.graph as gr
+
+# Build a graph containing the tasks and the connections between them. The connections are a list of
+# (task, successor task) pairs.
+def buildGraph(numberOfTasks, connections):
+  graph = gr.pipelineGraph('benchmark')
+  for task in range(numberOfTasks): graph.graph.add_node(str('task' + str(task)), attributes = gr.taskNodeAttributes())
+  for counter, (task, successor) in enumerate(connections):
+    fileNodeId = str('file' + str(counter))
+    graph.graph.add_node(fileNodeId, attributes = gr.dataNodeAttributes('file'))
+    graph.graph.add_edge(str('task' + str(task)), fileNodeId)
+    graph.graph.add_edge(fileNodeId, str('task' + str(successor)))
+  return graph
+
+# A linear chain of tasks, e.g. a pipeline where each task streams into the next.
+def chain(numberOfTasks):
+  return [(task, task + 1) for task in range(numberOfTasks - 1)]
+
+# A set of independent branches (e.g. per-region tasks) that merge into a final task.
+def scatterGather(numberOfTasks):
+  connections = []
+  for task in range(1, numberOfTasks - 1): connections.extend([(0, task), (task, numberOfTasks - 1)])
+  return connections
+
+# A random layered graph, where each task takes inputs from up to three tasks in earlier layers.
+def layered(numberOfTasks):
+  random.seed(numberOfTasks)
+  connections = []
+  for task in range(1, numberOfTasks):
+    for predecessor in set(random.randint(max(0, task - 50), task - 1) for i in range(random.randint(1, 3))): connections.append((predecessor, task))
+  return connections
+
+# Check that every task appears in the workflow after all of its predecessor tasks.
+def isValidWorkflow(workflow, numberOfTasks, connections):
+  position = dict((task, counter) for counter, task in enumerate(workflow))
+  if len(workflow) != numberOfTasks or len(position) != numberOfTasks: return False
+  for task, successor in connections:
+    if position[str('task' + str(task))] > position[str('task' + str(successor))]: return False
+  return True
+
+if __name__ == '__main__':
+  sizes = [int(size) for size in sys.argv[1:]] if len(sys.argv) > 1 else [10, 100, 1000, 10000]
+
+  print('%-16s%10s%14s' % ('shape', 'tasks', 'time (s)'))
+  for shape in [chain, scatterGather, layered]:
+    for numberOfTasks in sizes:
+      connections = shape(numberOfTasks)
+      graph       = buildGraph(numberOfTasks, connections)
+
+      start    = time.time()
+      workflow = graph.generateWorkflow()
+      duration = time.time() - start
+
+      if not isValidWorkflow(workflow, numberOfTasks, connections): print('ERROR - invalid workflow for', shape.__name__, numberOfTasks); exit(1)
+      print('%-16s%10d%14.4f' % (shape.__name__, numberOfTasks, duration))
@@ -7,29 +7,15 @@ import getpass
 import subprocess
 import sys
 
-import gkno.executables as exe
 import gkno.adminUtils as au
 import gkno.adminErrors as adminErrors
-import gkno.commandLineErrors as clErrors
-import gkno.arguments as ag
 import gkno.commandLine as cl
-import gkno.constructFilenames as construct
-import gkno.dataConsistency as dc
-import gkno.debug as debug
-import gkno.executionStructure as es
-import gkno.evaluateCommands as ec
+import gkno.configurationCache as cc
 import gkno.fileHandling as fh
 import gkno.gknoConfiguration as gc
-import gkno.graph as gr
 import gkno.helpInformation as hp
-import gkno.makefiles as mk
-import gkno.plotGraph as pg
-import gkno.parameterSets as ps
-import gkno.pipelineConfiguration as pc
-import gkno.superpipeline as sp
-import gkno.toolConfiguration as tc
-import gkno.tracking as tracking
-import gkno.web as w
+import gkno.profileReport as pr
+import gkno.stageProfile as stp
 import gkno.writeToScreen as write
 
 __author__ = "Alistair Ward"
@@ -38,18 +24,15 @@ __date__ = "January 2017"
 
 def main():
 
+  # Record the time and memory used by each stage of gkno, if requested.
+  timing = stp.stageProfile()
+
   # Define a class for processing the command line.
   command = cl.commandLine()
 
   # Define a help class.
   gknoHelp = hp.helpInformation(os.getenv('GKNOCOMMITID'), __date__, __version__)
 
-  # Define a plotting class for drawing the graph.
-  plot = pg.plotGraph()
-
-  #Define an object to hold information for creating web content.
-  web = w.webContent()
-
   # Define the source paths of all the gkno machinery.
   sourcePath                     = os.path.abspath(sys.argv[0])[0:os.path.abspath(sys.argv[0]).rfind('/src/gkno.py')]
   configurationFilesPath         = sourcePath + '/config_files'
@@ -57,6 +40,7 @@ def main():
   toolConfigurationFilesPath     = sourcePath + '/config_files/tools'
   resourcesPath                  = sourcePath + '/resources'
   toolsPath                      = sourcePath + '/tools'
+  cachePath                      = sourcePath + '/cache'
 
   # Define the commit id of the this version of gkno.
   commitId = os.getenv('GKNOCOMMITID')
@@ -68,6 +52,16 @@ def main():
   # Initialise the gkno specific configuration file.
   gknoConfiguration = gc.gknoConfiguration(configurationFilesPath)
 
+  # Determine if the stages of gkno are to be profiled.
+  timing.setProfile(gknoConfiguration, command.arguments)
+
+  # Define a cache for validated tool and pipeline configuration data. This avoids processing and
+  # validating unchanged configuration files on every execution of gkno.
+  configurationCache = cc.configurationCache(cachePath, __version__)
+
+  # Pipelines are listed using the index of pipeline names, descriptions and categories held in the cache.
+  gknoHelp.configurationCache = configurationCache
+
   # Determine if gkno is being run in admin mode and then determine the mode.
   admin.isRequested, admin.mode = command.isAdmin(admin.allModes)
   mode                          = command.determineMode(admin.isRequested, gknoConfiguration)
@@ -75,6 +69,9 @@ def main():
   # Print gkno title and version to the screen.
   write.printHeader(__version__, __date__, os.getenv('GKNOCOMMITID'))
 
+  # Summarise the task profiles if requested.
+  if mode == 'profile report': exit(pr.profileReport().report(command.commands[1:]))
+
   # List the gkno arguments if requested.
   #if mode == "gkno help": gknoHelp.gknoArgumentHelp()
 
@@ -84,11 +81,9 @@ def main():
 
   # Define a class for handling files. In the initialisation, determine the names of all available
   # tools and pipelines.
+  timing.stage('fileHandling')
   files = fh.fileHandling(toolConfigurationFilesPath, pipelineConfigurationFilesPath, userConfigurationPath)
 
-  # Define a cloass for handling arguments whose values are a command to evaluate.
-  evalCom = ec.evaluateCommands()
-
   # If not being run in admin mode, determine the name of the pipeline being run. Note that
   # for the code, a tool is considered a pipeline with a single task, so the terminology
   # 'pipeline' is used throughout for both cases.
@@ -114,29 +109,85 @@ def main():
   # If the pipeline name has not been supplied, general help must be required.
   if not pipeline and mode != 'web': gknoHelp.generalHelp(mode, command.category, admin, pipelineConfigurationFilesPath)
 
-  # If json files for the web page were requested, set the pipelinesList to all pipelines and loop over
-  # them all, generating the required information. Otherwise, set the list to the pipeline to be run.
-  pipelinesList = files.pipelines if mode == 'web' else [pipeline]
-  for pipeline in pipelinesList:
-  
+  # Import the modules required for building and executing pipelines. These (and networkx) are not required for
+  # the help and listing modes above, so are only imported once it is known that a pipeline is to be processed.
+  timing.stage('importModules')
+  import gkno.executables as exe
+  import gkno.commandLineErrors as clErrors
+  import gkno.arguments as ag
+  import gkno.batch as bt
+  import gkno.dataConsistency as dc
+  import gkno.executionStructure as es
+  import gkno.executor as ex
+  import gkno.evaluateCommands as ec
+  import gkno.fingerprint as fp
+  import gkno.graph as gr
+  import gkno.makefiles as mk
+  import gkno.plotGraph as pg
+  import gkno.parameterSets as ps
+  import gkno.shards as sh
+  import gkno.superpipeline as sp
+  import gkno.tracking as tracking
+  import gkno.web as w
+
+  # Define a plotting class for drawing the graph.
+  plot = pg.plotGraph()
+
+  #Define an object to hold information for creating web content.
+  web = w.webContent()
+
+  # Define a cloass for handling arguments whose values are a command to evaluate.
+  evalCom = ec.evaluateCommands()
+
+  # Generate a fingerprint for this execution of gkno. If the pipeline is being rerun and a makefile generated with
+  # an identical fingerprint (e.g. the same command line and configuration files) exists, execute the makefile
+  # without processing the configuration files or building the pipeline graph. The native executor requires the
+  # graph, so the makefile is always regenerated in this case.
+  timing.stage('fingerprint')
+  fingerprint = fp.fingerprint(__version__, commitId)
+  fingerprint.setArguments(sys.argv[1:], gknoConfiguration)
+  isRerun  = gknoConfiguration.getGknoArgument('GKNO-RERUN', command.arguments)
+  isNative = gknoConfiguration.getGknoArgument('GKNO-EXECUTOR', command.arguments) == 'native'
+  if mode == 'run' and isRerun and not isNative:
+    makefile = fingerprint.findMakefile(pipeline)
+    if makefile:
+      print('Pipeline unchanged, rerunning existing makefile: ', makefile, sep = '')
+      if not gknoConfiguration.getGknoArgument('GKNO-DNL', command.arguments): tracking.phoneHome(sourcePath, pipeline)
+      if gknoConfiguration.getGknoArgument('GKNO-DO-NOT-EXECUTE', command.arguments): exit(0)
+      numberJobs = gknoConfiguration.getGknoArgument('GKNO-JOBS', command.arguments) or 1
+      exit(subprocess.call(['make', '-k', '-j', str(numberJobs), '--file', makefile]))
+
+  # Include the gkno configuration file in the fingerprint.
+  fingerprint.addConfigurationFile(configurationFilesPath + '/tools/gknoConfiguration.json')
+
+  # Define a function to build the graph for a pipeline. This processes the configuration files for the pipeline and
+  # any nested pipelines and tools, and builds the graph with all arguments associated with the graph nodes. The
+  # superpipeline, arguments and graph are returned.
+  def buildPipeline(pipeline):
+
     # Get the path to the pipeline and configuration file.
+    timing.stage('checkPipeline')
     filename = files.checkPipeline(toolConfigurationFilesPath, pipelineConfigurationFilesPath, userConfigurationPath, pipeline)
 
     # Generate a super pipeline class that holds information about the full collection of all nested
     # pipeline.
-    superpipeline = sp.superpipelineClass(filename)
+    superpipeline                    = sp.superpipelineClass(filename)
+    superpipeline.configurationCache = configurationCache
 
     # Dig down into the pipeline configuration files, validate the contents of the configuration files
     # and build the super pipeline tiered structure.
+    timing.stage('getNestedPipelineData')
     superpipeline.getNestedPipelineData(files, pipelineConfigurationFilesPath, userConfigurationPath, filename)
   
     # Check that no pipeline arguments conflict with gkno arguments.
+    timing.stage('checkForArgumentConflicts')
     superpipeline.checkForArgumentConflicts(gknoConfiguration.arguments, gknoConfiguration.shortForms)
   
     # If help categories were requested, or a list of all available pipelines, print them here.
     if mode == 'categories' or mode == 'list-all': gknoHelp.generalHelp(mode, command.category, admin, pipelineConfigurationFilesPath)
 
     # Generate a list of all tasks, tools, unique and shared node IDs from all pipelines.
+    timing.stage('setTools')
     superpipeline.setTools()
   
     # Now that all the tasks are known, check that each pipeline only contains valid tasks. If a 
@@ -145,10 +196,12 @@ def main():
     superpipeline.checkContainedTasks()
     
     # Loop over the list of required tools, open and process their configuration files and store.
+    timing.stage('addTools')
     superpipeline.addTools(files, toolConfigurationFilesPath, userConfigurationPath)
   
     # Loop over all of the pipeline configuration files and check that all nodes that define a tool
     # argument have valid arguments for the tool.
+    timing.stage('checkArgumentsInPipeline')
     superpipeline.checkArgumentsInPipeline()
 
     # Create an arguments object. This will be populated with all of the arguments available for this
@@ -159,6 +212,7 @@ def main():
 
     # Define the graph object that will contain the pipeline graph and necessary operations and methods
     # to build and modify it.
+    timing.stage('buildPipelineTasks')
     graph = gr.pipelineGraph(superpipeline.pipeline)
 
     # Loop over the tiers of nested pipelines and build them into the graph.
@@ -168,23 +222,28 @@ def main():
 
     # Associate configuration file unique node ids with graph node ids for unique nodes pointing to nodes
     # in nested pipelines.
+    timing.stage('findUniqueNodes')
     graph.findUniqueNodes(superpipeline)
 
     # Parse the configuration files identifying nodes that are to be connected.
+    timing.stage('connectNodes')
     graph.connectNodes(superpipeline)
 
     # If any pipeline configuration nodes are given commands to evaluate, check the validity of the instructions
     # and implement them.
+    timing.stage('checkCommands')
     evalCom.checkCommands(graph, superpipeline)
 
     # Determine which graph nodes are required. A node may be used by multiple tasks and may be optional
     # for some and required by others. For each node, loop over all edges and check if any of the edges
     # are listed as required. If so, the node is required and should be marked as such.
+    timing.stage('markRequiredNodes')
     graph.markRequiredNodes(superpipeline)
 
     # If the main pipeline lists a tool whose arguments should be imported, check that the listed tool is
     # valid, that none of the arguments conflict with the pipeline and then add the arguments to the
     # allowed arguments.
+    timing.stage('importArguments')
     args.importArguments(graph, superpipeline)
 
     # Now that arguments have been imported from tools, check that there are no problems.
@@ -192,26 +251,29 @@ def main():
 
     # Now that the graph is built, parse all of the arguments in the pipelines and associate them with the
     # graph nodes and vice versa.
+    timing.stage('assignNodesToArguments')
     args.assignNodesToArguments(graph, superpipeline)
 
-    # If web page json files are being created, update the list of categories and the pipeline information. Also
-    # generate a reduced plot of the pipeline.
-    if mode == 'web' and not superpipeline.getPipelineData(superpipeline.pipeline).isDevelopment:
-      web.updateCategories(superpipeline.pipelineConfigurationData[superpipeline.pipeline])
-      web.updatePipelineInformation(superpipeline.pipelineConfigurationData[superpipeline.pipeline], args.arguments)
-
-      # Generate the workflow for the pipeline.
-      workflow = graph.generateWorkflow()
-
-      # Check for required arguments. This check will create required nodes that are unset, but not terminate gkno,
-      # since we are just trying to create pipeline plots.
-      dc.checkRequiredArguments(graph, superpipeline, args, isTerminate = False)
+    return superpipeline, args, graph
 
-      # Generate the plot.
-      plot.plot(superpipeline, graph, str(superpipeline.pipeline), isReduced = True)
-
-  # Get information about individual tools, write out web content and terminate.
+  # If json files for the web page were requested, generate the information and plots for all of the pipelines, get
+  # information about individual tools, write out web content and terminate.
   if mode == 'web':
+    numberJobs = gknoConfiguration.getGknoArgument('GKNO-JOBS', command.arguments) or web.numberJobs
+    if not dc.isCorrectDataType(numberJobs, 'integer'):
+      jobsOption = gknoConfiguration.options['GKNO-JOBS']
+      clErrors.commandLineErrors().invalidValue(jobsOption.longFormArgument, jobsOption.shortFormArgument, numberJobs, jobsOption.dataType, True)
+    numberJobs = int(numberJobs)
+
+    # If the pipelines are built in this process, return to the web content stage once each pipeline is built.
+    def buildWebPipeline(pipeline):
+      pipelineData = buildPipeline(pipeline)
+      timing.stage('generatePipelineContent')
+      return pipelineData
+
+    timing.stage('generatePipelineContent')
+    web.generatePipelineContent(files.pipelines, buildWebPipeline, plot, configurationCache, numberJobs)
+    timing.stage('writeWebContent')
     web.updateTools(files, toolConfigurationFilesPath)
     web.getGknoArguments(gknoConfiguration.arguments)
     web.writeContent(os.getenv('GKNOCOMMITID'), __version__, __date__)
@@ -219,219 +281,331 @@ def main():
     print('All web content successfully generated.')
     exit(0)
 
+  # Build the pipeline graph.
+  superpipeline, args, graph = buildPipeline(pipeline)
+
   # Generate the workflow.
+  timing.stage('generateWorkflow')
   workflow = graph.generateWorkflow()
 
-  # Process the command line arguments.
-  command.processArguments(superpipeline, args, gknoConfiguration)
-
-  # If the pipeline is being rerun, determine the random string to use, if possible.
-  if gknoConfiguration.getGknoArgument('GKNO-RERUN', command.gknoArguments):
-    randomString = files.getRandomString(pipeline)
-    if not randomString: command.errors.cannotRerunPipeline(pipeline)
-    else: superpipeline.randomString = randomString
-
-  # Check if a parameter set is to be removed.
-  removeParameterSet = gknoConfiguration.getGknoArgument('GKNO-REMOVE-PARAMETER-SET', command.gknoArguments)
-
-  # Determine if a parameter set is being exported. If so, there is no need to check that all required
-  # arguments are set, since the pipeline is not being executed.
-  graph.exportParameterSet = gknoConfiguration.getGknoArgument('GKNO-EXPORT-PARAMETER-SET', command.gknoArguments)
-
-  # Determine the requested parameter set and add the parameters to the graph.
-  parSet             = ps.parameterSets()
-  graph.parameterSet = command.getParameterSetName(command.gknoArguments, gknoConfiguration)
-  if removeParameterSet: parSet.removeParameterSet(graph, superpipeline, removeParameterSet)
-
-  # Step through the workflow and determine the default parameter sets for all of the tasks. Populate
-  # the nodes with these task level default parameter sets, creating nodes where necessary.
-  command.addGknoArguments(graph.addTaskParameterSets(superpipeline, 'default', gknoConfiguration))
-
-  # Now add the default parameter set for the pipelines.
-  graph.addPipelineParameterSets(superpipeline, args, 'default', resourcesPath)
-
-  if graph.parameterSet and graph.parameterSet != 'none' and graph.parameterSet != 'None': 
-    graph.addParameterSet(superpipeline, args, superpipeline.pipeline, graph.parameterSet, resourcesPath)
-
-  # If help was requested, print out the relevent help information.
-  # TODO ADMIN HELP
-  if mode == 'help': gknoHelp.pipelineHelp(superpipeline, graph, args.arguments, False)
-
-  # Write out help on gkno specific (e.g. not associated with a specific pipeline) arguments.
-  elif mode == 'gkno help': gknoHelp.pipelineHelp(superpipeline, graph, args.arguments, gknoConfiguration.arguments)
-
-  # Parse the command line arguments and associate the supplied command line argument values with the graph node.
-  command.parseTasksAsArguments(superpipeline)
-  associatedNodes = command.associateArgumentsWithGraphNodes(graph.graph, superpipeline)
-
-  # Create nodes for all of the defined arguments for which a node does not already exist and add the
-  # argument values to the node.
-  graph.attachArgumentValuesToNodes(graph, superpipeline, args, command.pipelineArguments, associatedNodes)
-
-  # Loop over all nodes and expand lists of arguments. This is only valid for arguments that are either options,
-  # or inputs to a task that are not simulateously outputs of another task.
-  graph.expandLists()
-
-  # Check that all of the values associated with all of the nodes are of the correct type (e.g. integer, flag etc)
-  # and also that any files also have the correct extension.
-  dc.checkValues(graph, superpipeline)
-
-  # Determine whether or not to output a visual representation of the pipeline graph.
-  plot.isPlotRequired(command.gknoArguments, gknoConfiguration)
-  if plot.isFullPlot: plot.plot(superpipeline, graph, plot.fullPlotFilename, isReduced = False)
-  if plot.isReducedPlot: plot.plot(superpipeline, graph, plot.reducedPlotFilename, isReduced = True)
-
-  # If multiple values have been supplied to linked arguments, determine if they should be reordered.
-  if not gknoConfiguration.getGknoArgument('GKNO-DO-NOT-REORDER', command.gknoArguments): command.linkedArguments(graph, superpipeline, args)
-
-  # Loop over all of the nodes in the graph and ensure that all required arguments have been set. Any output files
-  # for which construction instructions are provided can be omitted from this check. This will ensure that all required
-  # input files are set, ensuring that filename construction can proceed. The check will be performed again after
-  # filenames have been constructed, without the omission of constructed files.
-  if not graph.exportParameterSet: dc.checkRequiredArguments(graph, superpipeline, args, isTerminate = True)
-
-  # Check for greedy tasks in the pipeline and mark the relevant nodes and edges.
-  graph.setGreedyTasks(superpipeline)
-
-  # If multiple outputs have been specified, but only single inputs with multiple options, ensure that there are
-  # the same number of input files as there output files.
-  graph.propogateInputs()
-
-  # If the user has requested that a parameter set is to be exported, export the parameter set and terminate.
-  if graph.exportParameterSet: parSet.export(graph, superpipeline, args, command.pipelineArguments)
-
-  # Check if any outputs defined on the command line include a path. If so, require that the --output-path is
-  # used instead.
-  for task in graph.workflow:
-    for nodeId in graph.getOutputFileNodes(task):
-      values = graph.getGraphNodeAttribute(nodeId, 'values')
-      for value in values:
-        if '/' in value: clErrors.commandLineErrors().outputPathInArgument(value)
-
-  # Loop over the tasks in the pipeline and construct filenames for arguments that require them, but weren't given
-  # any on the command line. In addition, if multiple options are given to a task, this routine will generate new
-  # nodes for the task and files and link them together as necessary.
-  graph.constructFiles(superpipeline)
-
-  # Check that all of the streams are correctly marked in the superpipeline. This checks to see if a task is
-  # marked as accepting a stream, but the task is itelf a pipeline, for example. In this case, the first task
-  # in the nested pipeline needs to be marked as accepting a stream.
-  superpipeline.checkStreams(graph)
-
-  # Determine which files are marked for deletion.
-  superpipeline.determineFilesToDelete(graph)
-
-  # Print the workflow to screen.
-  write.workflow(superpipeline, workflow)
-
-  # If any input values have been reordered, warn the user.
-  write.reordered(graph, command.reorderedLists)
-
-  # Having constructed all of the output file names (which may then be linked to other tasks as outputs), rerun the
-  # check of the values to ensure that the data types and the ssociated extensions are valid. This will provide a
-  # check of whether tools can be linked as described in the configuration file. In the previous check, not all of the
-  # filenames were present (but the check ensured that the values provided on the command line were valid). If a task
-  # outputs a file with and extension 'ext1' and the file is then passed to a file that requires files with the
-  # extension 'ext2', the pipeline is invalid. The output filename has been constructed as file.ext1 and so the following
-  # routine will flag the file as invalid as input to the next task.
-  dc.checkValues(graph, superpipeline)
-
-  # If the pipeline has instructions to terminate based on input conditions, modify the pipeline.
-  graph.terminatePipeline(superpipeline)
-
-  # Having reached this point, all of the required values have been checked, are present and have the correct data
-  # type. In the construction of the graph, a number of non-required nodes could have been created and, since they
-  # are not required, they could be unpopoulated. March through the graph and purge any nodes that have no values or
-  # are isolated.
-  dc.purgeEmptyNodes(graph)
-
-  # Check if any tasks have been listed as outputting to a stream. If so, check that the task can output to a
-  # stream and the task it feeds into can accept a stream. If everything is ok, update the graph to reflect
-  # the streaming nodes.
-  graph.checkStreams(superpipeline)
-
-  # For all files marked as intermediate, determine the latest task in the pipeline that uses them. Ensure that
-  # the data structures inside 'struct' only associate the files to delete with this latest task.
-  graph.deleteFiles()
+  # Include all of the configuration files used by the pipeline in the fingerprint.
+  for filename in superpipeline.configurationFiles: fingerprint.addConfigurationFile(filename)
+
+  # If a batch manifest was supplied, read the arguments for each sample. The superpipeline, graph and arguments
+  # built above are used as a template and copied for each sample, so the configuration files are processed and
+  # the graph is built only once, regardless of the number of samples.
+  timing.stage('readManifest')
+  batch    = bt.batch()
+  manifest = gknoConfiguration.getGknoArgument('GKNO-BATCH-MANIFEST', command.arguments)
+  if manifest:
+    batch.readManifest(manifest)
+    batch.setTemplate(superpipeline, graph, args)
+    fingerprint.addConfigurationFile(manifest)
+  batchCommand = command
+
+  # Determine the executor to use to execute the pipeline (make or native) and the resources available.
+  timing.stage('getResources')
+  executor     = ex.executor()
+  executorName = executor.getExecutor(gknoConfiguration, command.arguments)
+  executor.getResources(gknoConfiguration, command.arguments)
+
+  # Determine the number of threads used to check that the input files and executables exist.
+  fileCheckThreads = gknoConfiguration.getGknoArgument('GKNO-FILE-CHECK-THREADS', command.arguments) or fh.fileHandling.fileCheckThreads
+  if not dc.isCorrectDataType(fileCheckThreads, 'integer'):
+    threadsOption = gknoConfiguration.options['GKNO-FILE-CHECK-THREADS']
+    clErrors.commandLineErrors().invalidValue(threadsOption.longFormArgument, threadsOption.shortFormArgument, fileCheckThreads, threadsOption.dataType, True)
+  fileCheckThreads = int(fileCheckThreads)
+
+  # Generate the makefiles. Unless a batch of samples is being processed, this is performed once.
+  for sample in (batch.samples if batch.isBatch() else [None]):
+
+    # Get the command line and a copy of the template for this sample.
+    if sample:
+      command                    = batch.getCommandLine(batchCommand, sample, gknoConfiguration)
+      superpipeline, graph, args = batch.getTemplate()
+      workflow                   = graph.workflow
+
+    # Process the command line arguments.
+    timing.stage('processArguments')
+    command.processArguments(superpipeline, args, gknoConfiguration)
+
+    # If the pipeline is being rerun, determine the random string to use, if possible.
+    if gknoConfiguration.getGknoArgument('GKNO-RERUN', command.gknoArguments):
+      randomString = files.getRandomString(pipeline)
+      if not randomString: command.errors.cannotRerunPipeline(pipeline)
+      else: superpipeline.randomString = randomString
+
+    # Check if a parameter set is to be removed.
+    timing.stage('parameterSets')
+    removeParameterSet = gknoConfiguration.getGknoArgument('GKNO-REMOVE-PARAMETER-SET', command.gknoArguments)
+
+    # Determine if a parameter set is being exported. If so, there is no need to check that all required
+    # arguments are set, since the pipeline is not being executed.
+    graph.exportParameterSet = gknoConfiguration.getGknoArgument('GKNO-EXPORT-PARAMETER-SET', command.gknoArguments)
+
+    # Determine the requested parameter set and add the parameters to the graph.
+    parSet             = ps.parameterSets()
+    graph.parameterSet = command.getParameterSetName(command.gknoArguments, gknoConfiguration)
+    if removeParameterSet: parSet.removeParameterSet(graph, superpipeline, removeParameterSet)
+
+    # Step through the workflow and determine the default parameter sets for all of the tasks. Populate
+    # the nodes with these task level default parameter sets, creating nodes where necessary.
+    command.addGknoArguments(graph.addTaskParameterSets(superpipeline, 'default', gknoConfiguration))
+
+    # Now add the default parameter set for the pipelines.
+    graph.addPipelineParameterSets(superpipeline, args, 'default', resourcesPath)
+
+    if graph.parameterSet and graph.parameterSet != 'none' and graph.parameterSet != 'None': 
+      graph.addParameterSet(superpipeline, args, superpipeline.pipeline, graph.parameterSet, resourcesPath)
+
+    # If help was requested, print out the relevent help information.
+    # TODO ADMIN HELP
+    if mode == 'help': gknoHelp.pipelineHelp(superpipeline, graph, args.arguments, False)
+
+    # Write out help on gkno specific (e.g. not associated with a specific pipeline) arguments.
+    elif mode == 'gkno help': gknoHelp.pipelineHelp(superpipeline, graph, args.arguments, gknoConfiguration.arguments)
+
+    # Parse the command line arguments and associate the supplied command line argument values with the graph node.
+    timing.stage('associateArgumentsWithGraphNodes')
+    command.parseTasksAsArguments(superpipeline)
+    associatedNodes = command.associateArgumentsWithGraphNodes(graph.graph, superpipeline)
+
+    # Create nodes for all of the defined arguments for which a node does not already exist and add the
+    # argument values to the node.
+    timing.stage('attachArgumentValuesToNodes')
+    graph.attachArgumentValuesToNodes(graph, superpipeline, args, command.pipelineArguments, associatedNodes)
+
+    # Loop over all nodes and expand lists of arguments. This is only valid for arguments that are either options,
+    # or inputs to a task that are not simulateously outputs of another task. The lists define the values used in
+    # the pipeline, so are included in the fingerprint.
+    timing.stage('expandLists')
+    graph.expandLists()
+    for filename in graph.listFiles: fingerprint.addConfigurationFile(filename)
+
+    # Check that all of the values associated with all of the nodes are of the correct type (e.g. integer, flag etc)
+    # and also that any files also have the correct extension.
+    timing.stage('checkValues')
+    dc.checkValues(graph, superpipeline)
+
+    # Determine whether or not to output a visual representation of the pipeline graph.
+    timing.stage('plot')
+    plot.isPlotRequired(command.gknoArguments, gknoConfiguration)
+    if plot.isFullPlot: plot.plot(superpipeline, graph, plot.fullPlotFilename, isReduced = False)
+    if plot.isReducedPlot: plot.plot(superpipeline, graph, plot.reducedPlotFilename, isReduced = True)
+
+    # If multiple values have been supplied to linked arguments, determine if they should be reordered.
+    timing.stage('linkedArguments')
+    if not gknoConfiguration.getGknoArgument('GKNO-DO-NOT-REORDER', command.gknoArguments): command.linkedArguments(graph, superpipeline, args)
+
+    # Loop over all of the nodes in the graph and ensure that all required arguments have been set. Any output files
+    # for which construction instructions are provided can be omitted from this check. This will ensure that all required
+    # input files are set, ensuring that filename construction can proceed. The check will be performed again after
+    # filenames have been constructed, without the omission of constructed files.
+    timing.stage('checkRequiredArguments')
+    if not graph.exportParameterSet: dc.checkRequiredArguments(graph, superpipeline, args, isTerminate = True)
+
+    # Check for greedy tasks in the pipeline and mark the relevant nodes and edges.
+    timing.stage('setGreedyTasks')
+    graph.setGreedyTasks(superpipeline)
+
+    # If multiple outputs have been specified, but only single inputs with multiple options, ensure that there are
+    # the same number of input files as there output files.
+    timing.stage('propogateInputs')
+    graph.propogateInputs()
+
+    # If the user has requested that a parameter set is to be exported, export the parameter set and terminate.
+    if graph.exportParameterSet: parSet.export(graph, superpipeline, args, command.pipelineArguments)
+
+    # Check if any outputs defined on the command line include a path. If so, require that the --output-path is
+    # used instead.
+    for task in graph.workflow:
+      for nodeId in graph.getOutputFileNodes(task):
+        values = graph.getGraphNodeAttribute(nodeId, 'values')
+        for value in values:
+          if '/' in value: clErrors.commandLineErrors().outputPathInArgument(value)
+
+    # If the genome is to be divided into shards, supply the shards to the tasks that accept them. These tasks are
+    # then divided into a division for each shard when the filenames are constructed.
+    timing.stage('shards')
+    shards = sh.shards()
+    if shards.getShards(graph, superpipeline, gknoConfiguration, command.gknoArguments):
+      shards.addShards(graph, superpipeline, args, command.pipelineArguments)
+      fingerprint.addConfigurationFile(shards.filename)
+
+    # Loop over the tasks in the pipeline and construct filenames for arguments that require them, but weren't given
+    # any on the command line. In addition, if multiple options are given to a task, this routine will generate new
+    # nodes for the task and files and link them together as necessary. If requested, the divisions are represented
+    # symbolically and the command lines for each division are only generated as the makefiles are written.
+    timing.stage('constructFiles')
+    graph.isSymbolicDivisions = True if gknoConfiguration.getGknoArgument('GKNO-SYMBOLIC-DIVISIONS', command.gknoArguments) else False
+    graph.constructFiles(superpipeline)
+
+    # Check that all of the streams are correctly marked in the superpipeline. This checks to see if a task is
+    # marked as accepting a stream, but the task is itelf a pipeline, for example. In this case, the first task
+    # in the nested pipeline needs to be marked as accepting a stream.
+    timing.stage('checkStreams')
+    superpipeline.checkStreams(graph)
+
+    # Determine which files are marked for deletion.
+    timing.stage('determineFilesToDelete')
+    superpipeline.determineFilesToDelete(graph)
+
+    # Print the workflow to screen.
+    timing.stage('writeWorkflow')
+    write.workflow(superpipeline, workflow)
+
+    # If any input values have been reordered, warn the user.
+    write.reordered(graph, command.reorderedLists)
+
+    # Having constructed all of the output file names (which may then be linked to other tasks as outputs), rerun the
+    # check of the values to ensure that the data types and the ssociated extensions are valid. This will provide a
+    # check of whether tools can be linked as described in the configuration file. In the previous check, not all of the
+    # filenames were present (but the check ensured that the values provided on the command line were valid). If a task
+    # outputs a file with and extension 'ext1' and the file is then passed to a file that requires files with the
+    # extension 'ext2', the pipeline is invalid. The output filename has been constructed as file.ext1 and so the following
+    # routine will flag the file as invalid as input to the next task.
+    timing.stage('recheckValues')
+    dc.checkValues(graph, superpipeline)
+
+    # If the pipeline has instructions to terminate based on input conditions, modify the pipeline.
+    timing.stage('terminatePipeline')
+    graph.terminatePipeline(superpipeline)
+
+    # Having reached this point, all of the required values have been checked, are present and have the correct data
+    # type. In the construction of the graph, a number of non-required nodes could have been created and, since they
+    # are not required, they could be unpopoulated. March through the graph and purge any nodes that have no values or
+    # are isolated.
+    timing.stage('purgeEmptyNodes')
+    dc.purgeEmptyNodes(graph)
+
+    # Check if any tasks have been listed as outputting to a stream. If so, check that the task can output to a
+    # stream and the task it feeds into can accept a stream. If everything is ok, update the graph to reflect
+    # the streaming nodes.
+    timing.stage('checkGraphStreams')
+    graph.checkStreams(superpipeline)
+
+    # For all files marked as intermediate, determine the latest task in the pipeline that uses them. Ensure that
+    # the data structures inside 'struct' only associate the files to delete with this latest task.
+    timing.stage('deleteFiles')
+    graph.deleteFiles()
   
-  # Set the absolute paths of all the files used in the pipeline.
-  requiredInputFiles = dc.setFilePaths(graph, command.gknoArguments, gknoConfiguration)
-
-  # Determine the execution structure of the pipeline.
-  struct = es.executionStructure()
-  struct.determineExecutionStructure(graph)
-
-  # If a task has multiple divisions, ensure that there are the same number of input and output files for the task.
-  # It is possible that n input files were specified on the command line, leading to n executions of the task, but
-  # m output files were specified. This will lead to problems when constructing the command lines.
-  graph.checkNumberOfOutputs()
-
-  # For values that are commands to be executed at runtime, include any values from other graph nodes as necessary.
-  evalCom.addValues(graph)
-
-  # Generate a makefiles object and then build all the command lines for the tasks as well as creating a list of each
-  # tasks dependencies and output.
-  make = mk.makefiles()
-  make.generateCommandLines(graph, superpipeline, struct)
-
-  # Determine if multiple makefiles have been requested and whether to add a unique id to the makefiles.
-  make.isMultipleMakefiles, make.makefileId = command.checkMakefiles(gknoConfiguration.options)
-
-  # Update the intermediate files.
-  make.updateIntermediates(struct)
-
-  # Open the required makefiles. This is either a single makefile that will run all tasks, or a set of makefiles broken
-  # up by the phase, subphase and division
-  make.openMakefiles(superpipeline.pipeline, superpipeline.randomString, struct)
-
-  # Add the header text to the file(s).
-  make.addHeader(commitId, __date__, __version__, superpipeline.pipeline, sourcePath, toolsPath, resourcesPath)
-
-  # Include the paths of all the required executables.
-  make.addUniqueExecutables(graph, struct)
-
-  # Add phony information.
-  make.addPhony()
-
-  # Get the intermediate and output files for the whole pipeline.
-  outputs = make.getAllOutputs(struct, superpipeline.randomString)
-
-  # Remove the 'ok' file used to indicated successful execution.
-  make.removeOk()
-
-  # Add the command lines to the makefiles.
-  for phase in struct.phaseInformation:
-    for subphase in range(1, struct.phaseInformation[phase].numberSubphases + 1):
-      for division in range(1, struct.phaseInformation[phase].numberDivisions + 1):
-        make.addCommandLines(graph, struct, phase, subphase, division)
-
-  # Write final information to the makefile, then close the file.
-  make.completeFile(outputs)
-
-  # Close the makefiles.
-  make.closeFiles()
-
-  # Check that all of the dependent files exist (excluding dependencies that are created by tasks in the pipeline).
-  success = files.checkFileExistence(requiredInputFiles, resourcesPath, toolsPath)
+    # Set the absolute paths of all the files used in the pipeline.
+    timing.stage('setFilePaths')
+    requiredInputFiles = dc.setFilePaths(graph, command.gknoArguments, gknoConfiguration)
+
+    # Determine the execution structure of the pipeline.
+    timing.stage('determineExecutionStructure')
+    struct = es.executionStructure()
+    struct.determineExecutionStructure(graph)
+
+    # If a task has multiple divisions, ensure that there are the same number of input and output files for the task.
+    # It is possible that n input files were specified on the command line, leading to n executions of the task, but
+    # m output files were specified. This will lead to problems when constructing the command lines.
+    timing.stage('checkNumberOfOutputs')
+    graph.checkNumberOfOutputs()
+
+    # For values that are commands to be executed at runtime, include any values from other graph nodes as necessary.
+    timing.stage('addValues')
+    evalCom.addValues(graph)
+
+    # Generate a makefiles object and then build all the command lines for the tasks as well as creating a list of each
+    # tasks dependencies and output.
+    timing.stage('generateCommandLines')
+    make = mk.makefiles()
+    make.isProfile = True if gknoConfiguration.getGknoArgument('GKNO-PROFILE-TASKS', command.gknoArguments) else False
+
+    # Determine the threads used by each task and whether any tasks require multiple job slots, given the resources
+    # available to the pipeline.
+    graph.setThreads(superpipeline)
+    make.setResources(graph, executor.maxMemory, executor.maxIoWeight)
+    make.generateCommandLines(graph, superpipeline, struct)
+
+    # The fingerprint is included in the makefile that is executed. For a batch of samples, this is the makefile
+    # executing all of the samples.
+    timing.stage('writeMakefiles')
+    if not sample: make.fingerprint = fingerprint
+
+    # Determine if multiple makefiles have been requested and whether to add a unique id to the makefiles.
+    make.isMultipleMakefiles, make.makefileId = command.checkMakefiles(gknoConfiguration.options)
+
+    # Update the intermediate files.
+    make.updateIntermediates(struct)
+
+    # Open the required makefiles. This is either a single makefile that will run all tasks, or a set of makefiles broken
+    # up by the phase, subphase and division
+    make.openMakefiles(superpipeline.pipeline, superpipeline.randomString, struct)
+
+    # Add the header text to the file(s).
+    make.addHeader(commitId, __date__, __version__, superpipeline.pipeline, sourcePath, toolsPath, resourcesPath)
+
+    # Include the paths of all the required executables.
+    make.addUniqueExecutables(graph, struct)
+
+    # Add phony information.
+    make.addPhony()
+
+    # Get the intermediate and output files for the whole pipeline.
+    outputs = make.getAllOutputs(struct, superpipeline.randomString)
+
+    # Remove the 'ok' file used to indicated successful execution.
+    make.removeOk()
+
+    # Add the command lines to the makefiles.
+    for phase in struct.phaseInformation:
+      for subphase in range(1, struct.phaseInformation[phase].numberSubphases + 1):
+        for division in range(1, struct.phaseInformation[phase].numberDivisions + 1):
+          make.addCommandLines(graph, struct, phase, subphase, division)
+
+    # Write final information to the makefile, then close the file.
+    make.completeFile(outputs)
+
+    # Close the makefiles.
+    make.closeFiles()
+
+    # Check that all of the dependent files exist (excluding dependencies that are created by tasks in the pipeline).
+    timing.stage('checkFileExistence')
+    success = files.checkFileExistence(requiredInputFiles, resourcesPath, toolsPath, fileCheckThreads)
+
+    # Store the makefiles generated for the sample.
+    if sample: batch.addMakefiles(sample, make, success)
+
+  # Determine the makefile to execute. If a batch of samples was processed, write a makefile to execute the makefiles
+  # for all samples. The batch makefile is only executed if all samples have their required input files.
+  timing.stage('writeBatchMakefile')
+  makefile = None if make.isMultipleMakefiles else make.singleFilename
+  if batch.isBatch():
+    success  = batch.allFilesExist()
+    makefile = batch.filename if batch.writeMakefile(superpipeline.pipeline, commitId, __date__, __version__, fingerprint) else None
 
   # Having established the mode of operation and checked that the command lines are
   # valid etc., ping the website to log use of gkno.
+  timing.stage('phoneHome')
   if not gknoConfiguration.getGknoArgument('GKNO-DNL', command.gknoArguments): tracking.phoneHome(sourcePath, pipeline)
 
   # Prior to execution of the makefile, ensure that all required executables exist. This first requires parsing the
   # user settings file.
-  exe.executables().checkExecutables(toolsPath, superpipeline, admin.userSettings['compiled tools'])
+  timing.stage('checkExecutables')
+  exe.executables().checkExecutables(toolsPath, superpipeline, admin, fileCheckThreads)
 
   # Execute the generated script unless the user has explicitly asked for it not to be run, or if multiple makefiles
   # have been generated.
-  if gknoConfiguration.options['GKNO-DO-NOT-EXECUTE'].longFormArgument not in command.gknoArguments and not make.isMultipleMakefiles and success:
+  timing.stage('execute')
+  if gknoConfiguration.options['GKNO-DO-NOT-EXECUTE'].longFormArgument not in command.gknoArguments and makefile and success:
 
     # Get the number of parallel jobs to be requested.
     jobsArgument = gknoConfiguration.options['GKNO-JOBS'].longFormArgument
     numberJobs   = command.gknoArguments[jobsArgument][0] if jobsArgument in command.gknoArguments else 1
 
+    # Determine the executor to use. The native executor can only be used if a single makefile was generated for a
+    # single pipeline, otherwise make is used.
+    if executorName == 'native':
+      if batch.isBatch(): executor.errors.cannotUseNativeExecutor()
+      else:
+        success = executor.execute(graph, struct, make, makefile, sourcePath, toolsPath, resourcesPath, numberJobs)
+        exit(success)
+
     # Generate the execution command.
-    execute = 'make -k -j ' + str(numberJobs) + ' --file ' + make.singleFilename
+    execute = 'make -k -j ' + str(numberJobs) + ' --file ' + makefile
     success = subprocess.call(execute.split())
 
 if __name__ == "__main__":
@@ -3,8 +3,6 @@
 from __future__ import print_function
 
 import errors
-import inspect
-from inspect import currentframe, getframeinfo
 
 import os
 import sys
@@ -37,6 +35,9 @@ class adminErrors:
     # Errors with makefile generation generate an error code of '13'.
     # Errors with parameter sets generate an error code of '14'.
     # Errors associated with constructing filenames generate an error code of '15'.
+    # Errors associated with batch manifests generate an error code of '16'.
+    # Errors associated with executing the pipeline generate an error code of '17'.
+    # Errors associated with dividing the genome into shards generate an error code of '18'.
     self.errorCode = '2'
 
   #####################
@@ -134,6 +135,32 @@ class adminErrors:
     self.errors.writeFormattedText(self.text, errorType = 'error')
     self.errors.terminate(self.errorCode)
 
+  # If a tool that is required to build another tool is listed as a tool to skip.
+  def skippedToolDependency(self, filename, tool, dependency, dest=sys.stdout):
+    self.text.append('Required tool in list of tools to not compile.')
+    self.text.append('The \'--skip-tools (-st)\' argument was set when attempting to build gkno. The specified file \'' + filename + '\' ' + \
+    'contains the tool \'' + dependency + '\', but this tool is required in order to build the tool \'' + tool + '\'. Please either remove \'' + \
+    dependency + '\' from the list, or include \'' + tool + '\' in the list of tools to skip.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # If a tool listed as a tool to compile requires a tool that is not listed and has not already been compiled.
+  def missingCompileDependency(self, filename, tool, dependency, dest=sys.stdout):
+    self.text.append('Missing required tool in list of tools to compile.')
+    self.text.append('The \'--compile-tools (-ct)\' argument was set when attempting to build gkno. The specified file \'' + filename + '\' ' + \
+    'contains the tool \'' + tool + '\', which requires the tool \'' + dependency + '\' in order to be built. Please include \'' + \
+    dependency + '\' in the list of tools to compile.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The number of jobs to use for building the tools is not a positive integer.
+  def invalidBuildJobs(self, dest=sys.stdout):
+    self.text.append('Invalid number of jobs.')
+    self.text.append('The \'--number-jobs (-nj)\' argument was set when attempting to build gkno. This argument defines the number of ' + \
+    'jobs that can be used to build the tools and must be followed by a positive integer.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
   # If gkno is being run, but it hasn't yet been built, inform the user.
   def gknoNotBuilt(self):
     self.text.append('gkno not built.')
@@ -169,11 +196,14 @@ class adminErrors:
   def toolBuildFailed(self, toolName, dest=sys.stderr):
     print("ERROR: See logs/build_"+toolName+".* files for more details.", file=dest)
 
+  def toolDependencyFailed(self, toolName, dependency, dest=sys.stderr):
+    print("ERROR: Not built as the required tool "+dependency+" was not built.", file=dest)
+
   def toolUpdateFailed(self, toolName, dest=sys.stderr):
     print("ERROR: See logs/update_"+toolName+".* files for more details.", file=dest)
 
-  def urlRetrieveFailed(self, url, dest=sys.stderr):
-    print("ERROR: Could not retrieve file at "+url, file=dest)
+  def urlRetrieveFailed(self, url, reason="", dest=sys.stderr):
+    print("ERROR: Could not retrieve file at "+url+(" ("+reason+")" if reason else ""), file=dest)
     
   def dependencyCheckFailed(self, missing, unknown, incompatible, dest=sys.stderr):
     if len(missing) > 0:
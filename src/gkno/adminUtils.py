@@ -2,14 +2,16 @@
 
 from __future__ import print_function
 
+from multiprocessing.pool import ThreadPool
+
+import hashlib
 import json
+import multiprocessing
 import os
 import os.path
 import shutil
 import subprocess
 import sys
-import tarfile
-import urllib
 
 import conf
 
@@ -148,34 +150,37 @@ class adminUtils:
 
     # Build all tools
     print("Building tools: ", file=sys.stdout)
-    for tool in conf.tools:
-      print('  ' + tool.name + '...', end = '', file=sys.stdout)
-      sys.stdout.flush()
-      if self.buildTool(tool):
-        print('done.', file=sys.stdout)
-        self.builtTools[tool.name] = True
-        self.userSettings['compiled tools'].append(tool.name)
-      else:
-        self.error.toolBuildFailed(tool.name, dest=sys.stdout)
-        self.builtTools[tool.name] = False
-        self.allBuilt         = False
-        #return False
+    self.buildTools(conf.tools, self.getBuildJobs())
 
     # Fetch all default resources (current releases only)
     print("Fetching default resources:", file=sys.stdout)
-    for resource in conf.resources:
-      if resource.isDefault:
-        print('  ' + resource.name + ':', file=sys.stdout)
-        sys.stdout.flush()
-        if not self.addCurrentRelease(resource.name, '    '):
-          self.error.resourceFetchFailed(resource.name, dest=sys.stdout)
-          #return False
+    self.fetchResources([resource.name for resource in conf.resources if resource.isDefault])
 
     # If we get here - clean up, mark built status, and return success
     os.chdir(originalWorkingDir)
     self.userSettings["isBuilt"] = True
     return True
 
+  # Fetch the current releases of the given resources. If there are multiple resources, the resources are downloaded
+  # concurrently, and the result of each download is written when all downloads are complete.
+  def fetchResources(self, resourceNames):
+    if len(resourceNames) == 1:
+      print('  ' + resourceNames[0] + ':', file=sys.stdout)
+      sys.stdout.flush()
+      if not self.addCurrentRelease(resourceNames[0], '    '): self.error.resourceFetchFailed(resourceNames[0], dest=sys.stdout)
+
+    # Download the resources using a thread for each resource.
+    elif resourceNames:
+      pool = ThreadPool(len(resourceNames))
+      try: results = pool.map(lambda resourceName: self.addCurrentRelease(resourceName, '    ', isQuiet = True), resourceNames)
+      finally:
+        pool.close()
+        pool.join()
+      for resourceName, success in zip(resourceNames, results):
+        print('  ' + resourceName + '...', end = '', file=sys.stdout)
+        if success: print('done.', file=sys.stdout)
+        else: self.error.resourceFetchFailed(resourceName, dest=sys.stdout)
+
   # Check if the user has requested that not all tools be built.
   def skipTools(self):
     if '--skip-tools' in sys.argv or '-st' in sys.argv:
@@ -208,13 +213,29 @@ class adminUtils:
         if tool not in availableTools: self.error.invalidToolToSkip(skipList, tool, availableTools, dest=sys.stdout)
 
       # Check for dependencies. Some tools cannot be compiled without the presence of other
-      # tools. If a tool has not been listed, but a prerequisite tool has, terminate.
-      # TODO CHECK DEPENDENCY
+      # tools. If a prerequisite tool has been listed, but a tool requiring it has not, terminate.
+      for tool in conf.tools:
+        if tool.name not in toolsToSkip:
+          for dependency in tool.dependencies:
+            if dependency in toolsToSkip: self.error.skippedToolDependency(skipList, tool.name, dependency, dest=sys.stdout)
 
       # Remove the tools in the toolsToSkip list from conf.tools.
       for counter, tool in reversed(list(enumerate(conf.tools))):
         if tool.name in toolsToSkip: del(conf.tools[counter])
 
+  # Get the number of jobs that can be used to build the tools. Unless set with the --number-jobs (-nj) argument,
+  # this is the number of processors.
+  def getBuildJobs(self):
+    if '--number-jobs' not in sys.argv and '-nj' not in sys.argv: return multiprocessing.cpu_count()
+    try: index = sys.argv.index('--number-jobs')
+    except: index = sys.argv.index('-nj')
+
+    # Check that the number of jobs is a positive integer.
+    try: jobs = int(sys.argv[index + 1])
+    except: jobs = 0
+    if jobs < 1: self.error.invalidBuildJobs(dest=sys.stdout)
+    return jobs
+
   # Check if the user has requested that not only a set of tools be built.
   def compileTools(self):
     if '--compile-tools' in sys.argv or '-ct' in sys.argv:
@@ -243,8 +264,12 @@ class adminUtils:
         if tool not in availableTools: self.error.invalidToolToCompile(compileList, tool, availableTools, dest=sys.stdout)
 
       # Check for dependencies. Some tools cannot be compiled without the presence of other
-      # tools. If a tool has not been listed, but a prerequisite tool has, terminate.
-      # TODO CHECK DEPENDENCY
+      # tools. If a tool has been listed, but a prerequisite tool has not, terminate.
+      for tool in conf.tools:
+        if tool.name in toolsToCompile:
+          for dependency in tool.dependencies:
+            if dependency not in toolsToCompile and dependency not in self.userSettings['compiled tools']:
+              self.error.missingCompileDependency(compileList, tool.name, dependency, dest=sys.stdout)
 
       # Remove the tools in the toolsToSkip list from conf.tools.
       for counter, tool in reversed(list(enumerate(conf.tools))):
@@ -546,6 +571,75 @@ class adminUtils:
   # Build/update helper methods
   # -------------------------------------------
 
+  # Build the tools. Tools are built as soon as all of the tools they depend on have been built, so independent tools
+  # are built concurrently. The builds change the working directory and environment, so each tool is built in its own
+  # process. The number of jobs used by all of the builds is limited to the requested number of jobs; tools that can
+  # be built with multiple jobs share the jobs that are available when they are started. A tool is not built if any of
+  # the tools it depends on failed to build.
+  def buildTools(self, tools, jobs):
+    waiting   = list(tools)
+    running   = {}
+    available = jobs
+    while waiting or running:
+
+      # Determine which of the waiting tools can be built. If a required tool has failed to build (or is not being
+      # built and was not previously built), this tool cannot be built.
+      ready   = []
+      pending = [tool.name for tool in waiting + running.values()]
+      for tool in list(waiting):
+        dependencies = [dependency for dependency in tool.dependencies if dependency not in self.userSettings['compiled tools']]
+        failed       = [dependency for dependency in dependencies if not self.builtTools.get(dependency, dependency in pending)]
+        if failed:
+          waiting.remove(tool)
+          print('  ' + tool.name + '...', end = '', file=sys.stdout)
+          self.error.toolDependencyFailed(tool.name, failed[0], dest=sys.stdout)
+          self.builtTools[tool.name] = False
+          self.allBuilt              = False
+        elif not [dependency for dependency in dependencies if dependency in pending]: ready.append(tool)
+
+      # Start building as many of the ready tools as there are jobs available for. If no tools are being built, a
+      # tool is always started.
+      for index, tool in enumerate(ready):
+        toolJobs = tool.jobs if tool.jobs else max(1, available / (len(ready) - index))
+        if running and toolJobs > available: continue
+        tool.cpus  = toolJobs
+        available -= toolJobs
+        waiting.remove(tool)
+
+        # Flush any output before creating the process for the build, so that it is not written by both processes.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+          try: success = self.buildTool(tool)
+          except: success = False
+          os._exit(0 if success else 1)
+        running[pid] = tool
+
+      # If no tools are being built, the remaining tools depend on each other and so cannot be built.
+      if not running:
+        for tool in waiting:
+          print('  ' + tool.name + '...', end = '', file=sys.stdout)
+          self.error.toolDependencyFailed(tool.name, [dependency for dependency in tool.dependencies if dependency in pending][0], dest=sys.stdout)
+          self.builtTools[tool.name] = False
+          self.allBuilt              = False
+        break
+
+      # Wait for a build to finish and record if the tool was successfully built.
+      pid, status = os.waitpid(-1, 0)
+      tool        = running.pop(pid)
+      available  += tool.cpus
+      print('  ' + tool.name + '...', end = '', file=sys.stdout)
+      if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+        print('done.', file=sys.stdout)
+        self.builtTools[tool.name] = True
+        self.userSettings['compiled tools'].append(tool.name)
+      else:
+        self.error.toolBuildFailed(tool.name, dest=sys.stdout)
+        self.builtTools[tool.name] = False
+        self.allBuilt              = False
+      sys.stdout.flush()
+
   def buildTool(self, tool):
     stub = "build_" + tool.name
     outFilename = self.logsPath + stub + ".out"
@@ -652,7 +746,7 @@ class adminUtils:
   # -------------------------------------------
 
   # Adds a resource's "current" release
-  def addCurrentRelease(self, resourceName, outputIndent=""):
+  def addCurrentRelease(self, resourceName, outputIndent="", isQuiet=False):
 
     # Fetch the name resource's "current" release
     currentReleaseName = self.getCurrentReleaseName(resourceName)
@@ -661,7 +755,7 @@ class adminUtils:
       return False
 
     # Add named release
-    if not self.addRelease(resourceName, currentReleaseName, outputIndent): return False
+    if not self.addRelease(resourceName, currentReleaseName, outputIndent, isQuiet): return False
 
     # Make a symlink-ed directory "current" that points to release's directory
     currentDir = self.resourcesPath + resourceName + "/current"
@@ -677,7 +771,7 @@ class adminUtils:
     return True
 
   # Add a named release for a named resource
-  def addRelease(self, resourceName, releaseName, outputIndent=""):
+  def addRelease(self, resourceName, releaseName, outputIndent="", isQuiet=False):
 
     # If this is the first release for a requested organism resource, initialize its settings
     if resourceName not in self.userSettings['resources']:
@@ -691,40 +785,27 @@ class adminUtils:
       self.error.resourceAlreadyAdded(resourceName)
       return False
 
-    # Move into resource's directory
-    os.chdir(self.resourcesPath + resourceName)
-
     # Get URL for release's tarball
     tarballUrl = self.getUrlForRelease(resourceName, releaseName)
     if tarballUrl == '':
       self.error.noReleaseUrlFound(resourceName, releaseName)
       return False
 
-    # Download release tarball
-    print(outputIndent + 'Downloading files...  0%', end = '', file = sys.stdout)
-    sys.stdout.flush()
-    try: filename, headers = urllib.urlretrieve(tarballUrl, reporthook = downloadProgress) 
-    except IOError:
-      self.error.urlRetrieveFailed(tarballUrl)
-      return False
-    print('', file=sys.stdout)
-  
-    # Extract files from tarball
+    # Download release tarball, extracting the files as the tarball is downloaded. The resource download module (and
+    # urllib2) is only imported when required, so that gkno starts quickly.
     # N.B. - tarball should be set up so that all of its contents are 
     #        in a parent directory whose name matches its 'releaseName'
-    print(outputIndent + 'Unpacking files...', end = '', file = sys.stdout)
-    sys.stdout.flush()
-    try:
-      tar = tarfile.open(filename)
-      tar.extractall(self.resourcesPath + resourceName)
-      tar.close()
-    except tarfile.TarError:
-      self.error.extractTarballFailed(filename)
+    import resourceDownload as rd
+    if not isQuiet:
+      print(outputIndent + 'Downloading and unpacking files...  0%', end = '', file = sys.stdout)
+      sys.stdout.flush()
+    download = rd.resourceDownload(tarballUrl, self.getChecksumsForRelease(resourceName, releaseName), None if isQuiet else downloadProgress)
+    error    = download.extract(self.resourcesPath + resourceName)
+    if error:
+      if not isQuiet: print('', file=sys.stdout)
+      self.error.urlRetrieveFailed(tarballUrl, error, dest=sys.stdout)
       return False
-    print('done.', file = sys.stdout)
-
-    # Delete tarball
-    os.remove(filename)
+    if not isQuiet: print('', file=sys.stdout)
 
     # Add release to our settings for this resource & return success
     self.userSettings["resources"][resourceName]["releases"].append(releaseName)
@@ -782,6 +863,14 @@ class adminUtils:
       if targetInfo['name'] == releaseName: return targetInfo['url']
     return ''
 
+  # Return the checksums supplied for a resource's named release. The checksums are optional and are given in the
+  # release's target information with the name of the algorithm (e.g. "sha256") as the key.
+  def getChecksumsForRelease(self, resourceName, releaseName):
+    targetSettings = self.readTargetsFile(resourceName)
+    for targetInfo in targetSettings['targets']:
+      if targetInfo['name'] == releaseName: return dict((key, value) for key, value in targetInfo.items() if key in hashlib.algorithms)
+    return {}
+
   # Fetch & return resource's target data (JSON)
   def readTargetsFile(self, resourceName):
     targetFile = open(self.resourcesPath + resourceName + "/targets.json")
@@ -1005,11 +1094,14 @@ class adminUtils:
         self.error.jsonOpenError(True, exc_value, self.userSettingsFilename())
         self.error.terminate()
   
-  # Write settings to file in JSON format
+  # Write settings to file in JSON format. The settings are written to a temporary file which then replaces the
+  # settings file, so that concurrent executions of gkno never read a partially written file.
   def exportUserSettings(self):
-    filehandle = open(self.userSettingsFilename(), 'w')
+    filename   = self.userSettingsFilename() + '.' + str(os.getpid())
+    filehandle = open(filename, 'w')
     json.dump(self.userSettings, filehandle, indent = 2)
     filehandle.close()
+    os.rename(filename, self.userSettingsFilename())
 
   # Returns True if gkno has been 'built'
   def isBuilt(self):
@@ -1118,7 +1210,7 @@ class adminUtils:
   def runSilentCommand(self, command):
     return self.runCommand(command, out=open(os.devnull, 'w'), err=open(os.devnull, 'w'))
 
-def downloadProgress(count, blockSize, totalSize):
-    percent = int(count*blockSize*100/totalSize)
+def downloadProgress(position, totalSize):
+    percent = int(position*100/totalSize)
     sys.stdout.write("\b\b\b%2d%%" % percent)
     sys.stdout.flush()
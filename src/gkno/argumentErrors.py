@@ -2,9 +2,6 @@
 
 from __future__ import print_function
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import errors as errors
 
 import os
@@ -203,8 +203,7 @@ class arguments:
       # If the argument had already been set, add this argument to the list of alternative arguments.
       else:
         alternativeArguments = graph.getGraphNodeAttribute(graphNodeId, 'alternativeArguments')
-        alternativeArguments.append((str(argumentAddress), str(shortFormAddress)))
-        graph.setGraphNodeAttribute(graphNodeId, 'alternativeArguments', alternativeArguments)
+        graph.setGraphNodeAttribute(graphNodeId, 'alternativeArguments', alternativeArguments + [(str(argumentAddress), str(shortFormAddress))])
 
       # Link the argument with the graph node ID to which it points.
       self.arguments[str(argumentAddress)].graphNodeIds.append(str(graphNodeId))
@@ -0,0 +1,219 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+from copy import deepcopy
+
+import batchErrors as be
+import fileHandling as fh
+import stringOperations as strOps
+
+import json
+import os
+
+# Define a class for holding the arguments supplied for a single sample in a batch manifest.
+class sampleInformation:
+  def __init__(self, name):
+
+    # The name of the sample. This is used as the makefile id for the sample.
+    self.name = name
+
+    # The arguments and values for this sample, in the same form as the command line arguments
+    # (e.g. keyed by the argument as supplied with a list of values).
+    self.arguments = {}
+
+    # The makefiles generated for this sample and whether all required input files exist.
+    self.makefiles   = []
+    self.filesExist  = True
+    self.isMultiple  = False
+
+# Define a class for generating makefiles for a batch of samples. The pipeline graph is built once
+# and used as a template. For each sample in the manifest, the template is copied and the sample
+# specific argument values are applied, avoiding processing the configuration files and building
+# the graph for each sample.
+class batch:
+  def __init__(self):
+
+    # Define errors.
+    self.errors = be.batchErrors()
+
+    # Store the name of the manifest file.
+    self.manifest = None
+
+    # Store the samples in the order they appear in the manifest.
+    self.samples = []
+
+    # The template superpipeline, graph and arguments objects.
+    self.template = None
+
+    # The name of the makefile that executes all of the samples.
+    self.filename = None
+
+  # Determine if a batch of samples is being processed.
+  def isBatch(self):
+    return True if self.manifest else False
+
+  # Read the batch manifest. This is either a json file or a tab delimited file.
+  def readManifest(self, filename):
+    self.manifest = filename
+    if not os.path.exists(filename): self.errors.noManifest(filename)
+
+    # Read the manifest based on the extension.
+    if filename.endswith('.json'): self.readJsonManifest(filename)
+    else: self.readTsvManifest(filename)
+
+    # Check that the manifest contains samples.
+    if not self.samples: self.errors.noSamples(filename)
+
+    # Check that the sample names are valid and unique.
+    names = []
+    for sample in self.samples:
+      if not sample.name or sample.name == 'all' or '/' in sample.name or len(sample.name.split()) != 1: self.errors.invalidSampleName(filename, sample.name)
+      if sample.name in names: self.errors.repeatedSample(filename, sample.name)
+      names.append(sample.name)
+
+  # Read a json manifest. The manifest is a list of dictionaries, each of which contains the arguments and
+  # values for a sample. The list can also be supplied as the value for the key 'samples'.
+  def readJsonManifest(self, filename):
+    try:
+      with open(filename) as filehandle: data = json.load(filehandle)
+    except: self.errors.invalidJsonManifest(filename)
+
+    # Get the list of samples.
+    if isinstance(data, dict): data = data['samples'] if 'samples' in data else None
+    if not isinstance(data, list): self.errors.invalidJsonManifest(filename)
+
+    # Loop over the samples.
+    for counter, information in enumerate(data):
+      if not isinstance(information, dict): self.errors.invalidJsonManifest(filename)
+      sample = sampleInformation(str(information['sample']) if 'sample' in information else str('sample' + str(counter + 1)))
+
+      # Store the arguments. Arguments can be given a single value or a list of values. Flags can be set
+      # using the value true. Arguments with the value false or null are omitted.
+      for argument in information:
+        if argument == 'sample': continue
+        if not argument.startswith('-'): self.errors.invalidColumn(filename, argument)
+        values = information[argument]
+        if values is True: sample.arguments[str(argument)] = [None]
+        elif values is False or values is None: continue
+        elif isinstance(values, list): sample.arguments[str(argument)] = [str(value) for value in values]
+        else: sample.arguments[str(argument)] = [str(values)]
+      self.samples.append(sample)
+
+  # Read a tab delimited manifest. The first line (ignoring lines beginning with '#') is a header listing the
+  # arguments (and optionally the column 'sample'). Each subsequent line provides the values for a sample. A
+  # cell can contain multiple values separated by whitespace, and cells left empty are omitted for the sample.
+  # Arguments for a task in the pipeline are supplied as they would be on the command line, e.g. [-a value].
+  def readTsvManifest(self, filename):
+    header = None
+    with open(filename) as filehandle:
+      for lineNumber, line in enumerate(filehandle):
+        line = line.rstrip('\n').rstrip('\r')
+        if not line.strip() or line.startswith('#'): continue
+        columns = line.split('\t')
+
+        # Read the header.
+        if not header:
+          header = [column.strip() for column in columns]
+          for column in header:
+            if column != 'sample' and not column.startswith('-'): self.errors.invalidColumn(filename, column)
+          continue
+
+        # Check that the row has a value for each column.
+        if len(columns) != len(header): self.errors.invalidRow(filename, lineNumber + 1, len(columns), len(header))
+        sample = sampleInformation(str('sample' + str(len(self.samples) + 1)))
+        for argument, value in zip(header, columns):
+          value = value.strip()
+          if argument == 'sample': sample.name = value
+          elif not value: continue
+          elif value.startswith('[') and value.endswith(']'): sample.arguments[argument] = [value[1:-1].strip()]
+          else: sample.arguments[argument] = value.split()
+        self.samples.append(sample)
+
+  # Store the superpipeline, graph and arguments objects to use as the template for all samples.
+  def setTemplate(self, superpipeline, graph, args):
+    self.template = deepcopy((superpipeline, graph, args))
+
+  # Return a copy of the template for a sample. Each sample requires a unique random string, since this is
+  # used to name intermediate files and the makefiles.
+  def getTemplate(self):
+    superpipeline, graph, args = deepcopy(self.template)
+    superpipeline.randomString = strOps.getRandomString(8)
+    return superpipeline, graph, args
+
+  # Generate the command line for a sample. The arguments supplied on the command line apply to all samples,
+  # and are overridden by any values supplied in the manifest. The sample name is used as the makefile id unless
+  # a makefile id is provided for the sample.
+  def getCommandLine(self, command, sample, gkno):
+    sampleCommand = deepcopy(command)
+
+    # Remove the batch manifest argument.
+    for argument in [gkno.options['GKNO-BATCH-MANIFEST'].longFormArgument, gkno.options['GKNO-BATCH-MANIFEST'].shortFormArgument]:
+      if argument in sampleCommand.arguments: del sampleCommand.arguments[argument]
+
+    # Add the sample arguments.
+    for argument in sample.arguments: sampleCommand.arguments[argument] = list(sample.arguments[argument])
+
+    # Set the makefile id.
+    if not gkno.getGknoArgument('GKNO-MAKEFILE-ID', sampleCommand.arguments):
+      sampleCommand.arguments[gkno.options['GKNO-MAKEFILE-ID'].longFormArgument] = [sample.name]
+
+    # Return the command line for the sample.
+    return sampleCommand
+
+  # Store information on the makefiles generated for a sample.
+  def addMakefiles(self, sample, make, filesExist):
+    sample.makefiles  = list(make.filenamesList)
+    sample.filesExist = filesExist
+    sample.isMultiple = make.isMultipleMakefiles
+
+  # Determine if all samples have all the required input files.
+  def allFilesExist(self):
+    for sample in self.samples:
+      if not sample.filesExist: return False
+    return True
+
+  # Write a makefile that executes the makefiles for all of the samples. Each sample is a target of the makefile,
+  # so samples are executed in parallel if make is run with multiple jobs. The makefile for a sample is deleted
+  # once the sample completes successfully, so if the batch is rerun, only the incomplete samples are executed.
+  def writeMakefile(self, pipeline, commitID, date, version, fingerprint):
+
+    # If multiple makefiles were generated for any sample, the order in which to execute the makefiles is not
+    # defined, so no makefile for the batch is generated.
+    for sample in self.samples:
+      if sample.isMultiple:
+        self.errors.noBatchMakefile()
+        return False
+
+    # Open the makefile.
+    self.filename = str(pipeline + '-batch.' + strOps.getRandomString(8) + '.make')
+    filehandle    = fh.fileHandling.openFileForWriting(self.filename)
+
+    # Add basic text about the gkno version.
+    print('### gkno batch makefile', file = filehandle)
+    print('### Generated using gkno version: ', version, ' (', date, ')', sep = '', file = filehandle)
+    print('### gkno commit: ', commitID, sep = '', file = filehandle)
+    print('### Pipeline: ', pipeline, sep = '', file = filehandle)
+    print('### Manifest: ', self.manifest, sep = '', file = filehandle)
+    for line in fingerprint.getHeader(): print(line, file = filehandle)
+    print(file = filehandle)
+    print('### Set the shell to bash.', file = filehandle)
+    print('SHELL=/bin/bash', file = filehandle)
+    print(file = filehandle)
+
+    # Define the samples as phony targets.
+    samples = [sample.name for sample in self.samples]
+    print('.PHONY: all ', ' '.join(samples), sep = '', file = filehandle)
+    print(file = filehandle)
+    print('all: ', ' '.join(samples), sep = '', file = filehandle)
+    print(file = filehandle)
+
+    # Add the makefile for each sample.
+    for sample in self.samples:
+      print('### Sample: ', sample.name, sep = '', file = filehandle)
+      print(sample.name, ':', sep = '', file = filehandle)
+      print('\t@if test -f ', sample.makefiles[0], '; then $(MAKE) -k --file ', sample.makefiles[0], '; fi', sep = '', file = filehandle)
+      print(file = filehandle)
+
+    # Close the file.
+    fh.fileHandling.closeFile(filehandle)
+    return True
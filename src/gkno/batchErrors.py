@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+from __future__ import print_function
+
+import errors
+from errors import *
+
+import os
+import sys
+
+class batchErrors:
+
+  # Initialise.
+  def __init__(self):
+
+    # Get general error writing and termination methods.
+    self.errors = errors()
+
+    # The error messages are stored in the following list.
+    self.text = []
+
+    # For a list of all error code values, see adminErrors.py.
+    self.errorCode = '16'
+
+  # The batch manifest file does not exist.
+  def noManifest(self, filename):
+    self.text.append('Unable to open batch manifest.')
+    self.text.append('The batch manifest \'' + filename + '\' supplied with the argument \'--batch-manifest (-bm)\' cannot be found. Please check ' + \
+    'the name of the file and the command line.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The json batch manifest could not be parsed.
+  def invalidJsonManifest(self, filename):
+
+    # Get additional error messages.
+    exc_type, exc_value, exc_traceback = sys.exc_info()
+
+    self.text.append('Invalid batch manifest.')
+    self.text.append('The batch manifest \'' + filename + '\' is not a valid json file. A json batch manifest must contain a list of samples, ' + \
+    'each of which is a dictionary of arguments and their values, or a dictionary containing this list under the key \'samples\'. The ' + \
+    'specific error raised is:')
+    self.text.append('\t')
+    self.text.append(str(exc_value) if exc_value else 'The file does not contain a list of samples.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A column in a tab delimited batch manifest is not an argument.
+  def invalidColumn(self, filename, column):
+    self.text.append('Invalid column in batch manifest.')
+    self.text.append('The header of the batch manifest \'' + filename + '\' contains the column \'' + column + '\'. Each column in the batch ' + \
+    'manifest must either be an argument (e.g. begin with \'-\') or be the column \'sample\', which provides the name of the sample. Please ' + \
+    'correct the batch manifest.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A row in a tab delimited batch manifest has the wrong number of columns.
+  def invalidRow(self, filename, lineNumber, numberOfColumns, expectedColumns):
+    self.text.append('Invalid row in batch manifest.')
+    self.text.append('Line ' + str(lineNumber) + ' of the batch manifest \'' + filename + '\' contains ' + str(numberOfColumns) + ' columns, but ' + \
+    'the header defines ' + str(expectedColumns) + ' columns. Every row in the batch manifest must have a value (which can be empty) for every ' + \
+    'column. Please correct the batch manifest.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The batch manifest contains no samples.
+  def noSamples(self, filename):
+    self.text.append('Empty batch manifest.')
+    self.text.append('The batch manifest \'' + filename + '\' does not contain any samples. Please check the batch manifest.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A sample name is invalid.
+  def invalidSampleName(self, filename, sample):
+    self.text.append('Invalid sample name in batch manifest.')
+    self.text.append('The batch manifest \'' + filename + '\' contains the sample \'' + sample + '\'. The sample name is included in the names ' + \
+    'of the generated makefiles and so cannot contain whitespace or the \'/\' character, and cannot be \'all\'. Please correct the batch manifest.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # Multiple samples have the same name.
+  def repeatedSample(self, filename, sample):
+    self.text.append('Repeated sample in batch manifest.')
+    self.text.append('The batch manifest \'' + filename + '\' contains the sample \'' + sample + '\' multiple times. Each sample must have a ' + \
+    'unique name, since the sample name is used to name the generated makefiles. Please correct the batch manifest.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The batch makefile cannot be generated if multiple makefiles were requested.
+  def noBatchMakefile(self):
+    self.text.append('No batch makefile generated.')
+    self.text.append('Multiple makefiles were requested for at least one sample in the batch. Makefiles have been generated for each sample, ' + \
+    'but a single makefile for executing all samples has not been generated, and the makefiles will need to be executed manually.')
+    self.errors.writeFormattedText(self.text, errorType = 'warning')
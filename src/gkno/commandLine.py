@@ -4,8 +4,6 @@ from __future__ import print_function
 
 import commandLineErrors
 from commandLineErrors import *
-import dataConsistency
-import graph as gr
 import stringOperations as strOps
 
 import json
@@ -107,6 +105,9 @@ class commandLine:
   def determineMode(self, isAdmin, gkno):
     if isAdmin: return 'admin'
 
+    # Check if a summary of task profiles was requested.
+    if self.commands and self.commands[0] == 'profile-report': return 'profile report'
+
     # Check if json files for the web page were requested.
     if gkno.getGknoArgument('GKNO-WEB', self.arguments): return 'web'
 
@@ -170,6 +171,10 @@ class commandLine:
   # Process the command line arguments.
   def processArguments(self, superpipeline, args, gkno):
 
+    # The modules for checking data consistency are only imported when a pipeline is built, so that the command line
+    # can be processed quickly in help modes.
+    import dataConsistency
+
     # Get the name of the top level pipeline.
     pipeline = superpipeline.pipeline
 
@@ -304,16 +309,15 @@ class commandLine:
         for linkedNodeId in graph.graph.predecessors(task):
           if linkedArguments[nodeId] == graph.getArgumentAttribute(linkedNodeId, task, 'longFormArgument'): break
 
-        # Use the linkedArgumentValues as a reference list and order the values in argumentValues to be most
-        # similar to the reference list,
-        referenceList = graph.getGraphNodeAttribute(linkedNodeId, 'values')
-        queryList     = []
-        for value in referenceList: queryList.append(strOps.findMostSimilar(argumentValues, value))
+        # Use the linkedArgumentValues as a reference list and order the values in argumentValues to pair with the
+        # values in the reference list.
+        referenceList        = graph.getGraphNodeAttribute(linkedNodeId, 'values')
+        queryList, ambiguous = strOps.pairValues(argumentValues, referenceList)
 
-        # If reordering has taken place, store the values so that the user can be warned. Update the graph to
-        # include the reordered list.
-        if queryList != argumentValues:
-          self.reorderedLists.append((task, nodeId, linkedNodeId, argumentValues, queryList, referenceList))
+        # If reordering has taken place, or some values could not be unambiguously paired, store the values so that
+        # the user can be warned. Update the graph to include the reordered list.
+        if queryList != argumentValues or ambiguous:
+          self.reorderedLists.append((task, nodeId, linkedNodeId, argumentValues, queryList, referenceList, ambiguous))
           graph.setGraphNodeAttribute(nodeId, 'values', queryList)
         
   # Determine the name (if any) of the requested parameter set.
@@ -402,6 +406,9 @@ class commandLine:
   def associateArgumentsWithGraphNodes(self, graph, superpipeline):
     associatedNodes = []
 
+    # The graph module (and networkx) is only imported when a pipeline is built.
+    import graph as gr
+
     # Loop over all the arguments supplied to individual tasks.
     for taskAddress in self.taskArguments:
       for argument in self.taskArguments[taskAddress]:
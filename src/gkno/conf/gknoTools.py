@@ -7,7 +7,6 @@ import os
 import subprocess
 import sys
 import tarfile
-import urllib
 
 ##################################################################
 # IMPORTANT: To add a new built-in tool, create a subclass
@@ -33,6 +32,15 @@ class GknoTool(object):
     #   So 'git submodule add ... tools/X' means this installDir = "X"
     self.installDir = ""
 
+    # The names of any tools that must be built before this tool can be built (e.g. libraries that the tool
+    # is compiled against).
+    self.dependencies = []
+
+    # The number of jobs used to build the tool. If this is not set, the tool is built with as many jobs as are
+    # available (set in self.cpus).
+    self.jobs = None
+    self.cpus = multiprocessing.cpu_count()
+
     # Default output destinations
     self.out = sys.stdout
     self.err = sys.stderr
@@ -131,8 +139,8 @@ class GknoTool(object):
   def cmake(self, optionString=""):
     return self.runCommand("cmake " + optionString)
 
-  def make(self, optionString="", cpus = multiprocessing.cpu_count()):
-    return self.runCommand("make -j" + str(cpus) + " " + optionString)
+  def make(self, optionString="", cpus = None):
+    return self.runCommand("make -j" + str(cpus if cpus else self.cpus) + " " + optionString)
 
   def makeClean(self):
     return self.runCommand("make clean")
@@ -183,8 +191,10 @@ class BamTools(GknoTool):
 class BamUtil(GknoTool):
   def __init__(self):
     super(BamUtil, self).__init__()
-    self.name       = "bamUtil"
-    self.installDir = "bamUtil"
+    self.name         = "bamUtil"
+    self.installDir   = "bamUtil"
+    self.dependencies = ["libStatGen"]
+    self.jobs         = 1
 
   # $ make -j N   
   def doBuild(self):
@@ -202,6 +212,7 @@ class Bedtools(GknoTool):
     super(Bedtools, self).__init__()
     self.name       = "bedtools"
     self.installDir = "bedtools"
+    self.jobs       = 1
 
   # Initial tool build.
   def doBuild(self): return self.make(cpus = 1)
@@ -217,6 +228,7 @@ class Blast(GknoTool):
     super(Blast, self).__init__()
     self.name       = "blast"
     self.installDir = "blast"
+    self.jobs       = 1
 
   def doBuild(self):
 
@@ -237,7 +249,9 @@ class Blast(GknoTool):
         key='linux_64'
     url = blastSettings[key]
 
-    # Download tarball, extract contents, then erase tarball.
+    # Download tarball, extract contents, then erase tarball. urllib is only imported when required, so that gkno
+    # starts quickly.
+    import urllib
     try:
       filename, headers = urllib.urlretrieve(url) 
       tar = tarfile.open(filename)
@@ -287,8 +301,10 @@ class Bwa(GknoTool):
 class FastQValidator(GknoTool):
   def __init__(self):
     super(FastQValidator, self).__init__()
-    self.name       = "fastQValidator"
-    self.installDir = "fastQValidator"
+    self.name         = "fastQValidator"
+    self.installDir   = "fastQValidator"
+    self.dependencies = ["libStatGen"]
+    self.jobs         = 1
 
   # $ make -j N   
   def doBuild(self):
@@ -382,6 +398,7 @@ class LibStatGen(GknoTool):
     super(LibStatGen, self).__init__()
     self.name       = "libStatGen"
     self.installDir = "libStatGen"
+    self.jobs       = 1
 
   # $ make -j N  
   def doBuild(self):    
@@ -451,6 +468,7 @@ class Picard(GknoTool):
     super(Picard, self).__init__()
     self.name       = "picard"
     self.installDir = "picard"
+    self.jobs       = 1
 
   # $ ant clean
   # $ ant sam-jar
@@ -471,8 +489,10 @@ class Picard(GknoTool):
 class Pindel(GknoTool):
   def __init__(self):
     super(Pindel, self).__init__()
-    self.name       = "pindel"
-    self.installDir = "pindel"
+    self.name         = "pindel"
+    self.installDir   = "pindel"
+    self.dependencies = ["samtools"]
+    self.jobs         = 1
 
   def doBuild(self):
     return self.install(optionString = '../samtools')
@@ -486,8 +506,10 @@ class Pindel(GknoTool):
 class Qplot(GknoTool):
   def __init__(self):
     super(Qplot, self).__init__()
-    self.name       = "qplot"
-    self.installDir = "qplot"
+    self.name         = "qplot"
+    self.installDir   = "qplot"
+    self.dependencies = ["libStatGen"]
+    self.jobs         = 1
 
   # $ make clean
   # $ make -j N
@@ -538,8 +560,9 @@ class Samblaster(GknoTool):
 class Samtools(GknoTool):
   def __init__(self):
     super(Samtools, self).__init__()
-    self.name       = "samtools"
-    self.installDir = "samtools"
+    self.name         = "samtools"
+    self.installDir   = "samtools"
+    self.dependencies = ["htslib"]
  
   # $ make clean
   # $ make -j N
@@ -583,6 +606,7 @@ class SnpEff(GknoTool):
     super(SnpEff, self).__init__()
     self.name       = "snpEff"
     self.installDir = "snpEff"
+    self.jobs       = 1
 
   # $ make clean
   # $ make -j N
@@ -627,6 +651,7 @@ class Tangram(GknoTool):
     super(Tangram, self).__init__()
     self.name       = "tangram"
     self.installDir = "Tangram/src"
+    self.jobs       = 1
 
   # $ make -j N  
   def doBuild(self):    
@@ -659,8 +684,10 @@ class VcfLib(GknoTool):
 class VerifyBamID(GknoTool):
   def __init__(self):
     super(VerifyBamID, self).__init__()
-    self.name       = "verifyBamID"
-    self.installDir = "verifyBamID"
+    self.name         = "verifyBamID"
+    self.installDir   = "verifyBamID"
+    self.dependencies = ["libStatGen"]
+    self.jobs         = 1
 
   # $ make clean
   # $ make -j N
@@ -710,7 +737,10 @@ class Wham(GknoTool):
 # These tools are listed in alphabetical order with the
 # exception of bamUtil.  This requires that libStatGen is
 # already compiled and so follows it in the list.  Please
-# ensure that this order is not modified.
+# ensure that this order is not modified. Tools that are
+# required to build other tools must also be listed in the
+# dependencies of those tools, so that they are built first
+# when tools are built concurrently.
 ##############################################################
 
 List = [ 
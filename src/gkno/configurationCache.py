@@ -0,0 +1,285 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import cPickle as pickle
+import hashlib
+import os
+import tempfile
+
+# The modules defining and validating the cached tool and pipeline configuration objects. A hash of the source of
+# these modules is included in the version of each cache entry, so that entries generated before any of these
+# modules changed (and so could have different attributes, or have been validated differently) are not used.
+sourceModules = ['configurationCache', 'generalConfigurationFileMethods', 'parameterSets', 'pipelineConfiguration', 'slottedAttributes',
+                 'stringOperations', 'toolConfiguration']
+
+# Define a data structure for holding a cached configuration object along with the information
+# required to determine if the cached object is still valid.
+class cacheEntry:
+  def __init__(self):
+
+    # The version of gkno that generated the entry. Entries generated by a different version of gkno
+    # are ignored, since the validation performed on the configuration files may have changed.
+    self.version = None
+
+    # The absolute path of the configuration file that was processed.
+    self.filename = None
+
+    # The modification time and size of the configuration file when the entry was generated. If these
+    # are unchanged, the configuration file is assumed to be unchanged.
+    self.modificationTime = None
+    self.size             = None
+
+    # A hash of the configuration file contents. If the modification time has changed (e.g. the file was
+    # touched or checked out again), the contents are hashed and compared with this value.
+    self.contentHash = None
+
+    # The validated tool or pipeline configuration object.
+    self.data = None
+
+# Define a data structure for holding the information about a pipeline that is required to list the available
+# pipelines. This is stored in the pipeline index, so that the pipeline configuration files do not need to be
+# processed when listing pipelines.
+class pipelineSummary:
+  def __init__(self):
+
+    # The modification time and size of the pipeline configuration file when the summary was generated.
+    self.modificationTime = None
+    self.size             = None
+
+    # The name of the pipeline and whether the configuration file was successfully processed.
+    self.name    = None
+    self.success = False
+
+    # The pipeline description and categories and whether the pipeline is in development.
+    self.description   = None
+    self.categories    = []
+    self.isDevelopment = False
+
+# Define a class for storing validated tool and pipeline configuration objects on disk. Each run of gkno
+# otherwise reads and validates every tool and pipeline configuration file used by the pipeline. The cache
+# is keyed by the absolute path of the configuration file, so a configuration file in a user defined
+# configuration file directory is cached independently of a gkno configuration file with the same name.
+class configurationCache:
+  def __init__(self, path, version):
+
+    # Store the path of the directory holding the cached objects and the gkno version (including the hash of the
+    # source of the configuration modules).
+    self.path    = path
+    self.version = str(version) + '.' + self.getSourceHash()
+
+    # Record whether the cache can be used. If the cache directory cannot be created (for example, gkno is
+    # installed in a read only location), the configuration files are processed as normal.
+    self.isEnabled = self.createCacheDirectory()
+
+    # Keep track of the number of configuration files read from, and added to, the cache.
+    self.hits   = 0
+    self.misses = 0
+
+  # Return a hash of the source of the modules defining the cached objects. If the source of a module cannot be read,
+  # its name is used, so the cache is still invalidated if the module is later found.
+  def getSourceHash(self):
+    sourceHash = hashlib.md5()
+    for module in sourceModules:
+      filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), module + '.py')
+      try:
+        filehandle = open(filename, 'rb')
+        try: sourceHash.update(filehandle.read())
+        finally: filehandle.close()
+      except: sourceHash.update(module)
+    return sourceHash.hexdigest()
+
+  # Create the directory holding the cached objects if it doesn't exist.
+  def createCacheDirectory(self):
+    try:
+      if not os.path.exists(self.path): os.makedirs(self.path)
+    except: return False
+
+    # Return whether it is possible to write to the cache.
+    return os.access(self.path, os.W_OK)
+
+  # Return the validated configuration data for a tool. If a valid entry exists in the cache, the data are
+  # returned without reading or validating the configuration file.
+  def getToolConfiguration(self, tool, filename):
+    data = self.read('tool', filename)
+    if not data:
+
+      # The configuration modules are only imported on a cache miss, so that gkno starts quickly.
+      import toolConfiguration
+      data = toolConfiguration.toolConfiguration()
+      data.getConfigurationData(tool, filename)
+      self.write('tool', filename, data)
+
+    # Return the configuration data.
+    return data
+
+  # Return the validated configuration data for a pipeline.
+  def getPipelineConfiguration(self, filename):
+    data = self.read('pipeline', filename)
+    if not data:
+      import pipelineConfiguration
+      data = pipelineConfiguration.pipelineConfiguration()
+      data.getConfigurationData(filename)
+      self.write('pipeline', filename, data)
+
+    # Return the configuration data.
+    return data
+
+  # Read an object from the cache. If there is no entry for this file, or the entry is invalid, return None.
+  def read(self, configurationType, filename):
+    if not self.isEnabled: return None
+
+    # Get information on the configuration file. If this fails, the configuration file cannot be used, so let
+    # the standard processing handle the error.
+    try: information = os.stat(filename)
+    except: return None
+
+    # Open the cache entry. Any failure (e.g. no entry, or an entry truncated by a concurrent gkno run) is
+    # treated as a cache miss.
+    entryFilename = self.getEntryFilename(configurationType, filename)
+    try:
+      filehandle = open(entryFilename, 'rb')
+      try: entry = pickle.load(filehandle)
+      finally: filehandle.close()
+    except:
+      self.misses += 1
+      return None
+
+    # Check that the entry was generated by this version of gkno for this file.
+    if entry.version != self.version or entry.filename != os.path.abspath(filename):
+      self.misses += 1
+      return None
+
+    # If the modification time or size have changed, check whether the contents have changed. If not, update
+    # the entry with the new modification time, so that the contents need not be hashed next time.
+    if entry.modificationTime != information.st_mtime or entry.size != information.st_size:
+      if entry.contentHash != self.getContentHash(filename):
+        self.misses += 1
+        return None
+      entry.modificationTime = information.st_mtime
+      entry.size             = information.st_size
+      self.writeEntry(entryFilename, entry)
+
+    # Return the cached object.
+    self.hits += 1
+    return entry.data
+
+  # Write an object to the cache.
+  def write(self, configurationType, filename, data):
+    if not self.isEnabled: return
+
+    # Only cache data that were successfully validated.
+    if not data.success: return
+
+    # Get information on the configuration file.
+    try: information = os.stat(filename)
+    except: return
+
+    # Build the entry.
+    entry                  = cacheEntry()
+    entry.version          = self.version
+    entry.filename         = os.path.abspath(filename)
+    entry.modificationTime = information.st_mtime
+    entry.size             = information.st_size
+    entry.contentHash      = self.getContentHash(filename)
+    entry.data             = data
+
+    # Write the entry.
+    self.writeEntry(self.getEntryFilename(configurationType, filename), entry)
+
+  # Write an entry to the cache. The entry is written to a temporary file and then moved into place, so that
+  # simultaneous executions of gkno never read a partially written entry.
+  def writeEntry(self, entryFilename, entry):
+    try:
+      descriptor, temporaryFilename = tempfile.mkstemp(dir = self.path, prefix = '.tmp.')
+      filehandle                    = os.fdopen(descriptor, 'wb')
+      try: pickle.dump(entry, filehandle, pickle.HIGHEST_PROTOCOL)
+      finally: filehandle.close()
+      os.rename(temporaryFilename, entryFilename)
+
+    # Failing to write to the cache is not an error, the configuration file will just be processed again next
+    # time. Remove the temporary file if it was created.
+    except:
+      try: os.remove(temporaryFilename)
+      except: pass
+
+  # Return a summary of each pipeline configuration file in a directory, keyed by the pipeline configuration file name.
+  # The summaries are stored in an index, which is updated whenever configuration files are added to, modified
+  # in, or removed from the directory. Only new or modified configuration files are processed.
+  def getPipelineIndex(self, path):
+    entryFilename = self.getEntryFilename('index', path)
+
+    # Read the existing index. Any failure results in the index being regenerated.
+    index = {}
+    try:
+      filehandle = open(entryFilename, 'rb')
+      try: entry = pickle.load(filehandle)
+      finally: filehandle.close()
+      if entry.version == self.version and entry.filename == os.path.abspath(path): index = entry.data
+    except: pass
+
+    # Check each configuration file in the directory against the index.
+    isModified = False
+    summaries  = {}
+    for filename in os.listdir(path):
+      if not filename.endswith('.json'): continue
+      try: information = os.stat(os.path.join(path, filename))
+      except: continue
+      summary = index.get(filename)
+      if not summary or summary.modificationTime != information.st_mtime or summary.size != information.st_size:
+        summary                  = self.getPipelineSummary(os.path.join(path, filename))
+        summary.modificationTime = information.st_mtime
+        summary.size             = information.st_size
+        isModified               = True
+      summaries[filename] = summary
+
+    # If any configuration files were added, modified or removed, write the updated index.
+    if self.isEnabled and (isModified or len(summaries) != len(index)):
+      entry          = cacheEntry()
+      entry.version  = self.version
+      entry.filename = os.path.abspath(path)
+      entry.data     = summaries
+      self.writeEntry(entryFilename, entry)
+
+    # Return the summaries.
+    return summaries
+
+  # Remove all entries from the cache.
+  def clear(self):
+    if not self.isEnabled: return
+    for filename in os.listdir(self.path):
+      if filename.endswith('.cache'):
+        try: os.remove(os.path.join(self.path, filename))
+        except: pass
+
+  # Define the name of the cache entry for a configuration file.
+  def getEntryFilename(self, configurationType, filename):
+    key = hashlib.md5(os.path.abspath(filename)).hexdigest()
+    return os.path.join(self.path, str(configurationType + '.' + key + '.cache'))
+
+  ######################
+  ### Static methods ###
+  ######################
+
+  # Process a pipeline configuration file and return the information required to list the pipeline. Errors in the
+  # configuration file do not terminate gkno, the pipeline is just marked as having failed.
+  @staticmethod
+  def getPipelineSummary(filename):
+    import pipelineConfiguration
+    pipeline              = pipelineConfiguration.pipelineConfiguration(allowTermination = False)
+    summary               = pipelineSummary()
+    summary.success       = pipeline.getConfigurationData(filename)
+    summary.name          = str(pipeline.name)
+    summary.description   = pipeline.description
+    summary.categories    = [str(category) for category in pipeline.categories]
+    summary.isDevelopment = pipeline.isDevelopment
+
+    # Return the summary.
+    return summary
+
+  # Return a hash of the contents of a file.
+  @staticmethod
+  def getContentHash(filename):
+    filehandle = open(filename, 'rb')
+    try: return hashlib.md5(filehandle.read()).hexdigest()
+    finally: filehandle.close()
@@ -2,17 +2,64 @@
 
 from __future__ import print_function
 from copy import deepcopy
+from functools import partial
+from itertools import chain
+from operator import add
 
 import dataConsistencyErrors as er
+import listValues as lv
 import superpipeline
 
 import json
 import os
 import sys
 
+# Define a class holding the rules for checking the values supplied to an argument (the data type and the allowed
+# extensions). The rules are compiled once for each distinct set of rules and shared by all arguments using them. The
+# allowed extensions are stored as a set of suffixes, along with the lengths of the suffixes, so checking a value only
+# requires a set lookup for each distinct length, rather than comparing the value with every extension.
+class valueValidator(object):
+  def __init__(self, dataType, extensions):
+    self.dataType   = dataType
+    self.extensions = extensions
+
+    # If no extensions are given, or the extensions are not known (e.g. are listed as 'no extension'), the extensions
+    # are not checked. An empty extension matches all values.
+    if not extensions or (len(extensions) == 1 and extensions[0] == 'no extension') or '' in extensions: self.suffixes = None
+    else:
+      self.suffixes = set(extensions)
+      self.lengths  = sorted(set([len(extension) for extension in extensions]))
+
+  # Check that the file extension is valid.
+  def isValidExtension(self, value):
+    if self.suffixes == None: return True
+    for length in self.lengths:
+      if value[-length:] in self.suffixes: return True
+
+    # Otherwise, return False,
+    return False
+
+# Store the compiled validators, keyed by the rules they check.
+validators = {}
+
+# Return the validator for the values associated with an edge. If the edge is a link only, there are no values to check
+# and None is returned. The extensions are not checked for stubs.
+def getValidator(graph, source, target, nodeType):
+  attributes = graph.getEdgeAttributes(source, target)
+  if not attributes or attributes.isLinkOnly: return None
+  extensions = tuple(attributes.extensions) if nodeType == 'file' and not attributes.isStub and attributes.extensions else None
+  key        = (attributes.dataType, extensions)
+  if key not in validators: validators[key] = valueValidator(attributes.dataType, extensions)
+
+  # Return the validator.
+  return validators[key]
+
 # Loop over all of the nodes in a graph and check that the values associated with it
 # are of the correct type and have extensions consistent with all of the arguments
-# attached to the node.
+# attached to the node. The values of each node are stored along with the validators
+# they have been checked against, so that when the values are checked again (after
+# filenames have been constructed), values are only checked against validators they
+# have not already been checked against.
 def checkValues(graph, superpipeline):
 
   # First, loop over all of the option nodes and check that the data types for all values
@@ -23,18 +70,35 @@ def checkValues(graph, superpipeline):
 
     # Determine if the node values are commands to evaluate at run time. If so, do not perform these checks.
     if not graph.getGraphNodeAttribute(nodeId, 'isCommandToEvaluate'):
+      checkedValidators = getCheckedValidators(graph, nodeId, values)
 
       # Get all of the arguments that use this node and check the data types. Start with all predecessors to this node.
       expectedDataType = None
       for predecessorNodeId in graph.getPredecessors(nodeId):
-        expectedDataType = checkNode(graph, superpipeline, predecessorNodeId, nodeId, nodeType, expectedDataType, values, isInput = False)
+        validator        = getValidator(graph, predecessorNodeId, nodeId, nodeType)
+        expectedDataType = checkNode(graph, superpipeline, predecessorNodeId, nodeId, validator, expectedDataType, values, checkedValidators, isInput = False)
 
       expectedDataType = None
       for successorNodeId in graph.getSuccessors(nodeId):
-        expectedDataType = checkNode(graph, superpipeline, nodeId, successorNodeId, nodeType, expectedDataType, values, isInput = True)
+        validator        = getValidator(graph, nodeId, successorNodeId, nodeType)
+        expectedDataType = checkNode(graph, superpipeline, nodeId, successorNodeId, validator, expectedDataType, values, checkedValidators, isInput = True)
+
+      # Store the checked values. Lists of values read from a file cannot be modified, so are not copied.
+      graph.checkedValues[nodeId] = (values if isinstance(values, lv.listValues) else list(values or []), checkedValidators)
+
+# Return the validators that the values of a node have already been checked against. If the values have changed since
+# the node was last checked, the values have not been checked against any validators.
+def getCheckedValidators(graph, nodeId, values):
+  if nodeId not in graph.checkedValues: return set()
+  checkedValues, checkedValidators = graph.checkedValues[nodeId]
+  if isinstance(values, lv.listValues) or isinstance(checkedValues, lv.listValues): isUnchanged = checkedValues is values
+  else: isUnchanged = checkedValues == list(values or [])
+
+  # Return the validators.
+  return checkedValidators if isUnchanged else set()
 
 # Check the values for a node.
-def checkNode(graph, superpipeline, source, target, nodeType, expectedDataType, values, isInput):
+def checkNode(graph, superpipeline, source, target, validator, expectedDataType, values, checkedValidators, isInput):
  
   # Define error handling,
   errors = er.consistencyErrors()
@@ -42,15 +106,11 @@ def checkNode(graph, superpipeline, source, target, nodeType, expectedDataType,
   # Get pipeline configuration data.
   data = superpipeline.pipelineConfigurationData[superpipeline.pipeline]
 
-  # Get the required attributes.
-  longFormArgument = graph.CM_getArgumentAttribute(graph.graph, source, target, 'longFormArgument')
-  dataType         = graph.CM_getArgumentAttribute(graph.graph, source, target, 'dataType')
-
   # Check if this edge hgas been marked as a link only. This occurs when a nodes values are constructed using values from
   # another node. An edge is included to ensure that the workflow and dependencies are correct, but there will be no
   # argument associated with the edge and the following checks are not required.
-  isLinkOnly = graph.CM_getArgumentAttribute(graph.graph, source, target, 'isLinkOnly')
-  if not isLinkOnly:
+  if validator:
+    dataType = validator.dataType
 
     # If this is the first argument parsed, populate the expectedDataType variable with the data type for this argument.
     if not expectedDataType: expectedDataType = dataType
@@ -59,36 +119,36 @@ def checkNode(graph, superpipeline, source, target, nodeType, expectedDataType,
     # arguments using the same values expect different data types. This is clearly impossible, so terminate.
     #TODO ERROR
     elif expectedDataType != dataType: print('dataConsistency.checkNode - 1', dataType, expectedDataType); exit(0)
+
+    # If the values have already been checked against the rules for this argument, the values do not need to be checked.
+    if validator in checkedValidators: return expectedDataType
+    checkedValidators.add(validator)
   
     # Loop over each of the values for this node.
     for value in values:
   
       # Check that the data type is correct.
       #TODO ERROR
-      if not isCorrectDataType(value, expectedDataType): print('dataConsistency.checkNode - 2', longFormArgument, value, dataType, type(value)); exit(0)
-  
-      # If this is a file, check that the extension is valid. Do not perform this check for stubs.
-      if nodeType == 'file':
-        if not graph.CM_getArgumentAttribute(graph.graph, source, target, 'isStub'):
-          extensions = graph.CM_getArgumentAttribute(graph.graph, source, target, 'extensions')
-  
-          # Not all files have specified extensions. If no extensions are supplied, this check should not be performed.
-          if extensions:
-            task       = target if isInput else source
-            fileNodeId = source if isInput else target
+      if not isCorrectDataType(value, expectedDataType):
+        longFormArgument = graph.CM_getArgumentAttribute(graph.graph, source, target, 'longFormArgument')
+        print('dataConsistency.checkNode - 2', longFormArgument, value, dataType, type(value)); exit(0)
   
-            # Fail if there was an error.
-            if not checkExtensions(value, extensions):
+      # If this is a file, check that the extension is valid. Stubs, and files without specified extensions, have no
+      # suffixes to check.
+      if not validator.isValidExtension(value):
+        task             = target if isInput else source
+        longFormArgument = graph.CM_getArgumentAttribute(graph.graph, source, target, 'longFormArgument')
+        extensions       = list(validator.extensions)
   
-              # Check if a top level pipeline argument exists.
-              if longFormArgument in data.longFormArguments.keys():
-                shortFormArgument = data.longFormArguments[longFormArgument].shortFormArgument
-                errors.invalidExtensionPipeline(longFormArgument, shortFormArgument, value, extensions)
+        # Check if a top level pipeline argument exists.
+        if longFormArgument in data.longFormArguments.keys():
+          shortFormArgument = data.longFormArguments[longFormArgument].shortFormArgument
+          errors.invalidExtensionPipeline(longFormArgument, shortFormArgument, value, extensions)
   
-              # If no pipeline argument exists for this argument, list the task and argument.
-              else:
-                shortFormArgument = graph.CM_getArgumentAttribute(graph.graph, source, target, 'shortFormArgument')
-                errors.invalidExtension(task, longFormArgument, shortFormArgument, value, extensions)
+        # If no pipeline argument exists for this argument, list the task and argument.
+        else:
+          shortFormArgument = graph.CM_getArgumentAttribute(graph.graph, source, target, 'shortFormArgument')
+          errors.invalidExtension(task, longFormArgument, shortFormArgument, value, extensions)
 
     # Return the expected data type
     return expectedDataType
@@ -131,19 +191,6 @@ def isCorrectDataType(value, dataType):
   # If none of the above conditions were met, the data type is incorrect.
   return False
 
-# Check that the file extension is valid.
-def checkExtensions(value, extensions):
-
-  # If the extensions are not known (e.g. are listed as 'no extension') do not perform this check.
-  if len(extensions) == 1 and extensions[0] == 'no extension': return True
-
-  # If the value ends with any of the extensions, return True.
-  for extension in extensions:
-    if value.endswith(extension): return True
-
-  # Otherwise, return False,
-  return False
-
 # Loop over all tasks in the pipeline and check that all required values (excepting output files
 # which can be constructed) have been defined.
 def checkRequiredArguments(graph, superpipeline, args, isTerminate):
@@ -434,50 +481,51 @@ def setFilePaths(graph, gknoArguments, gkno):
       target = nodeId
 
     # Determine if this is a stub,
-    isStub = graph.getArgumentAttribute(source, target, 'isStub')
-    if isStub: stubExtension = graph.getArgumentAttribute(source, target, 'stubExtension')
+    isStub        = graph.getArgumentAttribute(source, target, 'isStub')
+    stubExtension = graph.getArgumentAttribute(source, target, 'stubExtension') if isStub else None
 
     # Determine if a file location is set for the argument. If so, add this location to the node.
     fileLocation = graph.getArgumentAttribute(source, target, 'fileLocation')
  
-    # Get the values associated with the node.
-    updatedValues = []
-    for value in graph.getGraphNodeAttribute(nodeId, 'values'):
-
-      # Update the value to include the extension, if this is a stub (if necessary).
-      if isStub and not value.endswith(stubExtension):
-        modifiedValue = str(value + stubExtension) if '.' in stubExtension else str(value + '.' + stubExtension)
-      else: modifiedValue = value
-
-      # Check if the value already has a path. If not, add the input or output path. If the path
-      # was defined by the user on the command line, override any path that is already present
-      # with that supplied. In addition, store all of the input files. Since these are specifically
-      # defined as files that are not created by any task in the pipeline, these files need to exist
-      # in order for the pipeline to run.
-      if isInput:
-
-        # If a file location is specified with the argument, the value should not have the path altered, but
-        # the file location should be stored. This will be used to define where the file should exist in the
-        # makefile, but will not appear in the value on the command line.
-        if fileLocation:
-          graph.setGraphNodeAttribute(nodeId, 'fileLocation', fileLocation)
-          updatedValue = str(value)
-
-        # Override the path if necessary.
-        elif definedInputPath: updatedValue = str(inputPath + modifiedValue.split('/')[-1])
-        else: updatedValue = str(modifiedValue) if '/' in modifiedValue else str(inputPath + modifiedValue)
-        updatedValues.append(updatedValue)
-
-        # Add the input files to the list of input files required by the pipeline. These will be checked to ensure
-        # that they exist prior to pipeline execution.
-        if fileLocation: inputFiles.append(str(fileLocation + updatedValue))
-        else: inputFiles.append(updatedValue)
-      else:
-        if definedOutputPath: updatedValues.append(str(outputPath + modifiedValue.split('/')[-1]))
-        else: updatedValues.append(str(modifiedValue) if '/' in modifiedValue else str(outputPath + modifiedValue))
+    # If a file location is specified with the argument, the value should not have the path altered, but the file
+    # location should be stored. This will be used to define where the file should exist in the makefile, but will
+    # not appear in the value on the command line.
+    if isInput and fileLocation: graph.setGraphNodeAttribute(nodeId, 'fileLocation', fileLocation)
+
+    # Update the values associated with the node. If the values were supplied in a list, the values are only updated
+    # as they are read, so the values are not all held in memory.
+    values = graph.getGraphNodeAttribute(nodeId, 'values')
+    update = partial(getFilePath, isInput = isInput, isStub = isStub, stubExtension = stubExtension, fileLocation = fileLocation, \
+    inputPath = inputPath, outputPath = outputPath, definedInputPath = definedInputPath, definedOutputPath = definedOutputPath)
+    if isinstance(values, lv.listValues): updatedValues = values.apply(update)
+    else: updatedValues = [update(value) for value in values]
+
+    # Store all of the input files. Since these are specifically defined as files that are not created by any task in
+    # the pipeline, these files need to exist in order for the pipeline to run.
+    if isInput:
+      if not fileLocation: inputFiles.append(updatedValues)
+      elif isinstance(updatedValues, lv.listValues): inputFiles.append(updatedValues.apply(partial(add, str(fileLocation))))
+      else: inputFiles.append([str(fileLocation + value) for value in updatedValues])
 
     # Replace the values stored in the node with the values including the absolute path.
     graph.setGraphNodeAttribute(nodeId, 'values', updatedValues)
 
-  # Return the list of all required input files.
-  return inputFiles
+  # Return all of the required input files.
+  return chain.from_iterable(inputFiles)
+
+# Return the value of a file including the path (and the extension, if this is a stub).
+def getFilePath(value, isInput, isStub, stubExtension, fileLocation, inputPath, outputPath, definedInputPath, definedOutputPath):
+
+  # Update the value to include the extension, if this is a stub (if necessary).
+  if isStub and not value.endswith(stubExtension):
+    modifiedValue = str(value + stubExtension) if '.' in stubExtension else str(value + '.' + stubExtension)
+  else: modifiedValue = value
+
+  # Check if the value already has a path. If not, add the input or output path. If the path was defined by the
+  # user on the command line, override any path that is already present with that supplied.
+  if isInput:
+    if fileLocation: return str(value)
+    elif definedInputPath: return str(inputPath + modifiedValue.split('/')[-1])
+    else: return str(modifiedValue) if '/' in modifiedValue else str(inputPath + modifiedValue)
+  elif definedOutputPath: return str(outputPath + modifiedValue.split('/')[-1])
+  else: return str(modifiedValue) if '/' in modifiedValue else str(outputPath + modifiedValue)
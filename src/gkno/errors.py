@@ -3,9 +3,6 @@
 from __future__ import print_function
 from errno import errorcode
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import os
 import sys
 
@@ -1,11 +1,11 @@
 #!/bin/bash/python
 
 from __future__ import print_function
+from distutils.spawn import find_executable
 from subprocess import Popen, PIPE
 
 import json
 import os
-import subprocess
 import sys
 
 import errors as er
@@ -20,10 +20,12 @@ class executables:
     self.errors = er.errors()
 
   # Check that all required executables exist.
-  def checkExecutables(self, toolPath, superpipeline, builtTools):
+  def checkExecutables(self, toolPath, superpipeline, admin, threads = fh.fileHandling.fileCheckThreads):
+    builtTools           = admin.userSettings['compiled tools']
     missingCompiledTools = []
     missingExecutables   = []
-    missingRPackages     = []
+    executables          = []
+    rPackages            = []
     success              = True
 
     # Loop over all tools used in the pipeline.
@@ -35,9 +37,6 @@ class executables:
       # Get the list of equired compiled tools.
       tools = toolData.requiredCompiledTools
 
-      # Get a list of required R packages.
-      rPackages = toolData.rPackages
-
       # Get the exectuable for the tool.
       path       = toolData.path
       executable = toolData.executable
@@ -53,15 +52,22 @@ class executables:
       elif executable == 'none': executable = None
       else:
         executable = str(toolPath + '/' + path + '/' + toolData.executable)
-        if not os.path.exists(executable):
-          missingExecutables.append((str(executable), str(tool)))
-          success = False
+        executables.append((executable, str(tool)))
 
-      # If thie pipeline requires any R packages to be installed, ensure that they are.
-      for package in rPackages:
-        if not self.checkRPackage(package) and (package not in missingRPackages) and (package != ''):
-          missingRPackages.append(str(package))
-          success = False
+      # Get a list of required R packages.
+      for package in toolData.rPackages:
+        if (package not in rPackages) and (package != ''): rPackages.append(str(package))
+
+    # Check that the executables for all of the tools exist.
+    missingFiles = fh.fileHandling.getMissingFiles([executable for executable, tool in executables], threads)
+    for executable, tool in executables:
+      if executable in missingFiles:
+        missingExecutables.append((executable, tool))
+        success = False
+
+    # If this pipeline requires any R packages to be installed, ensure that they are.
+    missingRPackages = self.checkRPackages(rPackages, admin) if rPackages else []
+    if missingRPackages: success = False
 
     # If any required tools, executables or R packages are missing, output a warning.
     if not success:
@@ -114,30 +120,48 @@ class executables:
       self.errors.writeFormattedText(text, errorType = 'error')
       self.errors.terminate(1)
 
-  # Check for existence of R packages.
-  def checkRPackage(self, package):
-
-    # Define the name of a file for testing.
-    filename = str('test-R-package.XGU382HD2.r')
-
-    # Open the file.
-    filehandle = fh.fileHandling.openFileForWriting('test-R-package.XGU382HD2.r')
-
-    # Insert the library command with the name of the required package.
-    print('library(' + str(package) + ')', sep = '', file = filehandle)
-    filehandle.flush()
-
-    # Check if Rscript can be executed.
-    try: p = subprocess.Popen('Rscript'.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+  # Check for the existence of R packages, returning the packages that are not installed. All of the packages are
+  # checked with a single execution of Rscript. The installed packages are stored in the user settings along with the
+  # location of each package, so if the same version of R is used with the same libraries, the packages do not need
+  # to be checked again. Only installed packages are stored, so packages that were missing are always checked.
+  def checkRPackages(self, packages, admin):
+
+    # Check that Rscript can be executed. The version of R used is identified by the location and modification time
+    # of Rscript, and the libraries by the environment variables that R uses to define the library paths.
+    rscript = find_executable('Rscript')
+    if not rscript: ae.adminErrors().noRscript()
+    rscript = os.path.realpath(rscript)
+    key     = ':'.join([rscript, str(os.path.getmtime(rscript))] + [os.getenv(variable, '') for variable in ['R_LIBS', 'R_LIBS_USER', 'R_LIBS_SITE']])
+
+    # If all of the packages were previously found with this version of R and are still present, R does not need to
+    # be executed.
+    cache = admin.userSettings.get('R packages', {})
+    if cache.get('key') != key: cache = {'key': key, 'packages': {}}
+    installed = dict(cache['packages'])
+    if all(package in installed and os.path.isdir(installed[package]) for package in packages): return []
+
+    # Attempt to load each package and output the package name with the location of the package, or with no location if
+    # the package could not be loaded.
+    script = 'for (package in commandArgs(trailingOnly = TRUE)) { ' + \
+             'isLoaded <- suppressWarnings(suppressMessages(requireNamespace(package, quietly = TRUE))); ' + \
+             'cat(package, "\\t", if (isLoaded) find.package(package) else "", "\\n", sep = "") }'
+    try: execute = Popen([rscript, '-e', script, '--args'] + packages, stdin = PIPE, stdout = PIPE, stderr = PIPE)
     except OSError: ae.adminErrors().noRscript()
-
-    # Execute the r script and retrieve the error code. If the package exists, this will be zero, otherwise 1.
-    execute       = Popen(['Rscript', 'test-R-package.XGU382HD2.r'], stdin=PIPE, stdout=PIPE, stderr=PIPE)
     output, error = execute.communicate()
 
-    # Remove the testing file.
-    os.remove(filename)
-
-    # Return the error code.
-    if execute.returncode != 0: return False
-    else: return True
+    # Store the locations of the installed packages.
+    for line in output.splitlines():
+      package, location = line.split('\t', 1) if '\t' in line else (line, '')
+      if package not in packages: continue
+      if location: installed[package] = location
+      elif package in installed: del installed[package]
+
+    # Update the user settings with the installed packages. If the settings cannot be written (e.g. gkno is installed
+    # in a location that the user cannot write to), the packages will be checked again when gkno is next run.
+    if installed != cache['packages'] or cache is not admin.userSettings.get('R packages'):
+      admin.userSettings['R packages'] = {'key': key, 'packages': installed}
+      try: admin.exportUserSettings()
+      except (IOError, OSError): pass
+
+    # Return the packages that are not installed.
+    return [package for package in packages if package not in installed]
@@ -0,0 +1,417 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import executorErrors as ee
+import makefiles as mk
+import stringOperations as strOps
+
+import os
+import subprocess
+import sys
+
+# Define a class holding the information for a single job. A job is the execution of a task (or a set of
+# tasks that are streamed together) for a single subphase and division, and is equivalent to a single
+# rule in the makefile.
+class jobInformation:
+  def __init__(self, jobId, tasks, subphase, division):
+
+    # The id of the job, the tasks executed and the subphase and division.
+    self.jobId    = jobId
+    self.tasks    = tasks
+    self.subphase = subphase
+    self.division = division
+
+    # The files the job depends on, the files it creates, the command lines and the files to delete
+    # once the job is complete.
+    self.dependencies  = []
+    self.outputs       = []
+    self.commands      = []
+    self.intermediates = []
+
+    # The jobs that must be complete before this job can run and the jobs that depend on this job.
+    self.predecessors = set()
+    self.successors   = set()
+
+    # The resources required by the job: the number of threads, the memory (in megabytes) and the I/O weight.
+    self.threads  = 1
+    self.memory   = 0
+    self.ioWeight = 0
+
+    # The state of the job. This is one of 'pending', 'running', 'complete', 'failed' or 'skipped'.
+    self.state = 'pending'
+
+    # The process running the job.
+    self.process = None
+
+# Define a class for executing the pipeline without make. The command lines generated for the makefile are
+# executed directly as a graph of jobs, using the dependencies and outputs of each job to determine the
+# order of execution. Jobs are run in parallel, up to the requested number of jobs.
+class executor:
+  def __init__(self):
+
+    # Define errors.
+    self.errors = ee.executorErrors()
+
+    # Store the available executors. Make is the default.
+    self.executors = ['make', 'native']
+
+    # Store all of the jobs, keyed by the job id, and the order in which they appear in the makefile.
+    self.jobs      = {}
+    self.jobsOrder = []
+
+    # Store the job that creates each file.
+    self.producers = {}
+
+    # Store all files that are marked as intermediate.
+    self.intermediates = set()
+
+    # Store the variables defined in the makefile.
+    self.variables = {}
+
+    # Store the maximum memory (in megabytes) and I/O weight available to the pipeline. The number of threads
+    # available is the number of jobs.
+    self.maxMemory   = None
+    self.maxIoWeight = None
+
+  # Determine which executor to use.
+  def getExecutor(self, gkno, arguments):
+    value = gkno.getGknoArgument('GKNO-EXECUTOR', arguments)
+    if not value: return 'make'
+    if value not in self.executors: self.errors.invalidExecutor(str(value), self.executors)
+
+    # The native executor executes the single makefile generated for the pipeline, so cannot be used if multiple
+    # makefiles are generated (unless the pipeline is not being executed).
+    if value == 'native' and gkno.getGknoArgument('GKNO-MULTIPLE-MAKEFILES', arguments):
+      if not gkno.getGknoArgument('GKNO-DO-NOT-EXECUTE', arguments): self.errors.nativeExecutorMultipleMakefiles()
+    return value
+
+  # Get the maximum memory and I/O weight available to the pipeline.
+  def getResources(self, gkno, arguments):
+    memory = gkno.getGknoArgument('GKNO-MAX-MEMORY', arguments)
+    if memory:
+      self.maxMemory = strOps.getMegabytes(memory)
+      if not self.maxMemory: self.errors.invalidMaxMemory(str(memory))
+    ioWeight = gkno.getGknoArgument('GKNO-MAX-IO-WEIGHT', arguments)
+    if ioWeight:
+      try: self.maxIoWeight = int(ioWeight)
+      except ValueError: self.errors.invalidMaxIoWeight(str(ioWeight))
+      if self.maxIoWeight < 1: self.errors.invalidMaxIoWeight(str(ioWeight))
+
+  # Define the variables used in the command lines. These are the same variables that are defined in the header
+  # of the makefile.
+  def setVariables(self, make, makefile, sourcePath, toolsPath, resourcesPath):
+    self.variables['PWD']         = os.getcwd()
+    self.variables['GKNO_PATH']   = sourcePath
+    self.variables['TOOL_BIN']    = toolsPath
+    self.variables['RESOURCES']   = resourcesPath
+    self.variables['MAKEFILE_ID'] = makefile.rsplit('.make', 1)[0]
+    self.variables['STDOUT']      = self.expand('$(PWD)/$(MAKEFILE_ID).stdout')
+    self.variables['STDERR']      = self.expand('$(PWD)/$(MAKEFILE_ID).stderr')
+    self.variables['COMPLETE_OK'] = self.expand('$(PWD)/$(MAKEFILE_ID).ok')
+    self.variables['EXECUTED']    = self.expand('$(PWD)/$(MAKEFILE_ID).executed')
+    if make.isProfile:
+      self.variables['PYTHON']  = sys.executable
+      self.variables['PROFILE'] = self.expand(make.profileCommand)
+
+    # Add the paths to the executables.
+    for tool in make.toolPaths:
+      variable, value              = make.toolPaths[tool].split('=', 1)
+      self.variables[str(variable)] = self.expand(value)
+
+  # Build the jobs from the command lines. The tasks are grouped in the same way as in the makefile, with tasks
+  # that are streamed together forming a single job.
+  def buildJobs(self, graph, struct, make):
+    for phase in struct.phaseInformation:
+      for subphase in range(1, struct.phaseInformation[phase].numberSubphases + 1):
+        for division in range(1, struct.phaseInformation[phase].numberDivisions + 1):
+          for task in struct.phaseInformation[phase].tasks:
+            isInputStream  = graph.getGraphNodeAttribute(task, 'isInputStream')
+            isOutputStream = graph.getGraphNodeAttribute(task, 'isOutputStream')
+
+            # Collect the information for tasks outputting to a stream until the last task in the stream is reached.
+            if isOutputStream:
+              if not isInputStream: info = mk.streamingInformation()
+              make.storeStreamingTaskInformation(info, subphase, division, task, isLast = False)
+
+            # The last task in a set of streamed tasks completes the job.
+            elif isInputStream:
+              make.storeStreamingTaskInformation(info, subphase, division, task, isLast = True)
+              job = self.addJob(info.tasks, phase, subphase, division, info.dependencies, info.outputs, info.commands)
+
+              # Delete the intermediate files for all of the streamed tasks.
+              for streamedTask in info.tasks:
+                if streamedTask in make.deleteAfterTask: job.intermediates.extend(make.deleteAfterTask[streamedTask][subphase][division])
+
+            # Tasks that are not streamed are a job on their own.
+            else:
+              data = make.executionInfo[task]
+              job  = self.addJob([task], phase, subphase, division, data.dependencies[subphase][division], data.outputs[subphase][division], \
+              data.commands[subphase][division])
+
+              # If the task is greedy, delete all files, otherwise just the files associated with this subphase and division.
+              if task in make.deleteAfterTask:
+                if graph.getGraphNodeAttribute(task, 'isGreedy'):
+                  for deleteSubphase in make.deleteAfterTask[task]:
+                    for deleteDivision in make.deleteAfterTask[task][deleteSubphase]: job.intermediates.extend(make.deleteAfterTask[task][deleteSubphase][deleteDivision])
+                else: job.intermediates.extend(make.deleteAfterTask[task][subphase][division])
+
+    # Store all of the intermediate files.
+    for task in make.executionInfo:
+      for subphase in make.executionInfo[task].intermediates:
+        for division in make.executionInfo[task].intermediates[subphase]: self.intermediates.update(make.executionInfo[task].intermediates[subphase][division])
+
+    # Connect the jobs. A job depends on all the jobs that create its dependencies.
+    for jobId in self.jobsOrder:
+      job = self.jobs[jobId]
+      self.setJobResources(graph, job)
+      for dependency in job.dependencies:
+        if dependency in self.producers and self.producers[dependency] != jobId:
+          job.predecessors.add(self.producers[dependency])
+          self.jobs[self.producers[dependency]].successors.add(jobId)
+
+  # Add a job.
+  def addJob(self, tasks, phase, subphase, division, dependencies, outputs, commands):
+    jobId = str(', '.join(tasks))
+    if phase > 1 or subphase > 1 or division > 1: jobId += str(' (phase ' + str(phase) + ', subphase ' + str(subphase) + ', division ' + str(division) + ')')
+
+    # Store the job information, expanding all variables in the files.
+    job              = jobInformation(jobId, tasks, subphase, division)
+    job.dependencies = [self.expand(dependency) for dependency in dependencies]
+    job.outputs      = [self.expand(output) for output in outputs]
+    job.commands     = list(commands)
+
+    # Record the job creating each output.
+    for output in job.outputs: self.producers[output] = jobId
+    self.jobs[jobId] = job
+    self.jobsOrder.append(jobId)
+
+    # Return the job.
+    return job
+
+  # Set the resources required by a job. Streamed tasks are treated as using a single thread between them, unless
+  # any of the tasks uses multiple threads.
+  def setJobResources(self, graph, job):
+    threads      = [graph.getGraphNodeAttribute(task, 'threads') for task in job.tasks]
+    job.threads  = sum(threads) if max(threads) > 1 else 1
+    job.memory   = sum([graph.getGraphNodeAttribute(task, 'memory') or 0 for task in job.tasks])
+    job.ioWeight = sum([graph.getGraphNodeAttribute(task, 'ioWeight') for task in job.tasks])
+
+  # Determine if there are sufficient resources available to run a job.
+  def isAvailable(self, job, threads, memory, ioWeight):
+    if job.threads > threads: return False
+    if self.maxMemory and job.memory > memory: return False
+    if self.maxIoWeight and job.ioWeight > ioWeight: return False
+    return True
+
+  # Determine which jobs need to be run. As with make, a job runs if its output does not exist or is older than any
+  # of its dependencies, or if a job it depends on is run. A job whose outputs are all missing intermediate files is
+  # only run if a job that depends on it is run.
+  def determineJobsToRun(self):
+    isRun                = {}
+    isMissingIntermediate = {}
+    for jobId in self.jobsOrder:
+      job                          = self.jobs[jobId]
+      isRun[jobId]                 = False
+      isMissingIntermediate[jobId] = False
+
+      # Determine if all outputs that do not exist are intermediate files.
+      missingOutputs = [output for output in job.outputs if not os.path.exists(output)]
+      if missingOutputs:
+        if set(missingOutputs).issubset(self.intermediates): isMissingIntermediate[jobId] = True
+        else: isRun[jobId] = True
+
+      # Determine if any of the dependencies are newer than the output.
+      elif job.dependencies:
+        modificationTime = os.path.getmtime(job.outputs[0])
+        for dependency in job.dependencies:
+          if os.path.exists(dependency) and os.path.getmtime(dependency) > modificationTime: isRun[jobId] = True
+
+    # Propagate the jobs that are run to the jobs that depend on them and to the jobs that create missing intermediate
+    # files that are required by them.
+    jobsToCheck = [jobId for jobId in self.jobsOrder if isRun[jobId]]
+    while jobsToCheck:
+      job = self.jobs[jobsToCheck.pop()]
+      for jobId in list(job.successors) + [jobId for jobId in job.predecessors if isMissingIntermediate[jobId]]:
+        if not isRun[jobId]:
+          isRun[jobId] = True
+          jobsToCheck.append(jobId)
+
+    # Mark the jobs that are not run as complete.
+    for jobId in self.jobsOrder:
+      if not isRun[jobId]: self.jobs[jobId].state = 'complete'
+
+  # Execute the pipeline, using up to numberJobs threads at a time. Return 0 if all jobs completed successfully.
+  def execute(self, graph, struct, make, makefile, sourcePath, toolsPath, resourcesPath, numberJobs):
+    self.setVariables(make, makefile, sourcePath, toolsPath, resourcesPath)
+    self.buildJobs(graph, struct, make)
+
+    # Remove the file indicating successful completion of the pipeline.
+    self.removeFile(self.variables['EXECUTED'])
+    self.removeFile(self.variables['COMPLETE_OK'])
+
+    # Determine the jobs to run and check that all dependencies that are not created by the pipeline exist.
+    self.determineJobsToRun()
+    for jobId in self.jobsOrder:
+      job = self.jobs[jobId]
+      if job.state == 'pending':
+        for dependency in job.dependencies:
+          if dependency not in self.producers and not os.path.exists(dependency):
+            self.errors.missingDependency(jobId, dependency)
+            self.failJob(job, 'skipped')
+            break
+
+    # Run the jobs. Jobs are started in the order in which they appear in the makefile, once all the jobs they depend
+    # on are complete and sufficient threads, memory and I/O are available. A job requiring more resources than are
+    # available in total is run on its own.
+    threads  = int(numberJobs)
+    memory   = self.maxMemory
+    ioWeight = self.maxIoWeight
+    running  = {}
+    while True:
+      for jobId in self.jobsOrder:
+        job = self.jobs[jobId]
+        if job.state != 'pending' or (running and not self.isAvailable(job, threads, memory, ioWeight)): continue
+        if [predecessor for predecessor in job.predecessors if self.jobs[predecessor].state != 'complete']: continue
+        self.startJob(job)
+        running[job.process.pid] = job
+        threads                 -= job.threads
+        if memory != None: memory -= job.memory
+        if ioWeight != None: ioWeight -= job.ioWeight
+
+      # If no jobs are running, all jobs that can be run are finished.
+      if not running: break
+
+      # Wait for a job to complete.
+      pid, status       = os.wait()
+      if pid not in running: continue
+      job      = running.pop(pid)
+      threads += job.threads
+      if memory != None: memory += job.memory
+      if ioWeight != None: ioWeight += job.ioWeight
+      self.finishJob(job, os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1)
+
+    # If all jobs completed, generate the file indicating successful completion of the pipeline, as the makefile does.
+    if [jobId for jobId in self.jobsOrder if self.jobs[jobId].state != 'complete']: return 1
+    if not os.path.exists(self.variables['EXECUTED']):
+      print('===================================')
+      print('  WARNING: No new files generated.')
+      print('===================================')
+      print()
+      print('All required output files already exist, so none of the tasks in the pipeline were executed.')
+      print('To force execution of the pipeline remove output files prior to execution of gkno.')
+    else: open(self.variables['COMPLETE_OK'], 'a').close()
+    self.removeFile(self.variables['EXECUTED'])
+    self.removeFile(str(self.variables['MAKEFILE_ID'] + '.make'))
+    return 0
+
+  # Start a job.
+  def startJob(self, job):
+    print('Executing task', 's' if len(job.tasks) > 1 else '', ': ', job.jobId, '...', sep = '')
+    sys.stdout.flush()
+    with open(os.devnull, 'w') as devnull: job.process = subprocess.Popen(['/bin/bash', '-c', self.getScript(job.commands)], stdout = devnull)
+    job.state = 'running'
+
+  # Process a completed job. The job has failed if the command lines failed, or if not all outputs were created (if
+  # a set of streamed tasks fails, the output is deleted).
+  def finishJob(self, job, exitStatus):
+    job.process.returncode = exitStatus
+    missingOutputs         = [output for output in job.outputs if not os.path.exists(output)]
+    if exitStatus != 0 or missingOutputs:
+      print('Task', 's' if len(job.tasks) > 1 else '', ' ', job.jobId, ' failed.', sep = '')
+
+      # As with make, remove the output of the failed job.
+      self.removeFile(job.outputs[0])
+      self.failJob(job, 'failed')
+
+    # Delete intermediate files that are no longer required.
+    else:
+      print('Task', 's' if len(job.tasks) > 1 else '', ' ', job.jobId, ' completed successfully.', sep = '')
+      for intermediate in job.intermediates: self.removeFile(self.expand(intermediate))
+      job.state = 'complete'
+    sys.stdout.flush()
+
+  # Mark a job as failed, and all jobs that depend on it as skipped.
+  def failJob(self, job, state):
+    job.state   = state
+    jobsToCheck = list(job.successors)
+    while jobsToCheck:
+      successor = self.jobs[jobsToCheck.pop()]
+      if successor.state == 'pending':
+        successor.state = 'skipped'
+        jobsToCheck.extend(successor.successors)
+
+  # Convert the command lines for a job into a bash script. As in make, each line (including lines continued with
+  # a '\') is executed in its own shell and execution stops if a line fails.
+  def getScript(self, commands):
+    script = []
+    line   = []
+    for command in commands:
+      command = command[1:] if command.startswith('\t') else command
+      if not line and command.startswith('@'): command = command[1:]
+      line.append(self.expand(command))
+
+      # If the line is complete, add it to the script.
+      if not command.endswith('\\'):
+        if line != ['']: script.append('(\n' + '\n'.join(line) + '\n) || exit $?')
+        line = []
+
+    # Return the script.
+    return '\n'.join(script)
+
+  # Expand the make variables in a string. The make function 'shell' is replaced with the equivalent bash command
+  # substitution. As in make, undefined variables are empty, and references within a reference (e.g. a variable
+  # used in the command given to 'shell') are expanded first.
+  def expand(self, text):
+    expanded = []
+    start    = 0
+    position = text.find('$')
+    while position != -1:
+      expanded.append(text[start:position])
+
+      # '$$' is a literal '$'.
+      if text.startswith('$$', position):
+        expanded.append('$')
+        start = position + 2
+
+      # Find the parenthesis closing the reference and expand the reference. If the reference is not closed, the
+      # remaining text is left unchanged.
+      elif text.startswith('$(', position):
+        end = self.findClosingParenthesis(text, position + 1)
+        if end == -1:
+          start = position
+          break
+        name = self.expand(text[position + 2:end])
+        if name.startswith('shell '): expanded.append('$(' + name[6:] + ')')
+        else: expanded.append(self.variables[name] if name in self.variables else '')
+        start = end + 1
+
+      # Any other '$' is left unchanged.
+      else:
+        expanded.append('$')
+        start = position + 1
+      position = text.find('$', start)
+
+    # Return the expanded text.
+    expanded.append(text[start:])
+    return str(''.join(expanded))
+
+  # Return the position of the parenthesis closing the parenthesis at the given position, or -1 if it is not closed.
+  def findClosingParenthesis(self, text, position):
+    depth = 0
+    for i in range(position, len(text)):
+      if text[i] == '(': depth += 1
+      elif text[i] == ')':
+        depth -= 1
+        if depth == 0: return i
+    return -1
+
+  ######################
+  ### Static methods ###
+  ######################
+
+  # Remove a file if it exists.
+  @staticmethod
+  def removeFile(filename):
+    try: os.remove(filename)
+    except OSError: pass
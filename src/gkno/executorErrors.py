@@ -0,0 +1,106 @@
+#!/usr/bin/python
+
+from __future__ import print_function
+
+import errors
+from errors import *
+
+import os
+import sys
+
+class executorErrors:
+
+  # Initialise.
+  def __init__(self):
+
+    # Get general error writing and termination methods.
+    self.errors = errors()
+
+    # The error messages are stored in the following list.
+    self.text = []
+
+    # For a list of all error code values, see adminErrors.py.
+    self.errorCode = '17'
+
+  # An invalid executor was requested.
+  def invalidExecutor(self, executor, executors):
+    self.text.append('Invalid executor.')
+    self.text.append('The executor \'' + executor + '\' was requested with the argument \'--executor (-ex)\', but this is not a valid ' + \
+    'executor. The available executors are:')
+    self.text.append('\t')
+    for value in executors: self.text.append('\t' + value)
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The maximum memory is invalid.
+  def invalidMaxMemory(self, value):
+    self.text.append('Invalid maximum memory.')
+    self.text.append('The value \'' + value + '\' was given to the argument \'--max-memory (-mem)\', but this is not a valid amount of ' + \
+    'memory. The memory must be a positive value with optional units, e.g. \'512M\' or \'16G\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The maximum I/O weight is invalid.
+  def invalidMaxIoWeight(self, value):
+    self.text.append('Invalid maximum I/O weight.')
+    self.text.append('The value \'' + value + '\' was given to the argument \'--max-io-weight (-mio)\', but this is not a valid I/O ' + \
+    'weight. The I/O weight must be a positive integer.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The native executor cannot execute multiple makefiles or a batch of samples.
+  def cannotUseNativeExecutor(self):
+    self.text.append('Native executor not used.')
+    self.text.append('The native executor can only be used to execute a single pipeline in a single makefile. The generated makefile ' + \
+    'will be executed using make.')
+    self.errors.writeFormattedText(self.text, errorType = 'warning')
+    self.text = []
+
+  # The native executor was requested, but multiple makefiles are being generated.
+  def nativeExecutorMultipleMakefiles(self):
+    self.text.append('Native executor with multiple makefiles.')
+    self.text.append('The native executor was requested with the argument \'--executor (-ex)\', but multiple makefiles were requested ' + \
+    'with the argument \'--multiple-makefiles (-mm)\'. The native executor can only execute a pipeline in a single makefile. Please ' + \
+    'remove one of these arguments, or execute the generated makefiles using make.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A dependency of a job does not exist and is not created by any job in the pipeline.
+  def missingDependency(self, job, dependency):
+    self.text.append('Missing dependency.')
+    self.text.append('The file \'' + dependency + '\' is required by ' + job + ', but the file does not exist and is not created by any ' + \
+    'task in the pipeline. This task, and any tasks that depend on it, will not be executed.')
+    self.errors.writeFormattedText(self.text, errorType = 'warning')
+    self.text = []
+
+  # No profiles were found.
+  def noProfiles(self):
+    self.text.append('No profiles.')
+    self.text.append('No profiles were supplied and no profiles (files with the extension \'.profile\') exist in the current directory. ' + \
+    'Profiles are generated by executing pipelines with the argument \'--profile-tasks (-pt)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A profile does not exist.
+  def missingProfile(self, filename):
+    self.text.append('Missing profile.')
+    self.text.append('The profile \'' + filename + '\' does not exist.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A profile contains an invalid line.
+  def invalidProfile(self, filename, lineNumber):
+    self.text.append('Invalid profile.')
+    self.text.append('Line ' + str(lineNumber) + ' of the profile \'' + filename + '\' is not a valid task profile. Profiles must be ' + \
+    'generated by executing pipelines with the argument \'--profile-tasks (-pt)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The file or directory for the stage profile is invalid.
+  def invalidStageProfile(self, argument, value):
+    self.text.append('Invalid stage profile.')
+    if value == None: self.text.append('The argument \'' + argument + '\' requires a value.')
+    else: self.text.append('The value \'' + value + '\' supplied to the argument \'' + argument + '\' cannot be written to. Please check that ' + \
+    'the path exists and is writable.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
@@ -2,9 +2,6 @@
 
 from __future__ import print_function
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import errors
 from errors import *
 
@@ -79,6 +76,9 @@ class fileErrors:
     for filename in fileList: self.text.append('\t' + filename)
     self.errors.writeFormattedText(self.text, errorType = 'warning')
 
+    # Clear the text, since this warning can be written for each sample in a batch.
+    self.text = []
+
   # A list was provided, but does not exist.
   def missingList(self, argument, value):
     self.text.append('Missing list.')
@@ -1,17 +1,23 @@
 #!/bin/bash/python
 
 from __future__ import print_function
+from multiprocessing.pool import ThreadPool
 
 import fileErrors as errors
 
 import stringOperations
 
+import errno
 import json
 import os
 import sys
 
 # Define a class for handling all file operations.
 class fileHandling:
+
+  # The number of threads used to check if files exist, unless defined on the command line.
+  fileCheckThreads = 16
+
   def __init__(self, toolsPath, pipelinesPath, definedPath):
 
     # Define error handling for file errors.
@@ -41,8 +47,8 @@ class fileHandling:
       self.errors.invalidPipelineName(rankedPipelines, pipeline)
 
   # Check that all the files in the provided list exist.
-  def checkFileExistence(self, fileList, resourcesPath, toolsPath):
-    missingFiles = []
+  def checkFileExistence(self, fileList, resourcesPath, toolsPath, threads = fileCheckThreads):
+    filenames = []
     for filename in fileList:
 
       # If the filename starts with a link to a directory, replace it with the absolute path of
@@ -51,9 +57,11 @@ class fileHandling:
       elif filename.startswith('$(RESOURCES)'): updatedFilename = filename.replace('$(RESOURCES)', resourcesPath)
       elif filename.startswith('$(TOOL_BIN)'): updatedFilename = filename.replace('$(TOOL_BIN)', toolsPath)
       else: updatedFilename = filename
+      filenames.append((filename, updatedFilename))
 
-      # If the file does not exist, add it to a list of missing files.
-      if not os.path.exists(updatedFilename): missingFiles.append(filename)
+    # If the file does not exist, add it to a list of missing files.
+    missing      = self.getMissingFiles([updatedFilename for filename, updatedFilename in filenames], threads)
+    missingFiles = [filename for filename, updatedFilename in filenames if updatedFilename in missing]
 
     # If there are missing files, write out a warning and return False.
     if missingFiles:
@@ -82,6 +90,42 @@ class fileHandling:
   ######################
   ### Static methods ###
   ######################
+
+  # Return the files in a list that do not exist. Checking each file can be slow on network filesystems, so the
+  # files are grouped by directory and the contents of each directory are listed once. Files that are not in the
+  # listing for their directory (e.g. the path to the file includes a link) or in directories that cannot be
+  # listed are checked individually. Directories are listed and files checked in parallel using the requested
+  # number of threads.
+  @staticmethod
+  def getMissingFiles(filenames, threads = fileCheckThreads):
+    missingFiles = set()
+    directories  = {}
+    for filename in set(filenames): directories.setdefault(os.path.dirname(filename), []).append(filename)
+    if not directories: return missingFiles
+
+    # List the contents of a directory and return the files that are not in the listing. If the directory does
+    # not exist, none of the files exist.
+    def listDirectory(directory):
+      try: contents = set(os.listdir(directory or '.'))
+      except OSError as error:
+        if error.errno not in [errno.ENOENT, errno.ENOTDIR]: return directories[directory]
+        missingFiles.update(directories[directory])
+        return []
+      return [filename for filename in directories[directory] if os.path.basename(filename) not in contents]
+
+    # List the directories, then check the files not found individually. Starting and stopping the threads takes
+    # time, so if there is only a single directory, the checks are performed serially.
+    pool     = ThreadPool(min(int(threads), len(directories))) if int(threads) > 1 and len(directories) > 1 else None
+    mapFiles = pool.map if pool else map
+    try:
+      unlisted = [filename for filenames in mapFiles(listDirectory, directories) for filename in filenames]
+      for filename, isExists in zip(unlisted, mapFiles(os.path.exists, unlisted)):
+        if not isExists: missingFiles.add(filename)
+    finally:
+      if pool:
+        pool.close()
+        pool.join()
+    return missingFiles
   
   # Return a list of json files excluding parameterSet json files.
   @staticmethod
@@ -118,6 +162,11 @@ class fileHandling:
   @staticmethod
   def openFileForWriting(filename):
     return open(filename, 'w')
+
+  # Open a file to append to.
+  @staticmethod
+  def openFileForAppending(filename):
+    return open(filename, 'a')
   
   # Close all the files provided.
   @staticmethod
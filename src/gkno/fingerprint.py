@@ -0,0 +1,110 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import hashlib
+import os
+
+# Define a class for generating a fingerprint of a gkno execution. The fingerprint is a hash of the gkno version,
+# the working directory, the command line and the contents of all the configuration files used to build the
+# pipeline. The fingerprint and the list of configuration files are written to the header of the makefile. If the
+# pipeline is rerun with an identical fingerprint, the existing makefile is executed without processing the
+# configuration files or building the pipeline graph.
+class fingerprint:
+  def __init__(self, version, commitId):
+
+    # Store the gkno version and commit.
+    self.version  = version
+    self.commitId = commitId
+
+    # Store the command line arguments that define the pipeline.
+    self.arguments = []
+
+    # Store the configuration files used to generate the pipeline.
+    self.configurationFiles = []
+
+    # The text preceding the fingerprint and the configuration files in the makefile header.
+    self.fingerprintText = '### gkno fingerprint: '
+    self.filesText       = '### Configuration files: '
+
+  # Store the command line arguments. Arguments that only affect the execution of the makefile (not its
+  # contents) are removed, so that, for example, the number of jobs can be changed when rerunning a pipeline.
+  def setArguments(self, arguments, gkno):
+    ignore = {}
+    for option in ['GKNO-DNL', 'GKNO-DO-NOT-EXECUTE', 'GKNO-EXECUTOR', 'GKNO-FILE-CHECK-THREADS', 'GKNO-JOBS', 'GKNO-PROFILE', 'GKNO-PROFILE-DIRECTORY', 'GKNO-RERUN']:
+      isFlag                                      = gkno.options[option].dataType == 'flag'
+      ignore[gkno.options[option].longFormArgument]  = isFlag
+      ignore[gkno.options[option].shortFormArgument] = isFlag
+
+    # Loop over the arguments, skipping the ignored arguments and their values.
+    isValue = False
+    for argument in arguments:
+      if isValue: isValue = False
+      elif argument in ignore: isValue = not ignore[argument]
+      else: self.arguments.append(argument)
+
+  # Add a configuration file used by the pipeline.
+  def addConfigurationFile(self, filename):
+    filename = os.path.abspath(filename)
+    if filename not in self.configurationFiles: self.configurationFiles.append(filename)
+
+  # Calculate the fingerprint.
+  def getFingerprint(self):
+    value = hashlib.md5()
+    for text in [self.version, self.commitId, os.getcwd()] + self.arguments: value.update(str(text) + '\0')
+
+    # Include the contents of all of the configuration files. Files that do not exist (e.g. an optional external
+    # parameter set file) are included, so that creating the file changes the fingerprint.
+    for filename in self.configurationFiles:
+      value.update(filename + '\0')
+      value.update(self.getContentHash(filename) + '\0')
+
+    # Return the fingerprint.
+    return value.hexdigest()
+
+  # Return the lines to include in the makefile header.
+  def getHeader(self):
+    return [self.fingerprintText + self.getFingerprint(), self.filesText + ' '.join(self.configurationFiles)]
+
+  # Search the current directory for a makefile for this pipeline with a matching fingerprint. The configuration
+  # files used by the pipeline are read from the makefile header.
+  def findMakefile(self, pipeline):
+    for filename in sorted(os.listdir('.')):
+      if not filename.startswith(pipeline) or not filename.endswith('.make'): continue
+
+      # Read the fingerprint and configuration files from the header.
+      value, self.configurationFiles = self.readHeader(filename)
+      if value and value == self.getFingerprint(): return filename
+
+    # No makefile with a matching fingerprint exists.
+    self.configurationFiles = []
+    return None
+
+  # Read the fingerprint and the configuration files from the header of a makefile.
+  def readHeader(self, filename):
+    value = None
+    files = []
+    try:
+      with open(filename) as filehandle:
+        for line in filehandle:
+
+          # The header ends at the first line that is not a comment.
+          if not line.startswith('###'): break
+          line = line.rstrip('\n')
+          if line.startswith(self.fingerprintText): value = line[len(self.fingerprintText):]
+          elif line.startswith(self.filesText): files = line[len(self.filesText):].split()
+    except IOError: return None, []
+
+    # Return the fingerprint and files.
+    return value, files
+
+  ######################
+  ### Static methods ###
+  ######################
+
+  # Return a hash of the contents of a file, or 'missing' if the file does not exist.
+  @staticmethod
+  def getContentHash(filename):
+    try:
+      with open(filename, 'rb') as filehandle: return hashlib.md5(filehandle.read()).hexdigest()
+    except IOError: return 'missing'
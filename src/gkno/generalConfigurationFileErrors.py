@@ -2,9 +2,6 @@
 
 from __future__ import print_function
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import errors
 from errors import *
 
@@ -30,6 +27,7 @@ class generalConfigurationFileErrors:
 
     # Determine the configuration type that failed. This is achieved by interrogating the stack to see which
     # function called the error.
+    import inspect
     callingModule = inspect.stack()[2][1].rsplit('/', 1)[1].rsplit('.py', 1)[0]
     if callingModule == 'pipelineConfiguration': text = 'pipeline'
     elif callingModule == 'toolConfiguration': text = 'tool'
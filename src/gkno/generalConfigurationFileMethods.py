@@ -5,7 +5,6 @@ import generalConfigurationFileErrors as er
 
 import json
 import os
-import inspect
 import sys
 
 # Check that the supplied value is a dictionary.
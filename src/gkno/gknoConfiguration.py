@@ -78,6 +78,7 @@ class gknoConfiguration:
       self.options[str(identifier)]                 = gknoArgumentAttributes()
       self.options[identifier].longFormArgument     = attributes.longFormArgument
       self.options[identifier].shortFormArgument    = attributes.shortFormArgument
+      self.options[identifier].dataType             = attributes.dataType
 
   ############################################################
   ## Methods to extract information about the gkno options. ##
@@ -2,7 +2,7 @@
 
 from __future__ import print_function
 from collections import deque
-from copy import deepcopy
+from copy import copy, deepcopy
 
 import networkx as nx
 
@@ -12,9 +12,11 @@ import constructFilenameErrors as cfe
 import fileHandling as fh
 import fileErrors as fe
 import graphErrors
+import listValues as lv
 import parameterSets as ps
 import parameterSetErrors as pse
 import pipelineConfigurationErrors as pce
+import slottedAttributes as sa
 import stringOperations as strOps
 import superpipeline as sp
 import toolConfigurationErrors as tce
@@ -24,120 +26,294 @@ import os
 import sys
 
 # Define a data structure for holding information on arguments.
-class argumentInformation:
-  def __init__(self):
+class argumentInformation(sa.slottedAttributes):
+  defaults = {
 
     # Define the node ID from which the task was taken.
-    self.nodeId = None
+    'nodeId' : None,
 
     # Define the address of the task and the tool it uses.
-    self.taskAddress = None
-    self.tool        = None
+    'taskAddress' : None,
+    'tool'        : None,
 
     # Define the argument (this is in its long form).
-    self.argument = None
+    'argument' : None,
 
     # Define whether this argument points to an input or output file.
-    self.isInput  = False
-    self.isOutput = False
+    'isInput'  : False,
+    'isOutput' : False,
 
     # Define information relevant to stub arguments.
-    self.isStub         = False
-    self.stubExtension  = None
-    self.stubExtensions = []
+    'isStub'         : False,
+    'stubExtension'  : None,
+    'stubExtensions' : [],
 
     # Define if this argument is greedy.
-    self.isGreedy = False
+    'isGreedy' : False
+  }
+  __slots__ = tuple(defaults)
 
 # Define a data structure for task nodes.
-class taskNodeAttributes:
-  def __init__(self):
+class taskNodeAttributes(sa.slottedAttributes):
+  defaults = {
 
     # Define the node type.
-    self.nodeType = 'task'
+    'nodeType' : 'task',
 
     # Define the tool to be used to execute this task.
-    self.tool = None
+    'tool' : None,
 
     # Store information on whether the task is greedy.
-    self.isGreedy       = False
-    self.greedyArgument = 1
+    'isGreedy'       : False,
+    'greedyArgument' : 1,
 
     # Store information on the task divisions.
-    self.children   = []
-    self.divisions  = 0
-    self.divisionID = None
-    self.isChild    = False
-    self.parent     = None
+    'children'   : [],
+    'divisions'  : 0,
+    'divisionID' : None,
+    'isChild'    : False,
+    'parent'     : None,
 
     # Store the number of subphases and divisions the task is broken up into.
-    self.subphases = 0
+    'subphases' : 0,
 
     # Record if this node should be included in any graphical output.
-    self.includeInReducedPlot = True
+    'includeInReducedPlot' : True,
 
     # If this task is marked as accepting a stream as input or output.
-    self.isInputStream  = False
-    self.isOutputStream = False
+    'isInputStream'  : False,
+    'isOutputStream' : False,
+
+    # The resources (threads, memory in megabytes and I/O weight) required by the task.
+    'threads'  : 1,
+    'memory'   : None,
+    'ioWeight' : 1
+  }
+
+  # Attributes without a default value that are set while the graph is constructed.
+  __slots__ = tuple(defaults) + ('divisionNode', 'isParent', 'randomString', 'hasRandomString')
 
 # Define a data structure for file/option nodes.
-class dataNodeAttributes:
-  def __init__(self, nodeType):
+class dataNodeAttributes(sa.slottedAttributes):
+  defaults = {
 
     # Define the argument that sets the graph node.
-    self.longFormArgument  = None
-    self.shortFormArgument = None
+    'longFormArgument'  : None,
+    'shortFormArgument' : None,
 
     # There are times where multiple arguments can point to the same graph node. For
     # example, if the top level pipeline has an argument pointing to a node with
     # argument --in, but this points to a node in a child pipeline. When the child
     # pipeline is processed, it could have an argument defined, say --out. The highest
     # level argument should be stored in the values above, but all alternatives are
-    # stored in the self.alternativeArguments list.
-    self.alternativeArguments = []
-
-    # Define the node type.
-    self.nodeType = nodeType
+    # stored in the alternativeArguments list.
+    'alternativeArguments' : [],
 
     # Record if values for this node are required.
-    self.isRequired = False
+    'isRequired' : False,
 
     # Store values for this node.
-    self.values = []
+    'values' : [],
 
     # Store the stub extension associated with the node. If the task takes (or outputs) a stub,
     # multiple file nodes are created, each of which is associated with a particular extension.
-    self.stubExtension = None
+    'stubExtension' : None,
 
     # Store if the node is an intermediate node (e.g. all files associated with this node
     # will be deleted. In addition, store the task after which the files associated with
     # the node should be deleted.
-    self.isIntermediate  = False
-    self.deleteAfterTask = None
+    'isIntermediate'  : False,
+    'deleteAfterTask' : None,
 
     # Store information on the task divisions.
-    self.children         = []
-    self.divisions        = 0
-    self.divisionID       = None
-    self.divisionText     = None
-    self.isChild          = False
-    self.isCreateDivision = False
-    self.parent           = None
+    'children'         : [],
+    'divisions'        : 0,
+    'divisionID'       : None,
+    'divisionText'     : None,
+    'isChild'          : False,
+    'isCreateDivision' : False,
+    'parent'           : None,
 
     # If the files contained in this node are being streamed from one task to the next, the files
     # are actually never created. Mark the node as containing streaming files so that attempts to
     # delete them will not be made, and the files will not be listed as outputs or dependencies.
-    self.isStream = False
+    'isStream' : False,
 
     # The configuration file can specify a text string that should be applied to filenames for this
     # node (if the filenames are constructed).
-    self.addTextToFilename = None
+    'addTextToFilename' : None,
 
     # If the values associated with the node are commands to be evaluated at run time, then the
     # values will not conform to the required data type (since the command will be a string). If
     # this is the case, the isCommandToEvaluate flag will be set to True so that the checks are 
     # not performed.
-    self.isCommandToEvaluate = False
+    'isCommandToEvaluate' : False
+  }
+
+  # The node type and the attributes without a default value that are set while the graph is constructed.
+  __slots__ = tuple(defaults) + ('nodeType', 'configurationFileNodeIds', 'constructUsingNode', 'description', 'divisionDescriptor', 'fileLocation',
+  'hasRandomString', 'isGreedy', 'isParent', 'randomString')
+
+  def __init__(self, nodeType):
+
+    # Define the node type.
+    self.nodeType = intern(nodeType)
+
+# Define a data structure for the attributes of the nodes and edges created when a task is split into divisions.
+# Rather than each division holding a full copy of the attributes of the original node or edge, the divisions
+# share a single copy and each division only stores the attributes that are set for it (e.g. the values and the
+# division ID). Attributes are replaced (not modified in place) when they are set, so setting an attribute for one
+# division does not affect the others.
+class divisionAttributes(object):
+  def __init__(self, sharedAttributes):
+
+    # If the attributes being shared are themselves the attributes of a division, share the same attributes and
+    # copy the attributes set for the division.
+    if isinstance(sharedAttributes, divisionAttributes): self.__dict__.update(sharedAttributes.__dict__)
+    else: self.__dict__['sharedAttributes'] = sharedAttributes
+
+  # If an attribute has not been set for the division, return the shared value.
+  def __getattr__(self, attribute):
+    if attribute.startswith('__') or 'sharedAttributes' not in self.__dict__: raise AttributeError(attribute)
+    return getattr(self.__dict__['sharedAttributes'], attribute)
+
+# Define a data structure describing the divisions of a task without adding nodes to the graph for each division.
+# This is used if the graph is constructed with symbolic divisions. The nodes for the first division are added to
+# the graph as usual, and the values for the other divisions are only generated when the makefiles are written. The
+# values of the option node that created the divisions are stored, along with the text added to the filenames for
+# each division. As when divisions are consolidated, the filenames for a division are generated by replacing the
+# text for the first division with the text for the requested division.
+class divisionDescriptor:
+  def __init__(self, nodeId, argument, values, divisionValues):
+
+    # The option node whose values created the divisions and the values for each division.
+    self.nodeId = nodeId
+    self.values = values
+
+    # The text added to the filenames for each division.
+    self.divisionText = [str('_' + argument.strip('-') + str(value)) for value in divisionValues]
+
+  # Return the number of divisions.
+  def getNumberOfDivisions(self):
+    return len(self.values)
+
+  # Return the value for a division (numbered from 1) given the value for the first division.
+  def expand(self, value, division):
+    if division == 1 or value is None: return value
+    return str(value).replace(self.divisionText[0], self.divisionText[division - 1])
+
+# Define a directed graph that keeps an index of the graph nodes of each type, along with the input file, output
+# file and option nodes of each task. The node index is updated as nodes are added and removed, and the nodes
+# stored for a task are discarded whenever an edge into or out of the task changes, so that finding nodes does not
+# require examining every node in the graph.
+class indexedDiGraph(nx.DiGraph):
+  def __init__(self, data = None, **attr):
+
+    # Store the type of each graph node. The nodes of a type are found by filtering the graph nodes with this index, so
+    # that they are returned in the same order as the graph nodes.
+    self.nodeTypes = {}
+
+    # Store the input file, output file and option nodes for each task (populated as tasks are queried).
+    self.taskNodes = {}
+
+    # Initialise the graph.
+    nx.DiGraph.__init__(self, data, **attr)
+
+  # Add a node to the graph and index it by its type. If the node already exists, its attributes may have changed,
+  # so the nodes stored for any connected tasks are discarded.
+  def add_node(self, n, attr_dict = None, **attr):
+    if n in self.succ:
+      self.removeFromIndex(n)
+      self.resetTaskNodes([n] + self.succ[n].keys() + self.pred[n].keys())
+    nx.DiGraph.add_node(self, n, attr_dict, **attr)
+    self.addToIndex(n)
+
+  # Add multiple nodes to the graph.
+  def add_nodes_from(self, nodes, **attr):
+    nx.DiGraph.add_nodes_from(self, nodes, **attr)
+    self.buildIndex()
+
+  # Remove a node from the graph.
+  def remove_node(self, n):
+    nodeIds = [n] + self.succ[n].keys() + self.pred[n].keys() if n in self.succ else []
+    nx.DiGraph.remove_node(self, n)
+    self.removeFromIndex(n)
+    self.resetTaskNodes(nodeIds)
+
+  # Remove multiple nodes from the graph.
+  def remove_nodes_from(self, nbunch):
+    nx.DiGraph.remove_nodes_from(self, nbunch)
+    self.buildIndex()
+
+  # Add an edge to the graph. Nodes created with the edge have no attributes and so are not indexed.
+  def add_edge(self, u, v, attr_dict = None, **attr):
+    nx.DiGraph.add_edge(self, u, v, attr_dict, **attr)
+    self.resetTaskNodes([u, v])
+
+  # Add multiple edges to the graph.
+  def add_edges_from(self, ebunch, attr_dict = None, **attr):
+    nx.DiGraph.add_edges_from(self, ebunch, attr_dict, **attr)
+    self.taskNodes = {}
+
+  # Remove an edge from the graph.
+  def remove_edge(self, u, v):
+    nx.DiGraph.remove_edge(self, u, v)
+    self.resetTaskNodes([u, v])
+
+  # Remove multiple edges from the graph.
+  def remove_edges_from(self, ebunch):
+    nx.DiGraph.remove_edges_from(self, ebunch)
+    self.taskNodes = {}
+
+  # Remove all nodes and edges from the graph.
+  def clear(self):
+    nx.DiGraph.clear(self)
+    self.nodeTypes   = {}
+    self.taskNodes   = {}
+
+  # Return the type of a node.
+  def getNodeType(self, nodeId):
+    return getattr(self.node[nodeId].get('attributes'), 'nodeType', None)
+
+  # Add a node to the index of node types.
+  def addToIndex(self, nodeId):
+    nodeType = self.getNodeType(nodeId)
+    if nodeType: self.nodeTypes[nodeId] = nodeType
+
+  # Remove a node from the index.
+  def removeFromIndex(self, nodeId):
+    self.nodeTypes.pop(nodeId, None)
+
+  # Rebuild the index of all nodes.
+  def buildIndex(self):
+    self.nodeTypes   = {}
+    self.taskNodes   = {}
+    for nodeId in self.node: self.addToIndex(nodeId)
+
+  # Discard the stored nodes for a list of tasks.
+  def resetTaskNodes(self, nodeIds):
+    for nodeId in nodeIds: self.taskNodes.pop(nodeId, None)
+
+  # Return the nodes of the requested types, in graph order.
+  def getNodesOfType(self, nodeTypes):
+    return [nodeId for nodeId in self.node if self.nodeTypes.get(nodeId) in nodeTypes]
+
+  # Return the input file, output file and option nodes for a task.
+  def getTaskNodes(self, task):
+    if task not in self.taskNodes:
+      inputNodeIds  = []
+      outputNodeIds = []
+      optionNodeIds = []
+      for nodeId in self.predecessors(task):
+        nodeType = self.getNodeType(nodeId)
+        if nodeType == 'file': inputNodeIds.append(nodeId)
+        elif nodeType == 'option': optionNodeIds.append(nodeId)
+      for nodeId in self.successors(task):
+        if self.getNodeType(nodeId) == 'file': outputNodeIds.append(nodeId)
+      self.taskNodes[task] = (inputNodeIds, outputNodeIds, optionNodeIds)
+
+    # Return the nodes.
+    return self.taskNodes[task]
 
 # Define a class to store and manipulate the pipeline graph.
 class pipelineGraph:
@@ -150,11 +326,14 @@ class pipelineGraph:
     self.pipeline = pipeline
 
     # Define the graph.
-    self.graph = nx.DiGraph()
+    self.graph = indexedDiGraph()
 
     # Store the workflow.
     self.workflow = []
 
+    # Store the '.list' files whose values were added to the graph nodes.
+    self.listFiles = []
+
     # Store parameter set information.
     self.parameterSet = None
     self.ps           = ps.parameterSets()
@@ -166,6 +345,13 @@ class pipelineGraph:
     # Keep track of whether a parameter set is being exported.
     self.exportParameterSet = False
 
+    # Record if divisions are represented symbolically, rather than by adding nodes to the graph for each division.
+    self.isSymbolicDivisions = False
+
+    # Store the values of each node that have been checked for consistency, along with the rules they were checked
+    # against, so that the values are only checked again if they have changed.
+    self.checkedValues = {}
+
   # Using a pipeline configuration file, build and connect the defined nodes.
   def buildPipelineTasks(self, pipeline, superpipeline):
 
@@ -670,9 +856,10 @@ class pipelineGraph:
           self.graph.add_edge(source, target, attributes = attributes)
 
   # Associate the configuration node ids for unique nodes that point to nodes in nested pipelines with the
-  # created graph nodes.
+  # created graph nodes. The pipelines are considered from the most deeply nested, so that a node pointing to a
+  # node in a nested pipeline, which itself points to a node in a further nested pipeline, can be found.
   def findUniqueNodes(self, superpipeline):
-    for tier in superpipeline.pipelinesByTier.keys():
+    for tier in sorted(superpipeline.pipelinesByTier.keys(), reverse = True):
       for pipelineName in superpipeline.pipelinesByTier[tier]:
         pipelineData = superpipeline.pipelineConfigurationData[pipelineName]
         for configurationNodeId in pipelineData.uniqueNodeAttributes:
@@ -689,129 +876,91 @@ class pipelineGraph:
             # If the configuration node id is already in the configurationFileToGraphNodeId structure, there has
             # been an error.
             #TODO ERROR
-            if configurationNodeId in self.configurationFileToGraphNodeId: print('ERROR - findUniqueNodes'); exit(1)
+            nodeAddress = address + configurationNodeId
+            if nodeAddress in self.configurationFileToGraphNodeId: print('ERROR - findUniqueNodes'); exit(1)
 
             # The configuration node points to a node in a nested pipeline, so the node must have been constructed.
             # If externalNodeAddress is not in the configurationFileToGraphNodeId structure, there has been an error.
             # TODO ERROR
             if externalNodeAddress not in self.configurationFileToGraphNodeId: print('ERROR - findUniqueNodes'); exit(1)
 
-            # Associate the configuration node with the graph node.
-            self.configurationFileToGraphNodeId[configurationNodeId] = [externalNodeAddress]
+            # Associate the configuration node with the graph nodes. The list of graph nodes is copied, so that it is not
+            # shared with the node in the nested pipeline.
+            self.configurationFileToGraphNodeId[nodeAddress] = list(self.configurationFileToGraphNodeId[externalNodeAddress])
 
-  # Generate a topologically sorted graph.
-  #TODO
+  # Generate the workflow. Tasks with no predecessor tasks are taken in turn and the workflow is extended
+  # from each of these by adding tasks whose predecessor tasks are all in the workflow (Kahn's algorithm).
+  # Tasks added from the same task are ordered by their number of successors, so that tasks with no
+  # successors appear first, and connected (e.g. streamed) tasks are kept together in the workflow.
   def generateWorkflow(self):
 
-    #TODO SEE IF THIS UPDATED METHOD (CURRENTLY INCOMPLETE) IS BETTER THAN THE EXISTING.
     # Define a structure that holds the predecessor and successor tasks for each task in the pipeline.
     class neighbours:
       def __init__(self, predecessors, successors):
         self.predecessors = predecessors
         self.successors   = successors
 
-    # Store all of the tasks by their tier in the pipeline.
-    tasksByTier    = {}
-    tasksByTier[1] = {}
-
     # Determine all of the tasks in the pipeline.
-    remainingTasks = {}
-    tasks          = []
+    tasks = []
     for nodeId in nx.topological_sort(self.graph):
       if self.getGraphNodeAttribute(nodeId, 'nodeType') == 'task': tasks.append(nodeId)
+    taskSet = set(tasks)
 
     # Loop over all of the tasks in the pipeline and determine which have no predecessors. Store these as the first
-    # tier of tasks. For all tasks, keep track of the predecessor and successor tasks for final sorting of the tasks.
+    # tier of tasks. For all tasks, keep track of the predecessor and successor tasks and the number of predecessor
+    # tasks that are not yet in the workflow.
+    firstTier             = {}
+    taskNeighbours        = {}
+    remainingPredecessors = {}
     for task in tasks:
 
       # Get all the predecessor tasks.
-      predecessors = []
-      for predecessor in self.graph.predecessors(task):
-        for predecessorTask in self.graph.predecessors(predecessor):
-          if self.getGraphNodeAttribute(predecessorTask, 'nodeType') == 'task' and predecessorTask not in predecessors: predecessors.append(predecessorTask)
+      predecessors = self.getNeighbouringTasks(self.graph.predecessors, task, taskSet)
 
       # Get all the successor tasks.
-      successors = []
-      for successor in self.graph.successors(task):
-        for successorTask in self.graph.successors(successor):
-          if self.getGraphNodeAttribute(successorTask, 'nodeType') == 'task' and successorTask not in successors: successors.append(successorTask)
+      successors = self.getNeighbouringTasks(self.graph.successors, task, taskSet)
 
       # If the task has no predecessors, store it as a first tier task.
-      if not predecessors: tasksByTier[1][task] = neighbours(predecessors, successors)
-      else: remainingTasks[task] = neighbours(predecessors, successors)
-
-    # Loop over the the tasks that have predecessors and rank the tasks by tier. Tier 2 tasks are dependent on tier 1 etc.
-    tier = 2
-    while len(remainingTasks) > 0:
-      removeTasks       = []
-      tasksByTier[tier] = {}
-      for task in remainingTasks:
-
-        # Check all the tasks predecessors and see if any of them appear in the previous tier. If so, and none of the tasks
-        # are in the remainingTasks, store this task as a member of the current tier.
-        hasTaskInPreviousTier   = False
-        hasTaskinRemainingTasks = False
-        for predecessor in remainingTasks[task].predecessors:
-          if predecessor in tasksByTier[tier - 1].keys(): hasTaskInPreviousTier = True
-          elif predecessor in remainingTasks: hasTaskinRemainingTasks = True
-
-        if hasTaskInPreviousTier and not hasTaskinRemainingTasks:
-          tasksByTier[tier][task] = remainingTasks[task]
-          if task not in removeTasks: removeTasks.append(task)
-
-      # All tasks that have been added to this tier need to be removed from the remaining tasks list.
-      for task in removeTasks: del(remainingTasks[task])
-
-      # Increment the tier.
-      tier += 1
+      taskNeighbours[task]        = neighbours(predecessors, successors)
+      remainingPredecessors[task] = len(predecessors)
+      if not predecessors: firstTier[task] = taskNeighbours[task]
 
     # Loop over the first tier tasks until all have been added to the workflow.
-    while len(tasksByTier[1]) > 0:
+    inWorkflow = set()
+    while firstTier:
 
-      # Pick a task from the first tier and step through the tiers adding tasks that connect to this task.
-      tier         = 1
-      task, struct = tasksByTier[tier].popitem()
-      self.workflow.append(task)
+      # Pick a task from the first tier and step through the tasks that connect to this task.
+      task, struct = firstTier.popitem()
+      self.addTaskToWorkflow(task, inWorkflow, taskNeighbours, remainingPredecessors)
 
-      # Define the tasks available in the next tier.
-      tasks = struct.successors
+      # Define the tasks available for adding to the workflow.
+      nextTasks = struct.successors
 
-      # Loop over the tasks in the next tier, searching for tasks dependent on the present task.
-      while len(tasks) > 0:
+      # Loop over the successor tasks, searching for tasks whose predecessors are all in the workflow.
+      while nextTasks:
         availableTasks = {}
-        for successor in tasks:
-          if successor in tasksByTier[tier + 1]:
-  
-            # Check that all the predecessors to this task are already in the workflow. If not, the task cannot be
-            # added to the workflow yet.
-            hasPredecessors = True
-            for predecessor in tasksByTier[tier + 1][successor].predecessors:
-              if predecessor not in self.workflow: hasPredecessors = False
-  
-            # Only add the task if all predecessors are in the workflow.
-            if hasPredecessors:
-              noSuccessors = len(tasksByTier[tier + 1][successor].successors)
-              if noSuccessors not in availableTasks: availableTasks[noSuccessors] = []
-              availableTasks[noSuccessors].append(successor)
-    
-        # Loop over the tasks from the next tier and add to the workflow. If there are multiple tasks, prioritize
-        # based on the minimum number of successors to that task. In particular, of the successor itself has no
-        # successors, it should appear first in the workflow.
-        tasks = []
+        checkedTasks   = set()
+        for successor in nextTasks:
+          if successor not in checkedTasks and successor not in inWorkflow and remainingPredecessors[successor] == 0:
+            noSuccessors = len(taskNeighbours[successor].successors)
+            if noSuccessors not in availableTasks: availableTasks[noSuccessors] = []
+            availableTasks[noSuccessors].append(successor)
+          checkedTasks.add(successor)
+
+        # Loop over the available tasks and add to the workflow. If there are multiple tasks, prioritize based on the
+        # minimum number of successors to that task. In particular, of the successor itself has no successors, it should
+        # appear first in the workflow.
+        nextTasks = []
         for noSuccessors in sorted(availableTasks):
           for task in availableTasks[noSuccessors]:
-            self.workflow.append(task)
-  
+            self.addTaskToWorkflow(task, inWorkflow, taskNeighbours, remainingPredecessors)
+
             # Add the sucecssors to the task added to the workflow to the tasks list. This list will be used to
-            # continue extending the workflow into the next tier.
-            tasks.extend(tasksByTier[tier + 1].pop(task).successors)
-  
-        # Increment the tier.
-        tier += 1
+            # continue extending the workflow.
+            nextTasks.extend(taskNeighbours[task].successors)
 
-    # If there are still tasks in reaminingTasks, not all tasks have been added to the workflow. In this case, terminate
-    # since the workflow is incomplete.
-    if len(remainingTasks) != 0: print('ERROR - graph.generateWorkflow - workflow incomplete'); exit(1)
+    # If not all tasks have been added to the workflow, terminate since the workflow is incomplete.
+    if len(inWorkflow) != len(tasks): print('ERROR - graph.generateWorkflow - workflow incomplete'); exit(1)
 
     # Return the workflow.
     return self.workflow
@@ -950,6 +1099,26 @@ class pipelineGraph:
     # Return the workflow.
     return self.workflow
 
+  # Return the tasks that are separated from a task by a single file or option node. The neighbours function is
+  # either the predecessors or successors method of the graph.
+  def getNeighbouringTasks(self, neighbours, task, taskSet):
+    neighbouringTasks = []
+    observedTasks     = set()
+    for nodeId in neighbours(task):
+      for neighbouringTask in neighbours(nodeId):
+        if neighbouringTask in taskSet and neighbouringTask not in observedTasks:
+          neighbouringTasks.append(neighbouringTask)
+          observedTasks.add(neighbouringTask)
+
+    # Return the tasks.
+    return neighbouringTasks
+
+  # Add a task to the workflow and update the number of predecessors not in the workflow for its successors.
+  def addTaskToWorkflow(self, task, inWorkflow, taskNeighbours, remainingPredecessors):
+    self.workflow.append(task)
+    inWorkflow.add(task)
+    for successor in taskNeighbours[task].successors: remainingPredecessors[successor] -= 1
+
   # Determine which graph nodes are required. A node may be used by multiple tasks and may be optional
   # for some and required by others. For each node, loop over all edges and check if any of the edges
   # are listed as required. If so, the node is required and should be marked as such.
@@ -1234,8 +1403,10 @@ class pipelineGraph:
         values = self.getGraphNodeAttribute(nodeId, 'values')
   
         # Loop over the values and check if any of them end in '.list'. If so, this is a list of values which should be
-        # opened and all the values added to the node.
+        # opened and all the values added to the node. The values in the list are not read from the file until they are
+        # used, so if the node only has a single list, the values from the list are used as the node values.
         modifiedValues = []
+        isListOnly     = len(values) == 1
         for value in values:
   
           # If this is a list.
@@ -1266,8 +1437,12 @@ class pipelineGraph:
                 argument = self.getArgumentAttribute(nodeId, task, 'longFormArgument')
                 fe.fileErrors().missingList(task, value)
     
-              # Loop over the values in the file, stripping off whitespace.
-              for dataValue in [name.strip() for name in data]: modifiedValues.append(dataValue)
+              # Get the values in the file, stripping off whitespace.
+              listValues = lv.listValues(data)
+              fh.fileHandling.closeFile(data)
+              self.listFiles.append(value)
+              if isListOnly: modifiedValues = listValues
+              else: modifiedValues.extend(listValues)
   
           # If the value does not end with '.list', add it to the modifiedValues list.
           else: modifiedValues.append(value)
@@ -1309,7 +1484,7 @@ class pipelineGraph:
           if len(values) == 1 and noOutputs > 1 and (noOutputs == noOptions):
 
             # Propogate the input file.
-            for i in range(1, noOutputs): values.append(values[0])
+            self.setGraphNodeAttribute(nodeId, 'values', values * noOutputs)
 
   # Identify tasks marked as greedy and mark the nodes and edges.
   def setGreedyTasks(self, superpipeline):
@@ -1410,6 +1585,12 @@ class pipelineGraph:
       # all divisions on the command line), the task node needs to duplicated so that there are as many task nodes as
       # there are divisions.
       elif divisions > 1:
+
+        # If the divisions are symbolic, describe the divisions rather than adding nodes for each division.
+        if self.isSymbolicDivisions:
+          if isFirstTaskInDivision: descriptor = self.describeDivisions(task, divisionNode)
+          else: descriptor = self.getDivisionDescriptor(task)
+          self.setGraphNodeAttribute(task, 'divisionDescriptor', descriptor)
         self.divideTask(superpipeline, task, divisions, divisionNode)
 
         # If this task breaks into divisions, it's input file nodes are not already broken into divisions. The only
@@ -1422,7 +1603,7 @@ class pipelineGraph:
         # files. The input file nodes need to connect to the correct task node and then the outputs for that task
         # need to be created.
         else: 
-          self.connectDivisionInputs(task)
+          if not self.isSymbolicDivisions: self.connectDivisionInputs(task)
           self.extendDivisionOutputFiles(superpipeline, task)
 
       # If there are no divisions, no new task nodes need to be constructed, or equivalently, no new output nodes. The
@@ -1616,7 +1797,8 @@ class pipelineGraph:
             else: print('ERROR - Haven\'t handled other construction methods - graph.consolidateDivisions'); exit(1)
 
           # Now link all of the outputs from the previous division nodes to this task.
-          for child in self.getGraphNodeAttribute(predecessor, 'children'): self.graph.add_edge(child, task, attributes = deepcopy(self.getEdgeAttributes(predecessor, task)))
+          edgeAttributes = self.getSharedAttributes(self.getEdgeAttributes(predecessor, task))
+          for child in self.getGraphNodeAttribute(predecessor, 'children'): self.graph.add_edge(child, task, attributes = divisionAttributes(edgeAttributes))
 
   # Check if files have random text to remove.
   def checkRandomText(self, nodeId, predecessor, values):
@@ -1643,13 +1825,17 @@ class pipelineGraph:
   # For a task that has multiple divisions, divide the task up so that there exists a task node for each division.
   def divideTask(self, superpipeline, task, divisions, divisionNode):
 
-    # Create the new task nodes.
+    # Get the task node attributes and the attributes of the edges into the task to share between the divisions.
+    taskAttributes = self.getSharedAttributes(self.getNodeAttributes(task))
+    edgeAttributes = [(nodeId, self.getSharedAttributes(self.getEdgeAttributes(nodeId, task))) for nodeId in self.graph.predecessors(task)]
+
+    # Create the new task nodes. If the divisions are symbolic, no nodes are created for the divisions.
     children = []
-    for i in range(1, divisions):
+    for i in range(1, 1 if self.isSymbolicDivisions else divisions):
       taskID = str(task + str(i))
 
-      # Make a copy of the task node attributes and update.
-      attributes              = deepcopy(self.getNodeAttributes(task))
+      # Share the task node attributes and update.
+      attributes              = divisionAttributes(taskAttributes)
       attributes.isChild      = True
       attributes.parent       = task
       attributes.divisions    = divisions
@@ -1658,7 +1844,7 @@ class pipelineGraph:
       self.addTaskNode(superpipeline, taskID, task, attributes)
 
       # Connect all task predecessors to the new node. Succesors will be dealt with later.
-      for nodeId in self.graph.predecessors(task): self.addEdge(nodeId, taskID, deepcopy(self.getEdgeAttributes(nodeId, task)))
+      for nodeId, sharedAttributes in edgeAttributes: self.graph.add_edge(nodeId, taskID, attributes = divisionAttributes(sharedAttributes))
 
       # Keep track of the child nodes.
       children.append(taskID)
@@ -1688,9 +1874,9 @@ class pipelineGraph:
 
     # Loop over the file nodes and link them to their respective task node. In addition, remove the edge connecting
     # the parent node to the task.
+    edgeAttributes = self.getSharedAttributes(self.getEdgeAttributes(parentNode, task))
     for fileNode, taskNode in zip(fileNodes, taskNodes):
-      attributes = deepcopy(self.getEdgeAttributes(parentNode, task))
-      self.graph.add_edge(str(fileNode), str(taskNode), attributes = attributes)
+      self.graph.add_edge(str(fileNode), str(taskNode), attributes = divisionAttributes(edgeAttributes))
       self.graph.remove_edge(parentNode, taskNode)
 
   # Loop over all the input files for the task and check how many have been defined. If the number of set files
@@ -1826,10 +2012,15 @@ class pipelineGraph:
           isIntermediate = self.getGraphNodeAttribute(nodeId, 'isIntermediate')
           randomString   = superpipeline.randomString
 
+          # Get the file node attributes and the attributes of the edge from the task to share between the divisions.
+          nodeAttributes = self.getSharedAttributes(self.getNodeAttributes(nodeId))
+          edgeAttributes = self.getSharedAttributes(self.getEdgeAttributes(task, nodeId))
+
           # Loop over the base values (except the first - that will be dealt with at the end when updating the file node
           # that already exists), construct the output filenames, then build and add the node with an edge from the task.
+          # If the divisions are symbolic, only the existing node is updated.
           children = []
-          for i in range(1, len(divisionValues)):
+          for i in range(1, 1 if self.isSymbolicDivisions else len(divisionValues)):
 
             # Define the name of the new node.
             fileNodeId = nodeId + str(i)
@@ -1841,8 +2032,8 @@ class pipelineGraph:
             values       = construct.addDivisionToValue(self.graph, superpipeline, task, nodeId, instructions, baseValues, argument, divisionValues[i])
             divisionText = str('_' + argument.strip('-') + str(divisionValues[i]))
 
-            # Copy the attributes from the existing node and update the values.
-            attributes              = deepcopy(self.getNodeAttributes(nodeId))
+            # Share the attributes from the existing node and update the values.
+            attributes              = divisionAttributes(nodeAttributes)
             attributes.divisionID   = i
             attributes.divisionText = divisionText
             attributes.isChild      = True
@@ -1858,13 +2049,14 @@ class pipelineGraph:
             # Add the new file node.
             self.graph.add_node(str(fileNodeId), attributes = attributes)
 
-            # Make a copy of the edge attributes and join the new file node to its task.
-            self.graph.add_edge(str(taskNodeId), str(fileNodeId), attributes = deepcopy(self.getEdgeAttributes(task, nodeId)))
+            # Share the edge attributes and join the new file node to its task.
+            self.graph.add_edge(str(taskNodeId), str(fileNodeId), attributes = divisionAttributes(edgeAttributes))
 
           # Now perform the same tasks for the existing node.
           values       = construct.addDivisionToValue(self.graph, superpipeline, task, nodeId, instructions, baseValues, argument, divisionValues[0])
           divisionText = str('_' + argument.strip('-') + str(divisionValues[0]))
           self.setGraphNodeAttribute(nodeId, 'children', children)
+          self.setGraphNodeAttribute(nodeId, 'divisionDescriptor', self.getGraphNodeAttribute(task, 'divisionDescriptor'))
           self.setGraphNodeAttribute(nodeId, 'divisionID', 0)
           self.setGraphNodeAttribute(nodeId, 'divisionText', divisionText)
           self.setGraphNodeAttribute(nodeId, 'isParent', True)
@@ -1881,6 +2073,17 @@ class pipelineGraph:
           tool     = self.getGraphNodeAttribute(task, 'tool')
           tce.toolErrors().invalidConstructionMethod(task, tool, argument, instructions['method'])
 
+  # Describe the divisions created by the values of an option node, for use with symbolic divisions.
+  def describeDivisions(self, task, divisionNode):
+    argument = self.getArgumentAttribute(divisionNode, task, 'longFormArgument')
+    return divisionDescriptor(divisionNode, argument, self.getGraphNodeAttribute(divisionNode, 'values'), self.getDivisionValues(divisionNode))
+
+  # Get the description of the divisions for a task acting on divisions created by a previous task.
+  def getDivisionDescriptor(self, task):
+    for nodeId in self.getInputFileNodes(task):
+      descriptor = self.getGraphNodeAttribute(nodeId, 'divisionDescriptor')
+      if descriptor: return descriptor
+
   # Update the values supplied to the option argument to ensure that they do not contain any special
   # characters.
   def getDivisionValues(self, nodeId):
@@ -1919,6 +2122,10 @@ class pipelineGraph:
           # Get the argument and values associated with the node that has forced the divisions.
           self.setGraphNodeAttribute(nodeId, 'divisions', divisions)
 
+          # Get the file node attributes and the attributes of the edge from the task to share between the divisions.
+          sharedNodeAttributes = self.getSharedAttributes(self.getNodeAttributes(nodeId))
+          sharedEdgeAttributes = self.getSharedAttributes(self.getEdgeAttributes(task, nodeId))
+
           # Loop over the children of the task and determine their values.
           children = []
           for i, child in enumerate(self.getGraphNodeAttribute(task, 'children')):
@@ -1931,9 +2138,9 @@ class pipelineGraph:
             # Get the additional text that was added to the filename.
             divisionText = self.getDivisionText(child)
 
-            # Get a copy of the existing file node attributes along with the attributes for the output edge.
-            nodeAttributes = deepcopy(self.getNodeAttributes(nodeId))
-            edgeAttributes = deepcopy(self.getEdgeAttributes(task, nodeId))
+            # Share the existing file node attributes along with the attributes for the output edge.
+            nodeAttributes = divisionAttributes(sharedNodeAttributes)
+            edgeAttributes = divisionAttributes(sharedEdgeAttributes)
 
             # Update the node attributes and add the node to the graph.
             nodeAttributes.values       = values
@@ -1953,6 +2160,7 @@ class pipelineGraph:
           divisionText = self.getDivisionText(task)
           self.setGraphNodeAttribute(nodeId, 'values', values)
           self.setGraphNodeAttribute(nodeId, 'children', children)
+          self.setGraphNodeAttribute(nodeId, 'divisionDescriptor', self.getGraphNodeAttribute(task, 'divisionDescriptor'))
           self.setGraphNodeAttribute(nodeId, 'divisionID', 0)
           self.setGraphNodeAttribute(nodeId, 'divisionText', divisionText)
           self.setGraphNodeAttribute(nodeId, 'isParent', True)
@@ -2052,10 +2260,12 @@ class pipelineGraph:
     if task not in self.workflow: print('ERROR - terminateConsolidate 2'); exit(1)
     if not self.getGraphNodeAttribute(task, 'consolidate'): print('ERROR - terminateConsolidate 3'); exit(1)
 
-    # Check if the consolidating task has any predecessors that are children. If so, the pipeline should not
-    # terminate early.
+    # Check if the consolidating task has any predecessors that are children, or that hold symbolic divisions. If so,
+    # the pipeline should not terminate early.
     for predecessor in self.getPredecessors(task):
       if self.getGraphNodeAttribute(predecessor, 'isChild'): return False
+      descriptor = self.getGraphNodeAttribute(predecessor, 'divisionDescriptor')
+      if descriptor and descriptor.getNumberOfDivisions() > 1: return False
     return True
 
   # Check that tasks listed as streaming can be streamed in te pipeline.
@@ -2180,6 +2390,19 @@ class pipelineGraph:
         if outputs != subphases and not isGreedy: self.errors.outputsSubphases(task, argument, outputs, subphases)
         if outputs > 1 and isGreedy: self.errors.multipleOutputsForGreedyTask(task, argument, outputs, subphases)
 
+  # Set the number of threads used by each task. If the tool has an argument setting the number of threads and the
+  # argument has been given a value, the task uses this number of threads rather than the number defined for the tool.
+  def setThreads(self, superpipeline):
+    for task in self.workflow:
+      threadsArgument = superpipeline.getToolData(self.getGraphNodeAttribute(task, 'tool')).threadsArgument
+      if not threadsArgument: continue
+      for nodeId in self.getOptionNodes(task):
+        if self.getArgumentAttribute(nodeId, task, 'longFormArgument') == threadsArgument:
+          values = self.getGraphNodeAttribute(nodeId, 'values')
+          try:
+            if values: self.setGraphNodeAttribute(task, 'threads', max([int(value) for value in values] + [1]))
+          except ValueError: pass
+
   # Determine after which task intermediate files should be deleted.
   def deleteFiles(self):
 
@@ -2223,6 +2446,12 @@ class pipelineGraph:
     # Mark the node for plotting.
     attributes.includeInReducedPlot = superpipeline.tasksInPlot[parentTask]
 
+    # Store the resources required by the task.
+    toolData            = superpipeline.getToolData(attributes.tool)
+    attributes.threads  = toolData.threads
+    attributes.memory   = toolData.memory
+    attributes.ioWeight = toolData.ioWeight
+
     # Add the node to the graph.
     self.graph.add_node(task, attributes = attributes)
 
@@ -2243,8 +2472,7 @@ class pipelineGraph:
       #FIXME THIS IS ADDED FOR CONNECTING NODES. CHECK.
       if not linkedConfigurationFileNodeIds: linkedConfigurationFileNodeIds = []
       if configurationFileNodeId not in linkedConfigurationFileNodeIds:
-        linkedConfigurationFileNodeIds.append(configurationFileNodeId)
-        self.setGraphNodeAttribute(graphNodeId, 'configurationFileNodeIds', linkedConfigurationFileNodeIds)
+        self.setGraphNodeAttribute(graphNodeId, 'configurationFileNodeIds', linkedConfigurationFileNodeIds + [configurationFileNodeId])
 
     # Link this configuration node ID with the created graph node ID.
     if configurationFileNodeId not in self.configurationFileToGraphNodeId:
@@ -2289,6 +2517,12 @@ class pipelineGraph:
     if isOutput: self.graph.add_edge(task, str(nodeId), attributes = argumentAttributes)
     else: self.graph.add_edge(str(nodeId), task, attributes = argumentAttributes)
 
+  # Return a copy of the attributes of a node or edge to be shared by the divisions of a task. Only the references to
+  # the attribute values are copied, so the shared attributes are unaffected by attributes subsequently being set for
+  # the original node or edge (e.g. marking a task as the parent of the divisions).
+  def getSharedAttributes(self, attributes):
+    return copy(attributes)
+
   # Add an edge to the graph.
   def addEdge(self, source, target, attributes):
     self.graph.add_edge(source, target, attributes = deepcopy(attributes))
@@ -2372,27 +2606,15 @@ class pipelineGraph:
 
   # Return a list of all input file nodes.
   def getInputFileNodes(self, task):
-    fileNodeIds = []
-    for nodeId in self.graph.predecessors(task):
-      if self.getGraphNodeAttribute(nodeId, 'nodeType') == 'file': fileNodeIds.append(nodeId)
-
-    return fileNodeIds
+    return list(self.graph.getTaskNodes(task)[0])
 
   # Return a list of all output file nodes.
   def getOutputFileNodes(self, task):
-    fileNodeIds = []
-    for nodeId in self.graph.successors(task):
-      if self.getGraphNodeAttribute(nodeId, 'nodeType') == 'file': fileNodeIds.append(nodeId)
-
-    return fileNodeIds
+    return list(self.graph.getTaskNodes(task)[1])
 
   # Return a list of all option nodes.
   def getOptionNodes(self, task):
-    optionNodeIds = []
-    for nodeId in self.graph.predecessors(task):
-      if self.getGraphNodeAttribute(nodeId, 'nodeType') == 'option': optionNodeIds.append(nodeId)
-
-    return optionNodeIds
+    return list(self.graph.getTaskNodes(task)[2])
 
   # Return a list of all nodes of the requested type.
   def getNodes(self, nodeType):
@@ -2400,12 +2622,7 @@ class pipelineGraph:
     # If a single node type is supplied, turn nodeType into a list.
     if not isinstance(nodeType, list): nodeType = [nodeType]
 
-    nodeIds = []
-    for nodeId in self.graph.nodes():
-      if nodeType == 'all': nodeIds.append(nodeId)
-      elif self.getGraphNodeAttribute(nodeId, 'nodeType') in nodeType: nodeIds.append(nodeId)
-
-    return nodeIds
+    return self.graph.getNodesOfType(nodeType)
 
   # Get all predecessor nodes.
   def getPredecessors(self, nodeId):
@@ -2438,6 +2655,7 @@ class pipelineGraph:
   # Return a list of all nodes of the a requested type.
   @classmethod
   def CM_getNodes(cls, graph, nodeType):
+    if isinstance(graph, indexedDiGraph): return graph.getNodesOfType([nodeType])
     nodeIds = []
     for nodeId in graph.nodes():
       if cls.CM_getGraphNodeAttribute(graph, nodeId, 'nodeType') == nodeType: nodeIds.append(nodeId)
@@ -2462,6 +2680,7 @@ class pipelineGraph:
     if cls.CM_getGraphNodeAttribute(graph, task, 'nodeType') != 'task': print('ERROR - getInputNodes - 1'); exit(0)
 
     # Get the predecessor nodes.
+    if isinstance(graph, indexedDiGraph): return list(graph.getTaskNodes(task)[0])
     nodeIds = []
     for nodeId in graph.predecessors(task):
       if cls.CM_getGraphNodeAttribute(graph, nodeId, 'nodeType') == 'file': nodeIds.append(nodeId)
@@ -5,10 +5,8 @@ from difflib import SequenceMatcher
 
 import helpErrors as err
 import stringOperations as so
-import pipelineConfiguration as pc
 import parameterSets as ps
 
-import os
 import sys
 import textwrap
 
@@ -48,6 +46,10 @@ class helpInformation:
     # Define the maximum width of a line. THis will be modified by including tabs.
     self.width = 150
 
+    # The configuration cache holding the index of pipeline names, descriptions and categories used when listing
+    # pipelines.
+    self.configurationCache = None
+
   # Provide general help.
   def generalHelp(self, mode, category, admin, path):
 
@@ -153,22 +155,19 @@ class helpInformation:
   def findPipelinesInCategories(self, path):
     categories   = {}
     descriptions = {}
-    for filename in os.listdir(path):
-      if filename.endswith(".json"):
-        pipeline = pc.pipelineConfiguration(allowTermination = False)
-        success  = pipeline.getConfigurationData(path + '/' + filename)
+    for summary in self.configurationCache.getPipelineIndex(path).values():
 
-        # Store the pipeline description if the pipeline is not developmental.
-        if success and not pipeline.isDevelopment:
-          descriptions[pipeline.name] = pipeline.description
+      # Store the pipeline description if the pipeline is not developmental.
+      if summary.success and not summary.isDevelopment:
+        descriptions[summary.name] = summary.description
 
-          # Loop over the categories and populate the data structure.
-          for category in pipeline.categories:
+        # Loop over the categories and populate the data structure.
+        for category in summary.categories:
 
-            # Check that the category is allowed.
-            if category not in self.helpCategories: self.errors.invalidCategory(pipeline.name, category, self.helpCategories)
-            if category not in categories: categories[str(category)] = [str(pipeline.name)]
-            else: categories[str(category)].append(str(pipeline.name))
+          # Check that the category is allowed.
+          if category not in self.helpCategories: self.errors.invalidCategory(summary.name, category, self.helpCategories)
+          if category not in categories: categories[category] = [summary.name]
+          else: categories[category].append(summary.name)
 
     # Return the dictionary containing all the tools connected to each category.
     return categories, descriptions
@@ -195,22 +194,18 @@ class helpInformation:
     self.writeSimpleLine('Following is a list of all of the pipelines currently available:', isIndent = False, noLeadingTabs = 0)
     print(file = sys.stdout)
 
-    # Get the names and descriptions for all the pipelines.
+    # Get the names and descriptions for all the pipelines from the pipeline index.
     descriptions    = {}
     failedPipelines = []
-    for filename in os.listdir(path):
-      if filename.endswith(".json"):
-        pipeline                  = pc.pipelineConfiguration()
-        pipeline.allowTermination = False
-        success                   = pipeline.getConfigurationData(path + '/' + filename)
+    for summary in self.configurationCache.getPipelineIndex(path).values():
 
-        # If the pipeline configuration was successfully parsed, get and store the description if the pipeline
-        # is not developmental.
-        if success:
-          if not pipeline.isDevelopment: descriptions[pipeline.name] = pipeline.description
+      # If the pipeline configuration was successfully parsed, get and store the description if the pipeline
+      # is not developmental.
+      if summary.success:
+        if not summary.isDevelopment: descriptions[summary.name] = summary.description
 
-        # If there are errors with the pipeline configuration file, mark it as having errors.
-        else: failedPipelines.append(pipeline.name)
+      # If there are errors with the pipeline configuration file, mark it as having errors.
+      else: failedPipelines.append(summary.name)
 
     # Write out all the pipelines with their descriptions.
     length = len(max(descriptions.keys(), key = len)) + 3
@@ -268,6 +263,9 @@ class helpInformation:
     self.writeSimpleLine('To see help for a particular pipeline, including general gkno arguments, use the command line:', isIndent = False, noLeadingTabs = 2)
     self.writeSimpleLine('gkno <pipeline> --gkno-arguments (-ga)', isIndent = False, noLeadingTabs = 4)
     print(file = sys.stdout)
+    self.writeSimpleLine('To summarise the runtime of tasks in pipelines executed with --profile-tasks (-pt), type:', isIndent = False, noLeadingTabs = 2)
+    self.writeSimpleLine('gkno profile-report [profiles]', isIndent = False, noLeadingTabs = 4)
+    print(file = sys.stdout)
 
   # Print out help on gkno arguments.
   def gknoArgumentHelp(self, arguments):
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+
+from __future__ import print_function
+
+import argparse
+import errno
+import fcntl
+import math
+import os
+import re
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+
+# Execute a command from a gkno makefile once the job slots required by the command are available. When make is
+# run with multiple jobs, each running rule holds a single job slot. Tasks that use multiple threads, or a large
+# fraction of the available memory or I/O, take additional job slots (tokens) from the make jobserver before
+# executing, and return them once complete. This ensures that the total resources used by the pipeline do not
+# exceed the number of jobs given to make.
+#
+# The number of job slots required is the largest of the number of threads, the fraction of the maximum memory
+# and the fraction of the maximum I/O weight required by the task (as a fraction of the number of jobs), and never
+# exceeds the number of jobs. If make is not running in parallel, the command is executed immediately.
+def main():
+  parser = argparse.ArgumentParser(description = 'Execute a command using multiple make job slots.')
+  parser.add_argument('--threads', type = int, default = 1)
+  parser.add_argument('--memory', type = int, default = 0)
+  parser.add_argument('--max-memory', type = int, default = 0)
+  parser.add_argument('--io-weight', type = int, default = 0)
+  parser.add_argument('--max-io-weight', type = int, default = 0)
+  parser.add_argument('command', nargs = argparse.REMAINDER)
+  args = parser.parse_args()
+  if args.command and args.command[0] == '--': args.command = args.command[1:]
+
+  # Get the number of jobs and the jobserver from make.
+  makeflags = os.environ.get('MAKEFLAGS', '')
+  jobs      = getNumberJobs(makeflags)
+  readFd, writeFd = getJobserver(makeflags) if jobs > 1 else (None, None)
+
+  # Determine the number of job slots required.
+  slots = getJobSlots(args, jobs) if readFd != None else 1
+
+  # Acquire the job slots. The job slot held by the rule executing the command is returned while waiting, otherwise
+  # commands that are all waiting for additional job slots would hold all of the job slots between them. Only a
+  # single command acquires slots at a time, so that commands holding only some of the slots they require cannot
+  # prevent each other from running.
+  tokens = b''
+  try:
+    if slots > 1:
+      os.write(writeFd, b'+')
+      lock = open(getLockFilename(readFd), 'a')
+      try:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        while len(tokens) < slots: tokens += readToken(readFd)
+      finally: lock.close()
+
+    # Execute the command. Interrupts are passed on to the command (which is in the same process group), so the
+    # job slots are only returned once the command has terminated.
+    process = subprocess.Popen(args.command)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    returnCode = process.wait()
+
+  # Return the job slots, other than the job slot held by the rule, which is returned by make.
+  finally:
+    if len(tokens) > 1: os.write(writeFd, tokens[1:])
+
+  # Exit with the exit status of the command.
+  sys.exit(128 - returnCode if returnCode < 0 else returnCode)
+
+# Get the number of jobs make is using.
+def getNumberJobs(makeflags):
+  match = re.search(r'(?:^|\s)-j\s*(\d+)', makeflags)
+  return int(match.group(1)) if match else 1
+
+# Get the file descriptors used to read and return job slots.
+def getJobserver(makeflags):
+  match = re.search(r'--jobserver-(?:auth|fds)=(\S+)', makeflags)
+  if not match: return None, None
+
+  # Newer versions of make use a named pipe.
+  value = match.group(1)
+  try:
+    if value.startswith('fifo:'):
+      fd = os.open(value[5:], os.O_RDWR)
+      return fd, fd
+
+    # Otherwise, the pipe file descriptors are inherited from make.
+    readFd, writeFd = [int(fd) for fd in value.split(',')]
+    os.fstat(readFd)
+    os.fstat(writeFd)
+    return readFd, writeFd
+
+  # If the jobserver cannot be used (e.g. the rule was not marked as recursive), execute without additional slots.
+  except (OSError, ValueError): return None, None
+
+# Determine the number of job slots required.
+def getJobSlots(args, jobs):
+  slots = args.threads
+  if args.max_memory > 0: slots = max(slots, int(math.ceil(float(args.memory) * jobs / args.max_memory)))
+  if args.max_io_weight > 0: slots = max(slots, int(math.ceil(float(args.io_weight) * jobs / args.max_io_weight)))
+  return max(1, min(slots, jobs))
+
+# Get the name of the file used to ensure that only a single command acquires job slots at a time.
+def getLockFilename(fd):
+  information = os.fstat(fd)
+  return os.path.join(tempfile.gettempdir(), 'gkno-job-slots.' + str(information.st_dev) + '.' + str(information.st_ino) + '.lock')
+
+# Read a single token from the jobserver, waiting until one is available.
+def readToken(fd):
+  while True:
+    select.select([fd], [], [])
+    try:
+      token = os.read(fd, 1)
+      if token: return token
+    except OSError as error:
+      if error.errno not in (errno.EAGAIN, errno.EINTR): raise
+
+if __name__ == "__main__":
+  main()
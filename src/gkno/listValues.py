@@ -0,0 +1,83 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+from array import array
+from itertools import izip
+
+import mmap
+
+# Define a class holding the values supplied in a '.list' file. The lists can contain hundreds of thousands of
+# values (e.g. the BAM files for every sample in a project), so rather than reading all of the values into a list,
+# the file is memory mapped and only the position of each value in the file is stored. The values are read from
+# the file when requested. As with reading the file, each line of the file is a value, with any whitespace
+# surrounding the value removed.
+#
+# The values cannot be modified, so copying the values returns the same object. Any modification of the values
+# (e.g. adding the path to each file) is described by a function that is applied to each value when it is read.
+class listValues(object):
+  def __init__(self, filehandle, modify = None):
+    self.filename = filehandle.name
+    self.modify   = modify
+
+    # Store the positions of the start and end of each value in the file.
+    self.starts = array('L')
+    self.ends   = array('L')
+    position    = 0
+    for line in filehandle:
+      self.starts.append(position + len(line) - len(line.lstrip()))
+      self.ends.append(max(position + len(line.rstrip()), self.starts[-1]))
+      position += len(line)
+
+    # Memory map the file. A file with no contents cannot be mapped, but then there are no values to read.
+    self.map = mmap.mmap(filehandle.fileno(), 0, access = mmap.ACCESS_READ) if position else None
+
+  # Return a set of values where each value has been modified by the supplied function. The file and the positions
+  # of the values are shared with the original values.
+  def apply(self, modify):
+    values        = listValues.__new__(listValues)
+    values.__dict__.update(self.__dict__)
+    values.modify = (lambda value: modify(self.modify(value))) if self.modify else modify
+    return values
+
+  # Return the value at the given position in the file.
+  def getValue(self, index):
+    value = self.map[self.starts[index]:self.ends[index]] if self.map else ''
+    return self.modify(value) if self.modify else value
+
+  def __len__(self):
+    return len(self.starts)
+
+  def __iter__(self):
+    for index in xrange(len(self.starts)): yield self.getValue(index)
+
+  # Return a single value, or a list of values if a slice is requested.
+  def __getitem__(self, index):
+    if isinstance(index, slice): return [self.getValue(i) for i in xrange(*index.indices(len(self.starts)))]
+    return self.getValue(index + len(self.starts) if index < 0 else index)
+
+  # Combining the values with other values creates a list.
+  def __add__(self, values):
+    return list(self) + list(values)
+
+  def __radd__(self, values):
+    return list(values) + list(self)
+
+  def __mul__(self, number):
+    return list(self) * number
+
+  def __eq__(self, values):
+    if not isinstance(values, (list, tuple, listValues)): return False
+    return len(self) == len(values) and all(value == other for value, other in izip(self, values))
+
+  def __ne__(self, values):
+    return not self == values
+
+  # The values cannot be modified, so copies are not required.
+  def __copy__(self):
+    return self
+
+  def __deepcopy__(self, memo):
+    return self
+
+  def __repr__(self):
+    return 'listValues(' + repr(self.filename) + ', ' + str(len(self)) + ' values)'
@@ -2,9 +2,6 @@
 
 from __future__ import print_function
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import errors
 from errors import *
 
@@ -37,3 +34,12 @@ class makefileErrors:
     for filename in duplicates: self.text.append('\t' + filename)
     self.errors.writeFormattedText(self.text, errorType = 'error')
     self.errors.terminate(self.errorCode)
+
+  # A task with symbolic divisions depends on links with values for each division.
+  def symbolicDivisionLinks(self, task, nodeId):
+    self.text.append('Links with symbolic divisions.')
+    self.text.append('The task \'' + task + '\' is split into divisions and depends on the values of the node \'' + nodeId + '\' for each ' + \
+    'division. These values cannot be generated when the divisions are symbolic. Please run gkno without the argument ' + \
+    '\'--symbolic-divisions (-syd)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
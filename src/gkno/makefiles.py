@@ -2,6 +2,7 @@
 
 from __future__ import print_function
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
 import collections
 
 import fileHandling as fh
@@ -13,6 +14,42 @@ import json
 import os
 import sys
 
+# Define a dictionary holding a value (e.g. the command line or the output files) for each division of a task with
+# symbolic divisions. Only the value for the first division is stored and the values for the other divisions are
+# generated from it when requested, without being stored. Lines whose values for each division cannot be generated
+# from the filenames (e.g. the option creating the divisions) are held in the divisionLines dictionary, with the
+# line for each division.
+class symbolicDivisions(dict):
+  def __init__(self, descriptor, divisionLines):
+    dict.__init__(self)
+    self.descriptor    = descriptor
+    self.divisionLines = divisionLines
+
+  # Generate the value for a division.
+  def __missing__(self, division):
+    if division not in self: raise KeyError(division)
+    value = dict.__getitem__(self, 1)
+    if isinstance(value, list): return [self.expandLine(line, division) for line in value]
+    return self.expandLine(value, division)
+
+  # Generate a single line for a division.
+  def expandLine(self, line, division):
+    if line in self.divisionLines: return self.divisionLines[line][division - 1]
+    return self.descriptor.expand(line, division)
+
+  # Iterate over all of the divisions, not just the stored division.
+  def __iter__(self):
+    return iter(range(1, self.descriptor.getNumberOfDivisions() + 1))
+
+  def __contains__(self, division):
+    return 1 <= division <= self.descriptor.getNumberOfDivisions()
+
+  def __len__(self):
+    return self.descriptor.getNumberOfDivisions()
+
+  def keys(self):
+    return list(self)
+
 # Define a class to hold information about the command line.
 class commandLineInformation():
   def __init__(self, graph, superpipeline, struct, task):
@@ -47,6 +84,13 @@ class commandLineInformation():
     # Define and store the path to the executable.
     self.toolID = str(self.tool.upper() + '-PATH')
 
+    # If the task has symbolic divisions, only the command lines for the first division are stored, and the command
+    # lines for the other divisions are generated as they are written to the makefile. Lines that differ between the
+    # divisions other than by the division text in filenames are stored with the line for each division.
+    self.descriptor      = graph.getGraphNodeAttribute(task, 'divisionDescriptor')
+    self.storedDivisions = 1 if self.descriptor else self.numberDivisions
+    self.divisionLines   = {}
+
     # Store the command lines for this task. This is indexed by the subphase and the division. Store
     # the dependencies, intermediates, output files and files for standard out to write to, for each
     # command line with the same structure.
@@ -56,18 +100,22 @@ class commandLineInformation():
     self.outputs       = {}
     self.stdouts       = {}
     for i in range(1, self.numberSubphases + 1):
-      self.commands[i]      = {}
-      self.dependencies[i]  = {}
-      self.intermediates[i] = {}
-      self.outputs[i]       = {}
-      self.stdouts[i]       = {}
-      for j in range(1, self.numberDivisions + 1):
+      self.commands[i]      = self.getDivisions()
+      self.dependencies[i]  = self.getDivisions()
+      self.intermediates[i] = self.getDivisions()
+      self.outputs[i]       = self.getDivisions()
+      self.stdouts[i]       = self.getDivisions()
+      for j in range(1, self.storedDivisions + 1):
         self.commands[i][j]      = []
         self.dependencies[i][j]  = []
         self.intermediates[i][j] = []
         self.outputs[i][j]       = []
         self.stdouts[i][j]       = str('\t>> $(STDOUT) \\')
 
+  # Return a dictionary to hold a value for each division.
+  def getDivisions(self):
+    return symbolicDivisions(self.descriptor, self.divisionLines) if self.descriptor else {}
+
 # Define a class that is a data structure for holding information for tasks that are piped
 # together.
 class streamingInformation:
@@ -79,6 +127,46 @@ class streamingInformation:
     self.streamedFiles  = []
     self.tasks          = []
 
+    # Store the dependencies, intermediates and streamed files as sets to quickly check if files are already stored.
+    # There can be hundreds of thousands of dependencies (e.g. if a list of files is supplied to a greedy task).
+    self.dependencySet   = set()
+    self.intermediateSet = set()
+    self.streamedFileSet = set()
+
+# Define a class for holding the contents of a makefile. Text is accumulated in memory as the makefile
+# is built and written to disk in a single operation when the makefile is closed. Very large makefiles (e.g.
+# with thousands of divisions) are written to disk in chunks once the text held exceeds the maximum size.
+class makefileBuffer:
+
+  # The maximum number of characters held in memory before the text is written to disk.
+  maximumSize = 32 * 1024 * 1024
+
+  def __init__(self, filename):
+    self.filename  = filename
+    self.text      = []
+    self.size      = 0
+    self.isWritten = False
+
+  # Add text to the makefile.
+  def write(self, text):
+    self.text.append(text)
+    self.size += len(text)
+    if self.size > self.maximumSize: self.flush()
+
+  # Add a list of lines to the makefile.
+  def writeLines(self, lines):
+    self.write('\n'.join(lines) + '\n')
+
+  # Write the makefile to disk. If part of the makefile has already been written, append the text.
+  def flush(self):
+    if self.isWritten: filehandle = fh.fileHandling.openFileForAppending(self.filename)
+    else: filehandle = fh.fileHandling.openFileForWriting(self.filename)
+    filehandle.write(''.join(self.text))
+    fh.fileHandling.closeFile(filehandle)
+    self.text      = []
+    self.size      = 0
+    self.isWritten = True
+
 # Define a class to build and manipulate makefiles.
 class makefiles:
   def __init__(self):
@@ -115,6 +203,20 @@ class makefiles:
     # Store the outputs generated by each makefile.
     self.makefileOutputs = {}
 
+    # Store the fingerprint of the pipeline to include in the makefile header. This is only included in the
+    # makefile that is executed by gkno.
+    self.fingerprint = None
+
+    # Store the maximum memory (in megabytes) and I/O weight available to the pipeline, and whether any tasks
+    # require multiple job slots.
+    self.maxMemory   = None
+    self.maxIoWeight = None
+    self.isJobSlots  = False
+
+    # Record if the resource usage of each task is to be recorded in a profile when the makefile is executed.
+    self.isProfile      = False
+    self.profileCommand = '$(PYTHON) $(GKNO_PATH)/src/gkno/taskProfile.py --profile $(PWD)/$(MAKEFILE_ID).profile'
+
   # Generate the command lines associated with a task.
   def generateCommandLines(self, graph, superpipeline, struct):
 
@@ -151,12 +253,13 @@ class makefiles:
       # of the task. Each command line is itself a list of the command line executable and arguments.
       # First determine the command line executable.
       path = ' ' if data.path == 'none' else ' $(' + data.toolID + ')/'
-      command = str(data.precommand + path + data.executable + ' ' + data.modifier).rstrip(' ').strip(' ')
+      taskCommand = str(data.precommand + path + data.executable + ' ' + data.modifier).rstrip(' ').strip(' ')
   
       # Add the executable to the command lines and initialise the lists of dependencies and outputs
       # to have the same length as the commands.
       for i in range(1, data.numberSubphases + 1):
-        for j in range(1, data.numberDivisions + 1):
+        for j in range(1, data.storedDivisions + 1):
+          command = self.getProfileCommand(graph, task, data, i, j) + taskCommand
 
           # If the task uses an input data stream, only include the name of the command.
           if isInputStream: data.commands[i][j].append('\t' + command + ' \\')
@@ -169,6 +272,13 @@ class makefiles:
           # If this is a standalone task, just the '@' symbol and the command are required.
           else: data.commands[i][j].append('\t@' + command + ' \\')
 
+          # If the tasks are being profiled, the profile command includes the division, so if the divisions are
+          # symbolic, store the line for each division.
+          if data.descriptor and self.isProfile:
+            line = data.commands[i][j][-1]
+            data.divisionLines[line] = [line.replace(command, self.getProfileCommand(graph, task, data, i, division) + taskCommand) \
+            for division in range(1, data.numberDivisions + 1)]
+
       # Search predecessor nodes to find if there are any predecessor nodes that are links only. Any values
       # for these links should be included as dependencies for this task.
       self.getLinks(graph, task, data)
@@ -180,14 +290,15 @@ class makefiles:
         if argument in optionArguments:
           for nodeId in optionArguments[argument]: self.addOption(graph, task, data, nodeId)
         if argument in inputArguments:
-          for nodeId in inputArguments[argument]: self.addInput(graph, task, data, nodeId)
+          for nodeId in inputArguments[argument]:
+            for division in self.getInputDivisions(graph, data, nodeId): self.addInput(graph, task, data, nodeId, division)
         if argument in outputArguments:
           for nodeId in outputArguments[argument]: self.addOutput(graph, task, data, nodeId)
 
       # Finish the command lines with calls to write to stdout and stdin and indicating that the task is complete.
       # These values are modified based on whether the task is outputting to a stream or not.
       for i in range(1, data.numberSubphases + 1):
-        for j in range(1, data.numberDivisions + 1):
+        for j in range(1, data.storedDivisions + 1):
 
           # If the task outputs to a stream, include the pipe.
           if isOutputStream:
@@ -220,6 +331,17 @@ class makefiles:
       # Store the command lines for the task.
       self.executionInfo[task] = data
 
+  # If the tasks are being profiled, return the command used to record the resource usage of a single execution
+  # of a task. Each task is profiled individually, including tasks that are streamed together. The tasks that the
+  # task depends on are included, so that the critical path through the pipeline can be determined.
+  def getProfileCommand(self, graph, task, data, subphase, division):
+    if not self.isProfile: return ''
+    command  = '$(PROFILE) --task ' + str(task) + ' --tool ' + str(data.tool) + ' --phase ' + str(data.phase)
+    command += ' --subphase ' + str(subphase) + ' --division ' + str(division)
+    predecessors = graph.getNeighbouringTasks(graph.graph.predecessors, task, set(graph.workflow))
+    if predecessors: command += ' --predecessors ' + ','.join([str(predecessor) for predecessor in predecessors])
+    return str(command + ' -- ')
+
   # Find all the arguments for a task.
   def getArguments(self, graph, task, nodeIds, isInput):
     arguments = {}
@@ -252,8 +374,11 @@ class makefiles:
       if graph.getArgumentAttribute(predecessor, task, 'isLinkOnly'):
         counter = 0
         values  = graph.getGraphNodeAttribute(predecessor, 'values')
+
+        # The links cannot be generated for each division if the divisions are symbolic.
+        if data.descriptor and len(values) > data.numberSubphases: self.errors.symbolicDivisionLinks(task, predecessor)
         for i in range(1, data.numberSubphases + 1):
-          for j in range(1, data.numberDivisions + 1):
+          for j in range(1, data.storedDivisions + 1):
             data.dependencies[i][j].append(values[counter])
             counter += 1
 
@@ -280,7 +405,7 @@ class makefiles:
     # Regardless of the number of values supplied, each subphase needs to receive the same values.
     # Any differences between command lines would occur for multiple divisions. So, loop over all
     # divisions and apply the same command line to each subphase within the division.
-    for i in range(1, data.numberDivisions + 1):
+    for i in range(1, data.storedDivisions + 1):
       lines = []
 
       # If the option creates the divisions, create the line based on the ith value. 
@@ -290,6 +415,11 @@ class makefiles:
         lineValue = self.getValue(graph, nodeId, task, values[i - 1], isInput = True, isStub = False, stubExtension = None)
         lines.append(self.buildLine(argument, data.delimiter, lineValue))
 
+        # If the divisions are symbolic, store the line for each division.
+        if data.descriptor:
+          data.divisionLines[lines[0]] = [self.buildLine(argument, data.delimiter, self.getValue(graph, nodeId, task, value, isInput = True, \
+          isStub = False, stubExtension = None)) for value in values]
+
         # Add the options to the command lines for each subphase.
         for j in range(1, data.numberSubphases + 1): data.commands[j][i].extend(lines)
 
@@ -354,8 +484,16 @@ class makefiles:
     # Return the updated values.
     return modifiedValues
 
+  # Get the divisions for which the values of an input node are added to the command line. If the node holds the
+  # values for the first of a set of symbolic divisions and the task consolidates the divisions, the values for
+  # each division are added in turn (as they would be for each of the child nodes).
+  def getInputDivisions(self, graph, data, nodeId):
+    descriptor = graph.getGraphNodeAttribute(nodeId, 'divisionDescriptor')
+    if descriptor and not data.descriptor: return range(1, descriptor.getNumberOfDivisions() + 1)
+    return [1]
+
   # Add input files to the command line.
-  def addInput(self, graph, task, data, nodeId):
+  def addInput(self, graph, task, data, nodeId, division = 1):
 
     # Determine the division to which these values belong, or if this is an argument that should be applied to all
     # divisions. Also, determine the parent node if this is a child and use the parent to determine all information,
@@ -375,6 +513,11 @@ class makefiles:
     values   = graph.getGraphNodeAttribute(nodeId, 'values')
     dataType = graph.getArgumentAttribute(parentNodeId, task, 'dataType')
 
+    # If the values for a symbolic division were requested, generate them from the values for the first division.
+    if division > 1:
+      descriptor = graph.getGraphNodeAttribute(nodeId, 'divisionDescriptor')
+      values     = [descriptor.expand(value, division) for value in values]
+
     # If this task consolidates files then it should be treated as global.
     if graph.getGraphNodeAttribute(task, 'consolidate'): isGlobal = True
 
@@ -433,7 +576,7 @@ class makefiles:
       # If this is a file(s) that feeds into all divisions, loop over the divsions and add the files to
       # each division.
       if isGlobal: 
-        for division in range(1, data.numberDivisions + 1):
+        for division in range(1, data.storedDivisions + 1):
           self.addDivisionInputs(graph, nodeId, data, subphase, division, values, lines, lineValues, isIntermediate, isStream, isGreedy)
 
       # If this node is a child, then the files are only to be used for this specific division. In this case
@@ -526,6 +669,14 @@ class makefiles:
           self.deleteAfterTask[deleteAfterTask][subphase + 1][1].append(str(value))
           self.fileDeletion[str(value)] = deleteAfterTask
 
+          # If the divisions are symbolic, the files for the other divisions are deleted after the same task.
+          if data.descriptor:
+            for division in range(2, data.numberDivisions + 1):
+              divisionValue = data.descriptor.expand(value, division)
+              if division not in self.deleteAfterTask[deleteAfterTask][subphase + 1]: self.deleteAfterTask[deleteAfterTask][subphase + 1][division] = []
+              self.deleteAfterTask[deleteAfterTask][subphase + 1][division].append(divisionValue)
+              self.fileDeletion[divisionValue] = deleteAfterTask
+
     # If there are multiple divisions, values for division 2 onwards are stored in the child nodes which are dealt with here.
     if isParent:
       for child in children:
@@ -704,9 +855,10 @@ class makefiles:
           # unique names.
           filename += str('.' + randomString + '.make')
 
-          # Open the file for writing. If this is a single makefile, this should only happen once.
+          # Create the buffer for the makefile. If this is a single makefile, this should only happen once. The
+          # makefile is written to disk when it is closed.
           if self.isMultipleMakefiles or (phase + subphase + division) == 3:
-            filehandle = fh.fileHandling.openFileForWriting(filename)
+            filehandle = makefileBuffer(filename)
             self.filenamesList.append(filename)
 
           # Store the filenames and filehandles in a dictionary, keyed by the ordered combination of the phase,
@@ -728,40 +880,74 @@ class makefiles:
     for filename in self.filenamesList:
       filehandle = self.filehandles[filename]
 
-      # Add basic text about the gkno version.
-      print('### gkno makefile', file = filehandle)
-      print('### Generated using gkno version: ', version, ' (', date, ')', sep = '', file = filehandle)
-      print('### gkno commit: ', commitID, sep = '', file = filehandle)
-      print('### Pipeline: ', pipeline, sep = '', file = filehandle)
-      print(file = filehandle)
-      print('### Set the shell to bash.', file = filehandle)
-      print('SHELL=/bin/bash', file = filehandle)
-      print(file = filehandle)
-  
-      # Include the paths to tools and resources.
-      print('### Paths to tools and resources.', file = filehandle)
-      print('GKNO_PATH=', sourcePath, sep = '', file = filehandle)
-      print('TOOL_BIN=', toolsPath, sep = '', file = filehandle)
-      print('RESOURCES=', resourcesPath, sep = '', file = filehandle)
-      print('MAKEFILE_ID=', filename.rsplit('.make', 1)[0], sep = '', file = filehandle)
-      print(file = filehandle)
-  
-      # Define the stdout and stderr.
-      print('### Standard output and error files.', file = filehandle)
-      print('STDOUT=$(PWD)/$(MAKEFILE_ID).stdout', sep = '', file = filehandle)
-      print('STDERR=$(PWD)/$(MAKEFILE_ID).stderr', sep = '', file = filehandle)
-      print('COMPLETE_OK=$(PWD)/$(MAKEFILE_ID).ok', sep = '', file = filehandle)
-      print('EXECUTED=$(PWD)/$(MAKEFILE_ID).executed', sep = '', file = filehandle)
-      print(file = filehandle)
-  
-      # Remove file on failed execution.
-      print('### If the pipeline terminates unexpectedly, delete all files that were in', file = filehandle)
-      print('### the process of being generated.', file = filehandle)
-      print('.DELETE_ON_ERROR:', file = filehandle)
-      print(file = filehandle)
-  
+      # Add basic text about the gkno version, the paths to tools and resources and the files used to record
+      # the progress of the pipeline.
+      filehandle.writeLines([
+        '### gkno makefile',
+        '### Generated using gkno version: ' + str(version) + ' (' + str(date) + ')',
+        '### gkno commit: ' + str(commitID),
+        '### Pipeline: ' + str(pipeline)
+      ])
+
+      # Include the fingerprint used to determine if the makefile can be reused when the pipeline is rerun.
+      if self.fingerprint and not self.isMultipleMakefiles: filehandle.writeLines(self.fingerprint.getHeader())
+      filehandle.writeLines([
+        '',
+        '### Set the shell to bash.',
+        'SHELL=/bin/bash',
+        '',
+        '### Paths to tools and resources.',
+        'GKNO_PATH=' + str(sourcePath),
+        'TOOL_BIN=' + str(toolsPath),
+        'RESOURCES=' + str(resourcesPath),
+        'MAKEFILE_ID=' + filename.rsplit('.make', 1)[0],
+        '',
+        '### Standard output and error files.',
+        'STDOUT=$(PWD)/$(MAKEFILE_ID).stdout',
+        'STDERR=$(PWD)/$(MAKEFILE_ID).stderr',
+        'COMPLETE_OK=$(PWD)/$(MAKEFILE_ID).ok',
+        'EXECUTED=$(PWD)/$(MAKEFILE_ID).executed',
+        '',
+        '### If the pipeline terminates unexpectedly, delete all files that were in',
+        '### the process of being generated.',
+        '.DELETE_ON_ERROR:',
+        ''
+      ])
+
+      # The scripts used to execute the tasks are run with the python interpreter used to run gkno.
+      if self.isJobSlots or self.isProfile: filehandle.writeLines(['### The python interpreter used to run gkno.', 'PYTHON=' + str(sys.executable), ''])
+
+      # If any tasks require multiple job slots, define the command used to acquire the job slots.
+      if self.isJobSlots:
+        budget = ''
+        if self.maxMemory: budget += ' --max-memory ' + str(self.maxMemory)
+        if self.maxIoWeight: budget += ' --max-io-weight ' + str(self.maxIoWeight)
+        filehandle.writeLines([
+          '### Execute tasks using multiple threads, or large amounts of memory or I/O, once the job',
+          '### slots they require are available.',
+          'JOB_SLOTS=$(PYTHON) $(GKNO_PATH)/src/gkno/jobSlots.py' + budget,
+          ''
+        ])
+
+      # If the tasks are being profiled, define the command used to record the resource usage of each task.
+      if self.isProfile:
+        filehandle.writeLines([
+          '### Record the runtime and peak memory of each task in the profile.',
+          'PROFILE=' + self.profileCommand,
+          ''
+        ])
+
       # The paths to the executables are added by phase later.
-      print('### Executable paths.', file = filehandle)
+      filehandle.writeLines(['### Executable paths.'])
+
+  # Set the resources available to the pipeline and determine if any tasks require multiple job slots when
+  # executed in parallel. This is the case if a task uses multiple threads, or if a task uses memory or I/O and
+  # the maximum available memory or I/O weight have been defined.
+  def setResources(self, graph, maxMemory, maxIoWeight):
+    self.maxMemory   = maxMemory
+    self.maxIoWeight = maxIoWeight
+    for task in graph.workflow:
+      if self.getJobSlotsCommand(graph, [task]): self.isJobSlots = True
 
   # If a single makefile is being output, find all the unique tools used in the pipeline.
   def addUniqueExecutables(self, graph, struct):
@@ -783,23 +969,22 @@ class makefiles:
         for key in self.filenames:
           if key.startswith(str(phase)):
             filename = self.filenames[key]
-            for tool in phaseTools: print(str(tool), file = self.filehandles[filename])
-            print(file = self.filehandles[filename])
+            self.filehandles[filename].writeLines([str(tool) for tool in phaseTools] + [''])
 
       # Add the tools for this phase to the list of tools for the pipeline.
       allTools.extend(phaseTools)
  
     # Having colleted all tools, remove duplicates and write to a single makefile, if required.
-    if not self.isMultipleMakefiles:
-      for tool in list(set(allTools)): print(str(tool), file = self.singleFilehandle)
-      print(file = self.singleFilehandle)
+    if not self.isMultipleMakefiles: self.singleFilehandle.writeLines([str(tool) for tool in list(set(allTools))] + [''])
 
   # List phony arguments. This is used solely for the file created on successful execution of the pipeline.
   def addPhony(self):
     for filename in self.filenamesList:
-      print('### List all PHONY targets. These are targets that are not actual files.', file = self.filehandles[filename])
-      print('.PHONY: DELETE_COMPLETE_OK', filename, file = self.filehandles[filename])
-      print(file = self.filehandles[filename])
+      self.filehandles[filename].writeLines([
+        '### List all PHONY targets. These are targets that are not actual files.',
+        '.PHONY: DELETE_COMPLETE_OK ' + filename,
+        ''
+      ])
 
   # Get the intermediate and output files for the whole pipeline.
   def getAllOutputs(self, struct, randomString):
@@ -858,41 +1043,36 @@ class makefiles:
     # Write intermediate files to the makefile header. Files marked as intermediate are removed during
     # execution of the pipeline. By being marked as intermediate, reexecution of the pipeline will not
     # commence to regenerate the intermediate files.
-    print('### The following files are intermediates. If the pipeline is rerun, rules for creating', file = filehandle)
-    print('### will not be rerun unless files prior to these rules have been updated.', file = filehandle)
-    print('.PRECIOUS: ', filename, end = ' ', file = filehandle)
-
-    # Add all the intermediates to the makefile.
-    for intermediate in intermediates: print(intermediate, end = ' ', file = filehandle)
-    print(file = filehandle)
-
-    print('.INTERMEDIATE: ', filename, end = ' ', file = filehandle)
-    for intermediate in intermediates: print(intermediate, end = ' ', file = filehandle)
-    print(file = filehandle)
-    print(file = filehandle)
+    intermediateList = self.getList(intermediates)
+    filehandle.writeLines([
+      '### The following files are intermediates. If the pipeline is rerun, rules for creating',
+      '### will not be rerun unless files prior to these rules have been updated.',
+      '.PRECIOUS:  ' + filename + ' ' + intermediateList,
+      '.INTERMEDIATE:  ' + filename + ' ' + intermediateList,
+      ''
+    ])
 
   # Add output files to the makefile.
   def addOutputFiles(self, outputs, filehandle):
 
     # List all the output files created by this makefile.
-    print('### List all of the files that are required outputs of the pipeline.', file = filehandle)
-    print('all: DELETE_COMPLETE_OK $(COMPLETE_OK) ', end = '', file = filehandle)
-
-    # Add all the output files to the makefile.
-    for output in outputs: print(str(output), end = ' ', file = filehandle)
-    print(file = filehandle)
-    print(file = filehandle)
+    filehandle.writeLines([
+      '### List all of the files that are required outputs of the pipeline.',
+      'all: DELETE_COMPLETE_OK $(COMPLETE_OK) ' + self.getList(outputs),
+      ''
+    ])
 
   # Prior to pipeline execution, remove the 'ok' file prodiced by a previous successful execution.
   def removeOk(self):
     for filename in self.filenamesList:
-      filehandle = self.filehandles[filename]
-      print('### Remove the file indicating successful completion of the pipeline. This file needs', file = filehandle)
-      print('### to be recreated if the pipeline is rerun to indicate successful completion.', file = filehandle)
-      print('DELETE_COMPLETE_OK:', file = filehandle)
-      print('\t@rm -f $(EXECUTED)', file = filehandle)
-      print('\t@rm -f $(COMPLETE_OK)', file = filehandle)
-      print(file = filehandle)
+      self.filehandles[filename].writeLines([
+        '### Remove the file indicating successful completion of the pipeline. This file needs',
+        '### to be recreated if the pipeline is rerun to indicate successful completion.',
+        'DELETE_COMPLETE_OK:',
+        '\t@rm -f $(EXECUTED)',
+        '\t@rm -f $(COMPLETE_OK)',
+        ''
+      ])
 
   # Add the command lines to the makefiles.
   def addCommandLines(self, graph, struct, phase, subphase, division):
@@ -928,7 +1108,9 @@ class makefiles:
     # Update the list of task dependencies. This is all of the dependencies for the current
     # task minus any files that are streamed.
     for dependency in self.executionInfo[task].dependencies[subphase][division]:
-      if dependency not in info.streamedFiles and dependency not in info.dependencies: info.dependencies.append(dependency)
+      if dependency not in info.streamedFileSet and dependency not in info.dependencySet:
+        info.dependencies.append(dependency)
+        info.dependencySet.add(dependency)
 
     # Now loop over all of the outputs for the task. If the output file is being piped, this
     # should not be included in the list of outputs.
@@ -936,12 +1118,16 @@ class makefiles:
     if isLast:
       for output in self.executionInfo[task].outputs[subphase][division]: info.outputs.append(output)
     else:
-      for output in self.executionInfo[task].outputs[subphase][division]: info.streamedFiles.append(output)
+      for output in self.executionInfo[task].outputs[subphase][division]:
+        info.streamedFiles.append(output)
+        info.streamedFileSet.add(output)
 
     # Loop over all of the intermediate files (e.g. the files that can be deleted after this task is
     # complete) and store these files. These will be deleted at the end of the piped tasks.
     for intermediate in self.executionInfo[task].intermediates[subphase][division]:
-      if intermediate not in info.streamedFiles and intermediate not in info.intermediates: info.intermediates.append(intermediate)
+      if intermediate not in info.streamedFileSet and intermediate not in info.intermediateSet:
+        info.intermediates.append(intermediate)
+        info.intermediateSet.add(intermediate)
 
     # Finally, store the command line for the task.
     for line in self.executionInfo[task].commands[subphase][division]: info.commands.append(line)
@@ -953,24 +1139,14 @@ class makefiles:
     filename   = self.filenames[str(phase) + str(subphase) + str(division)]
     filehandle = self.filehandles[filename]
 
-    print('### Command line information for the following piped tasks:', file = filehandle)
-    print('### ', end = '', file = filehandle)
-    for i in range(0, len(info.tasks) - 1): print(info.tasks[i], end = ', ', file = filehandle)
-    print(info.tasks[-1], '...', sep = '', file = filehandle)
-
     # Only include the first output in the rule. If there are additional outputs, these are handled after
-    # the rule in the makefile.
-    print(info.outputs[0], ':', sep = '', end = ' ', file = filehandle)
-    for dependency in info.dependencies: print(dependency, end = ' ', file = filehandle)
-    print(file = filehandle)
-  
-    # Print to screen the tasks being executed.
-    print('\t@echo -e "Executing tasks: ', end = '', file = filehandle)
-    for i in range(0, len(info.tasks) - 1): print(info.tasks[i], end = ', ', file = filehandle)
-    print(info.tasks[-1], '...\c"', sep = '', file = filehandle)
-  
-    # Print the command line.
-    for line in info.commands: print(line, file = filehandle)
+    # the rule in the makefile. Print to screen the tasks being executed and then include the command line.
+    tasks = ', '.join([str(task) for task in info.tasks])
+    lines = ['### Command line information for the following piped tasks:', '### ' + tasks + '...']
+    lines.append(str(info.outputs[0]) + ': ' + self.getList(info.dependencies))
+    lines.append('\t@echo -e "Executing tasks: ' + tasks + '...\c"')
+    lines.extend(self.addJobSlots(graph, info.tasks, [str(line) for line in info.commands]))
+    filehandle.writeLines(lines)
   
     # Include an additional rule if the task created multiple output files.
     if len(info.outputs) > 1: self.multipleOutputFiles(filehandle, filename, info, subphase, division)
@@ -982,12 +1158,7 @@ class makefiles:
         for value in self.deleteAfterTask[task][subphase][division]: intermediates.append(value)
 
     # Delete the files.
-    if intermediates:
-      print('### Delete intermediate files that are no longer required.', file = filehandle)
-      print('\t@echo -e "Deleting temporary files...\\c"', file = filehandle)
-      for intermediate in intermediates: print('\t@rm -f ', intermediate, sep = '', file = filehandle)
-      print('\t@echo -e "complete."', file = filehandle)
-      print(file = filehandle)
+    if intermediates: self.deleteIntermediateFiles(filehandle, intermediates)
 
   # Write information to the makefile for a task with no streaming.
   def writeStandardInformation(self, graph, phase, subphase, division, task):
@@ -996,20 +1167,14 @@ class makefiles:
     filename   = self.filenames[str(phase) + str(subphase) + str(division)]
     filehandle = self.filehandles[filename]
 
-    print('### Command line information for the following task:', file = filehandle)
-    print('### ', task, ' (', graph.getGraphNodeAttribute(task, 'tool'), ')', sep = '', file = filehandle)
-  
     # Only include the first output in the rule. If there are additional outputs, these are handled after
-    # the rule in the makefile.
-    print(self.executionInfo[task].outputs[subphase][division][0], ':', sep = '', end = ' ', file = filehandle)
-    for dependency in self.executionInfo[task].dependencies[subphase][division]: print(dependency, end = ' ', file = filehandle)
-    print(file = filehandle)
-
-    # Print to screen the task being executed.
-    print('\t@echo -e "Executing task: ', task, '...\c"', sep = '', file = filehandle)
-  
-    # Print the command line.
-    for line in self.executionInfo[task].commands[subphase][division]: print(line, file = filehandle)
+    # the rule in the makefile. Print to screen the task being executed and then include the command line.
+    lines = ['### Command line information for the following task:']
+    lines.append('### ' + str(task) + ' (' + str(graph.getGraphNodeAttribute(task, 'tool')) + ')')
+    lines.append(str(self.executionInfo[task].outputs[subphase][division][0]) + ': ' + self.getList(self.executionInfo[task].dependencies[subphase][division]))
+    lines.append('\t@echo -e "Executing task: ' + str(task) + '...\c"')
+    lines.extend(self.addJobSlots(graph, [task], [str(line) for line in self.executionInfo[task].commands[subphase][division]]))
+    filehandle.writeLines(lines)
 
     # Include an additional rule if the task created multiple output files.
     if len(self.executionInfo[task].outputs[subphase][division]) > 1:
@@ -1027,20 +1192,47 @@ class makefiles:
       else: intermediates = self.deleteAfterTask[task][subphase][division]
 
       # If there are files to delete, include instructions to delete them.
-      if intermediates:
-        print('### Delete intermediate files that are no longer required.', file = filehandle)
-        print('\t@echo -e "Deleting temporary files...\\c"', file = filehandle)
-        for intermediate in intermediates: print('\t@rm -f ', intermediate, sep = '', file = filehandle)
-        print('\t@echo -e "complete."', file = filehandle)
-        print(file = filehandle)
+      if intermediates: self.deleteIntermediateFiles(filehandle, intermediates)
+
+  # If a task (or a set of tasks streamed together) requires multiple job slots, the task is executed once the job slots
+  # are available. The job slots are acquired by the first command line, after the initialisation of the variable TOT
+  # for streamed tasks. Make only provides access to the job slots to recipe lines marked with '+'. The job slots are
+  # only included in the makefile, so the command lines for the tasks are unchanged for the native executor.
+  def addJobSlots(self, graph, tasks, commands):
+    jobSlots = self.getJobSlotsCommand(graph, tasks)
+    if not jobSlots: return commands
+    line = commands[0][2:]
+    if line.startswith('TOT=0; '): line = 'TOT=0; ' + jobSlots + line[7:]
+    else: line = jobSlots + line
+    return ['\t+@' + line] + commands[1:]
+
+  # Return the command used to execute a set of tasks (tasks that are streamed together run at the same time)
+  # once the required job slots are available. If only a single job slot is required, return an empty string.
+  def getJobSlotsCommand(self, graph, tasks):
+    threads  = [graph.getGraphNodeAttribute(task, 'threads') for task in tasks]
+    memory   = sum([graph.getGraphNodeAttribute(task, 'memory') or 0 for task in tasks])
+    ioWeight = sum([graph.getGraphNodeAttribute(task, 'ioWeight') for task in tasks])
+
+    # Only include the resources that can require additional job slots. Streamed tasks are treated as using a
+    # single thread between them, unless any of the tasks uses multiple threads.
+    command = ''
+    if max(threads) > 1: command += ' --threads ' + str(sum(threads))
+    if self.maxMemory and memory: command += ' --memory ' + str(memory)
+    if self.maxIoWeight and ioWeight: command += ' --io-weight ' + str(ioWeight)
+
+    # Return the command.
+    return str('$(JOB_SLOTS)' + command + ' -- ') if command else ''
+
+  # Include instructions to delete intermediate files that are no longer required.
+  def deleteIntermediateFiles(self, filehandle, intermediates):
+    lines = ['### Delete intermediate files that are no longer required.', '\t@echo -e "Deleting temporary files...\\c"']
+    lines.extend(['\t@rm -f ' + str(intermediate) for intermediate in intermediates])
+    lines.extend(['\t@echo -e "complete."', ''])
+    filehandle.writeLines(lines)
 
   # output is included in the rule for the additional task.
   def multipleOutputFiles(self, filehandle, filename, data, subphase, division):
-    print('### Rule for checking that all outputs of previous task exist.', file = filehandle)
-    for counter in range(1, len(data.outputs[subphase][division]) - 1):
-      print(data.outputs[subphase][division][counter], end = ' ', file = filehandle)
-    print(data.outputs[subphase][division][-1], end = ': ', file = filehandle)
-    for dependency in data.dependencies[subphase][division]: print(dependency, end = ' ', file = filehandle)
+    outputs = data.outputs[subphase][division]
 
     # Add the primaryOutput to the list of dependencies. This is the file that is listed as the output for
     # the rule. If running with multiple threads and none of the files exist, the original rule is executed
@@ -1048,14 +1240,17 @@ class makefiles:
     # since none of these additional files exist either. By including the primaryOutput as a dependency, we
     # ensure that the original rule gets to run first and this check isn't performed until it has been
     # completed.
-    print(data.outputs[subphase][division][0], file = filehandle)
-    print('\t@if test -f $@ || test -d $@; then \\', file = filehandle)
-    print('\t  touch $@; \\', file = filehandle)
-    print('\telse \\', file = filehandle)
-    print('\t  rm -f ', data.outputs[subphase][division][0], "; \\", sep = '', file = filehandle)
-    print('\t  $(MAKE) --no-print-directory -f $(PWD)/', filename, ' ', data.outputs[subphase][division][0], '; \\', sep = '', file = filehandle)
-    print('\tfi', file = filehandle)
-    print(file = filehandle)
+    filehandle.writeLines([
+      '### Rule for checking that all outputs of previous task exist.',
+      self.getList(outputs[1:-1]) + str(outputs[-1]) + ': ' + self.getList(data.dependencies[subphase][division]) + str(outputs[0]),
+      '\t@if test -f $@ || test -d $@; then \\',
+      '\t  touch $@; \\',
+      '\telse \\',
+      '\t  rm -f ' + str(outputs[0]) + '; \\',
+      '\t  $(MAKE) --no-print-directory -f $(PWD)/' + str(filename) + ' ' + str(outputs[0]) + '; \\',
+      '\tfi',
+      ''
+    ])
 
   # Write the final instructions to the makefile.
   def completeFile(self, outputs):
@@ -1068,36 +1263,41 @@ class makefiles:
       key = str(111) if not self.isMultipleMakefiles else self.keys[filename]
 
       # Prior to closing the file, include instructions for generating an 'ok' file indicating that the
-      # makefile was successfully executed and delete the makefile.
-      print('### Generate a file indicating successful execution of makefile', file = filehandle)
-      print('$(COMPLETE_OK): ', end = '', file = filehandle)
-  
-      # Add all of the outputs generated by this makefile to the list of dependencies. The 'ok' file is
-      # only created if the pipeline ran successfully and generated everything required.
-      for filename in outputs[key]: print(filename, end = ' ', file = filehandle)
-      print(file = filehandle)
-      print('\t@rm -f $(MAKEFILE_ID).make', file = filehandle)
-
+      # makefile was successfully executed and delete the makefile. All of the outputs generated by this
+      # makefile are included in the list of dependencies. The 'ok' file is only created if the pipeline ran
+      # successfully and generated everything required.
+      #
       # If any of the rules were executed, the file defined by $(EXECUTED) will have been created. If this
       # file does not exist, nothing was executed. This will result if all the files already existed and
       # make determined that there was no need to execute any rules. If this is the case, inform the user.
-      print('\t@if test ! -f $(EXECUTED); then \\', file = filehandle)
-      print('\t  echo \'===================================\'; \\', file = filehandle)
-      print('\t  echo \'  WARNING: No new files generated.\'; \\', file = filehandle)
-      print('\t  echo \'===================================\'; \\', file = filehandle)
-      print('\t  echo ; \\', file = filehandle)
-      print('\t  echo \'All required output files already exist, so none of the tasks in the pipeline were executed.\'; \\', file = filehandle)
-      print('\t  echo \'To force execution of the pipeline remove output files prior to execution of gkno.\'; \\', file = filehandle)
-      print('\telse \\', file = filehandle)
-      print('\t  touch $(COMPLETE_OK); \\', file = filehandle)
-      print('\tfi', file = filehandle)
-      print('\t@rm -f $(EXECUTED)', file = filehandle)
-
-  # Close the makefiles.
+      filehandle.writeLines([
+        '### Generate a file indicating successful execution of makefile',
+        '$(COMPLETE_OK): ' + self.getList(outputs[key]),
+        '\t@rm -f $(MAKEFILE_ID).make',
+        '\t@if test ! -f $(EXECUTED); then \\',
+        '\t  echo \'===================================\'; \\',
+        '\t  echo \'  WARNING: No new files generated.\'; \\',
+        '\t  echo \'===================================\'; \\',
+        '\t  echo ; \\',
+        '\t  echo \'All required output files already exist, so none of the tasks in the pipeline were executed.\'; \\',
+        '\t  echo \'To force execution of the pipeline remove output files prior to execution of gkno.\'; \\',
+        '\telse \\',
+        '\t  touch $(COMPLETE_OK); \\',
+        '\tfi',
+        '\t@rm -f $(EXECUTED)'
+      ])
+
+  # Close the makefiles, writing them to disk. If multiple makefiles are being generated, they are
+  # written in parallel.
   def closeFiles(self):
-    for filename in self.filenamesList:
-      filehandle = self.filehandles[filename]
-      fh.fileHandling.closeFile(filehandle)
+    buffers = [self.filehandles[filename] for filename in self.filenamesList]
+    if len(buffers) > 1:
+      pool = ThreadPool(min(len(buffers), 8))
+      pool.map(makefileBuffer.flush, buffers)
+      pool.close()
+      pool.join()
+    else:
+      for buffer in buffers: buffer.flush()
 
   # Return the argument to be written to the command line (and consequently, that stored in the commands
   # data structure). It is usually the case that the gkno argument does not correspond to the tool
@@ -1232,6 +1432,11 @@ class makefiles:
     # Otherwise, just return the original value.
     else: return value
 
+  # Return a list of values as a string, with each value followed by a space.
+  @staticmethod
+  def getList(values):
+    return ''.join([str(value) + ' ' for value in values])
+
   # Build a line of the command line.
   @staticmethod
   def buildLine(argument, delimiter, value):
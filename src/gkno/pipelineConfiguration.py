@@ -6,40 +6,57 @@ import fileHandling
 import generalConfigurationFileMethods as methods
 import parameterSets
 import pipelineConfigurationErrors as errors
+import slottedAttributes as sa
 
 import json
 import os
 import sys
 
-# Define a class to store task attribtues.
-class taskAttributes:
-  def __init__(self):
+# Define a class to store task attribtues. The task attributes are attached to the task nodes in the graph.
+class taskAttributes(sa.slottedAttributes):
+  defaults = {
 
     # List this node type as a task.
-    self.nodeType = 'task'
+    'nodeType' : 'task',
 
     # Store the task name along with the tool or pipeline used to execute the task.
-    self.pipeline = None
-    self.task     = None
-    self.tool     = None
+    'pipeline' : None,
+    'task'     : None,
+    'tool'     : None,
 
     # Mark greedy tasks.
-    self.greedyArgument = None
-    self.isGreedy       = False
+    'greedyArgument' : None,
+    'isGreedy'       : False,
 
     # Mark if this task should consolidate divisions if any exist.
-    self.consolidate = False
+    'consolidate' : False,
+
+    # The argument to which genomic shards are supplied if the genome is divided into shards, and whether the
+    # argument uses 0-based (with the end position not included) or 1-based coordinates.
+    'shardArgument'    : None,
+    'shardCoordinates' : '1-based',
 
     # If the task outputs to a stream rather than a file, or the task accepts a stream.
-    self.isInputStream  = False
-    self.isOutputStream = False
+    'isInputStream'  : False,
+    'isOutputStream' : False,
+
+    # The resources (threads, memory in megabytes and I/O weight) required by the task. These are taken from
+    # the configuration file of the tool used by the task.
+    'threads'  : 1,
+    'memory'   : None,
+    'ioWeight' : 1,
 
     # If a particular set of stream instructions is specified.
-    self.inputStreamInstructionSet  = 'default'
-    self.outputStreamInstructionSet = 'default'
+    'inputStreamInstructionSet'  : 'default',
+    'outputStreamInstructionSet' : 'default',
 
     # Record if the unique node should be included in any plots.
-    self.omitFromReducedPlot = False
+    'omitFromReducedPlot' : False
+  }
+
+  # Attributes without a default value that are set when the task is added to the graph.
+  __slots__ = tuple(defaults) + ('children', 'divisionDescriptor', 'divisionID', 'divisionNode', 'divisions', 'hasRandomString',
+  'includeInReducedPlot', 'isChild', 'isParent', 'parent', 'randomString', 'subphases')
 
 # Define a class to hold the pipeline arguments.
 class pipelineArguments:
@@ -397,6 +414,8 @@ class pipelineConfiguration:
     allowedAttributes['output to stream']              = (bool, False, True, 'isOutputStream')
     allowedAttributes['output stream instruction set'] = (str, False, True, 'outputStreamInstructionSet')
     allowedAttributes['pipeline']                      = (str, False, True, 'pipeline')
+    allowedAttributes['shard argument']                = (str, False, True, 'shardArgument')
+    allowedAttributes['shard coordinates']             = (str, False, True, 'shardCoordinates')
     allowedAttributes['task']                          = (str, True, True, 'task')
     allowedAttributes['tool']                          = (str, False, True, 'tool')
 
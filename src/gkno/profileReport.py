@@ -0,0 +1,180 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import executorErrors as ee
+
+import os
+import sys
+
+# Define a class to hold the resource usage recorded for a single execution of a task.
+class taskProfile:
+  def __init__(self, values):
+
+    # Store the task and where in the pipeline the task was executed.
+    self.task     = values[0]
+    self.tool     = values[1]
+    self.phase    = int(values[2])
+    self.subphase = int(values[3])
+    self.division = int(values[4])
+
+    # Store the tasks that this task depends on.
+    self.predecessors = values[5].split(',') if values[5] else []
+
+    # Store the start and end times, the wall time and the CPU time (in seconds), the peak resident set size (in
+    # kilobytes) and the exit status.
+    self.start      = float(values[6])
+    self.end        = float(values[7])
+    self.wallTime   = float(values[8])
+    self.cpuTime    = float(values[9]) + float(values[10])
+    self.maxRss     = int(values[11])
+    self.exitStatus = int(values[12])
+
+# Define a class to summarise the profiles recorded when executing makefiles generated with --profile-tasks.
+class profileReport:
+  def __init__(self):
+
+    # Handle errors.
+    self.errors = ee.executorErrors()
+
+    # Store the task executions in each profile.
+    self.profiles = {}
+
+    # The number of tasks to include in the list of hot tasks.
+    self.numberHotTasks = 10
+
+  # Summarise the profiles. If no profiles are given, all profiles in the current directory are used.
+  def report(self, filenames):
+    if not filenames: filenames = sorted([filename for filename in os.listdir('.') if filename.endswith('.profile')])
+    if not filenames: self.errors.noProfiles()
+    for filename in filenames: self.readProfile(filename)
+
+    # Write the critical path for each profile, then the tasks using the most time across all profiles.
+    criticalTasks = {}
+    for filename in filenames:
+      for execution in self.writeCriticalPath(filename): criticalTasks[execution.task] = criticalTasks.get(execution.task, 0) + 1
+    self.writeHotTasks(criticalTasks)
+    return 0
+
+  # Read a profile.
+  def readProfile(self, filename):
+    if not os.path.exists(filename): self.errors.missingProfile(filename)
+    self.profiles[filename] = []
+    with open(filename) as filehandle:
+      for lineNumber, line in enumerate(filehandle):
+        if line.startswith('#') or not line.strip(): continue
+        try: self.profiles[filename].append(taskProfile(line.rstrip('\n').split('\t')))
+        except (IndexError, ValueError): self.errors.invalidProfile(filename, lineNumber + 1)
+
+  # Write the critical path for a profile and return the task executions on the path. If a pipeline is rerun, only
+  # the most recent execution of each task is used. The critical path is the chain of dependent task executions
+  # that took the longest time. Tasks that are streamed together run concurrently, so a task that started before
+  # the task it depends on completed only adds the time between the two tasks starting.
+  def writeCriticalPath(self, filename):
+    latest = {}
+    for execution in self.profiles[filename]: latest[(execution.task, execution.subphase, execution.division)] = execution
+    executions = sorted(latest.values(), key = lambda execution: execution.start)
+    if not executions: return []
+
+    # Find the executions of each task. A task in a subphase or division depends on the task it depends on in the
+    # same subphase and division if it exists, otherwise on all of its executions.
+    tasks = {}
+    for execution in executions: tasks.setdefault(execution.task, []).append(execution)
+    for execution in executions:
+      execution.dependsOn = []
+      for predecessor in execution.predecessors:
+        matches = [value for value in tasks.get(predecessor, []) if (value.subphase, value.division) == (execution.subphase, execution.division)]
+        execution.dependsOn.extend(matches if matches else tasks.get(predecessor, []))
+
+    # For each task execution, find the longest chain of executions ending with it.
+    lengths      = {}
+    predecessors = {}
+    for execution in executions: self.getLongestChain(execution, lengths, predecessors, set())
+
+    # Trace back the critical path from the chain with the longest time.
+    path      = []
+    execution = max(executions, key = lambda execution: lengths[execution])
+    length    = lengths[execution]
+    while execution is not None:
+      path.insert(0, execution)
+      execution = predecessors[execution]
+
+    # Write the critical path.
+    elapsed = max([execution.end for execution in executions]) - min([execution.start for execution in executions])
+    failed  = len([execution for execution in executions if execution.exitStatus != 0])
+    print('Profile: ', filename, sep = '', file = sys.stdout)
+    print('\tTask executions: ', len(executions), (' (' + str(failed) + ' failed)') if failed else '', sep = '', file = sys.stdout)
+    print('\tElapsed time:    ', self.formatTime(elapsed), sep = '', file = sys.stdout)
+    print('\tCritical path:   ', self.formatTime(length), sep = '', file = sys.stdout)
+    rows = [['Task', 'Tool', 'Phase', 'Subphase', 'Division', 'Wall time', 'Peak RSS']]
+    for execution in path:
+      rows.append([execution.task, execution.tool, execution.phase, execution.subphase, execution.division, self.formatTime(execution.wallTime),
+      self.formatMemory(execution.maxRss)])
+    self.writeTable(rows)
+    print(file = sys.stdout)
+
+    # Return the tasks on the critical path.
+    return path
+
+  # Determine the time taken by the longest chain of dependent task executions ending with a task execution.
+  def getLongestChain(self, execution, lengths, predecessors, observed):
+    if execution in lengths: return lengths[execution]
+    observed.add(execution)
+    length, longestPredecessor = 0., None
+    for predecessor in execution.dependsOn:
+      if predecessor in observed and predecessor not in lengths: continue
+      value = self.getLongestChain(predecessor, lengths, predecessors, observed)
+
+      # If the tasks ran concurrently (e.g. they were streamed together), only include the time between the tasks
+      # starting.
+      if predecessor.end > execution.start + 0.01: value += max(0., execution.start - predecessor.start) - predecessor.wallTime
+      if longestPredecessor is None or value > length: length, longestPredecessor = value, predecessor
+    lengths[execution]      = length + execution.wallTime
+    predecessors[execution] = longestPredecessor
+    return lengths[execution]
+
+  # Write the tasks using the most wall time across all of the profiles.
+  def writeHotTasks(self, criticalTasks):
+    tasks = {}
+    for filename in self.profiles:
+      for execution in self.profiles[filename]:
+        if execution.task not in tasks: tasks[execution.task] = []
+        tasks[execution.task].append(execution)
+
+    # Sort the tasks by the total wall time.
+    totals = sorted(tasks, key = lambda task: sum([execution.wallTime for execution in tasks[task]]), reverse = True)
+    print('Hot tasks (across ', len(self.profiles), ' profile', 's' if len(self.profiles) != 1 else '', '):', sep = '', file = sys.stdout)
+    rows = [['Task', 'Tool', 'Executions', 'Total time', 'Mean time', 'Max time', 'CPU time', 'Peak RSS', 'Critical']]
+    for task in totals[:self.numberHotTasks]:
+      executions = tasks[task]
+      total      = sum([execution.wallTime for execution in executions])
+      rows.append([task, executions[0].tool, len(executions), self.formatTime(total), self.formatTime(total / len(executions)),
+      self.formatTime(max([execution.wallTime for execution in executions])), self.formatTime(sum([execution.cpuTime for execution in executions])),
+      self.formatMemory(max([execution.maxRss for execution in executions])), criticalTasks.get(task, 0)])
+    self.writeTable(rows)
+    print(file = sys.stdout)
+
+  ######################
+  ### Static methods ###
+  ######################
+
+  # Write a table with aligned columns.
+  @staticmethod
+  def writeTable(rows):
+    rows   = [[str(value) for value in row] for row in rows]
+    widths = [max([len(row[i]) for row in rows]) for i in range(len(rows[0]))]
+    for row in rows: print('\t', '  '.join([value.ljust(width) for value, width in zip(row, widths)]).rstrip(), sep = '', file = sys.stdout)
+
+  # Format a time in seconds.
+  @staticmethod
+  def formatTime(seconds):
+    if seconds < 60: return '%.1fs' % seconds
+    if seconds < 3600: return '%dm%02ds' % (seconds // 60, seconds % 60)
+    return '%dh%02dm' % (seconds // 3600, (seconds % 3600) // 60)
+
+  # Format an amount of memory in kilobytes.
+  @staticmethod
+  def formatMemory(kilobytes):
+    if kilobytes < 1024: return str(kilobytes) + 'K'
+    if kilobytes < 1024 * 1024: return '%.1fM' % (kilobytes / 1024.)
+    return '%.1fG' % (kilobytes / (1024. * 1024.))
@@ -0,0 +1,162 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import hashlib
+import httplib
+import os
+import shutil
+import socket
+import tarfile
+import time
+import urllib2
+
+# Define a class for downloading a resource tarball. The tarball is not written to disk, but is read as a stream and the
+# files it contains are extracted as it is downloaded. If the connection fails during the download, the download is
+# resumed from the failure using an HTTP range request. If a checksum is supplied, the checksum of the downloaded
+# tarball is calculated as it is read and checked once the download is complete.
+class resourceDownload(object):
+
+  # The size of the blocks read from the connection, the number of times the connection can fail before the download
+  # fails and the timeout (in seconds) for the connection.
+  blockSize = 1024 * 1024
+  retries   = 5
+  timeout   = 60
+
+  # The checksums that can be supplied in the resource targets file, in order of preference.
+  algorithms = ['sha256', 'sha1', 'md5']
+
+  def __init__(self, url, checksums = {}, progress = None):
+    self.url      = url
+    self.progress = progress
+
+    # The connection to the server, the number of bytes read from the connection, the total number of bytes in the
+    # tarball (if known) and the number of times the connection has failed.
+    self.response = None
+    self.position = 0
+    self.size     = None
+    self.failures = 0
+
+    # Use the preferred checksum of those supplied.
+    self.algorithm = None
+    self.checksum  = None
+    self.hash      = None
+    for algorithm in self.algorithms:
+      if checksums.get(algorithm):
+        self.algorithm = algorithm
+        self.checksum  = checksums[algorithm].lower()
+        self.hash      = hashlib.new(algorithm)
+        break
+
+  # Open a connection to the server. If part of the tarball has already been read, only request the remainder. If the
+  # server does not support range requests, the whole tarball is sent, so the bytes already read are discarded.
+  def open(self):
+    request = urllib2.Request(self.url)
+    if self.position: request.add_header('Range', 'bytes=' + str(self.position) + '-')
+    self.response = urllib2.urlopen(request, timeout = self.timeout)
+    isPartial     = self.position and self.response.getcode() == 206
+    length        = self.response.info().getheader('Content-Length')
+    if length: self.size = int(length) + (self.position if isPartial else 0)
+    if self.position and not isPartial:
+      remaining = self.position
+      while remaining:
+        data = self.response.read(min(remaining, self.blockSize))
+        if not data: raise IOError('Connection closed while resuming download of ' + self.url)
+        remaining -= len(data)
+
+  # Close the connection to the server.
+  def close(self):
+    if self.response: self.response.close()
+    self.response = None
+
+  # Read data from the tarball. If the connection fails (or is closed before all of the tarball has been read), the
+  # connection is reopened and the download resumed. The download fails if the connection fails repeatedly.
+  def read(self, size = blockSize):
+    while True:
+      try:
+        if not self.response: self.open()
+        data = self.response.read(size)
+        if not data and self.size is not None and self.position < self.size:
+          raise IOError('Connection closed after ' + str(self.position) + ' of ' + str(self.size) + ' bytes')
+        break
+      except (IOError, socket.error, httplib.HTTPException) as exception:
+        self.close()
+
+        # Client errors (e.g. the tarball does not exist) will not be resolved by retrying.
+        if isinstance(exception, urllib2.HTTPError) and exception.code < 500: raise
+        self.failures += 1
+        if self.failures > self.retries: raise
+        time.sleep(min(2 ** self.failures, 30))
+
+    # Update the checksum and report the progress of the download.
+    self.position += len(data)
+    if self.hash: self.hash.update(data)
+    if self.progress and self.size and data: self.progress(self.position, self.size)
+    return data
+
+  # Download the tarball and extract its contents into the given directory. The contents are extracted into a temporary
+  # directory, and are only moved into the directory once the tarball has been completely downloaded and the checksum
+  # verified. Return an error (or None if the tarball was successfully extracted).
+  def extract(self, directory):
+    temporaryDirectory = os.path.join(directory, '.download.' + str(os.getpid()) + '.' + str(id(self)))
+    try:
+
+      # Extract the files as the tarball is read. Files cannot be extracted to, or link to, locations outside of the
+      # directory.
+      try:
+        tar   = tarfile.open(fileobj = self, mode = 'r|*', bufsize = self.blockSize)
+        links = set()
+        for member in tar:
+          error = self.checkMember(member, links)
+          if error: return error
+          tar.extract(member, temporaryDirectory)
+        tar.close()
+
+        # Read the remainder of the tarball (e.g. padding at the end of the tar file) for the checksum.
+        while self.read(): pass
+      except (IOError, socket.error, httplib.HTTPException, tarfile.TarError) as exception: return str(exception)
+      finally: self.close()
+
+      # Check the checksum.
+      if self.hash and self.hash.hexdigest() != self.checksum:
+        return 'The ' + self.algorithm + ' checksum of the downloaded file (' + self.hash.hexdigest() + ') does not match the expected ' + \
+        'checksum (' + self.checksum + ')'
+
+      # Move the extracted files into the directory, replacing any existing files.
+      if not os.path.isdir(temporaryDirectory): return 'The tarball contains no files'
+      for name in os.listdir(temporaryDirectory):
+        target = os.path.join(directory, name)
+        if os.path.isdir(target) and not os.path.islink(target): shutil.rmtree(target)
+        elif os.path.lexists(target): os.remove(target)
+        os.rename(os.path.join(temporaryDirectory, name), target)
+      return None
+    finally: shutil.rmtree(temporaryDirectory, ignore_errors = True)
+
+  # Check that a member of the tarball is extracted within the directory. A symbolic or hard link must point to a
+  # location within the directory. Since the location a link resolves to depends on the links it passes through, no
+  # member can be extracted through a link, and no link can point through another link. The names of the links are
+  # added to the set of links. Return an error, or None if the member is valid.
+  @staticmethod
+  def checkMember(member, links):
+    if os.path.isabs(member.name) or '..' in member.name.split('/'): return 'Invalid file in tarball: ' + member.name
+    name  = os.path.normpath(member.name)
+    paths = [os.path.dirname(name)]
+
+    # Determine the location of a link, relative to the directory. Symbolic links are relative to the directory
+    # containing the link, and hard links are relative to the directory.
+    if member.issym() or member.islnk():
+      target = os.path.normpath(os.path.join(os.path.dirname(name) if member.issym() else '', member.linkname))
+      if os.path.isabs(member.linkname) or target == '..' or target.startswith('../'):
+        return 'Invalid link in tarball: ' + member.name + ' -> ' + member.linkname
+      paths.append(target)
+
+    # Check that none of the paths pass through a link.
+    for path in paths:
+      components = [] if path in ['', '.'] else path.split('/')
+      for i in range(len(components)):
+        if '/'.join(components[:i + 1]) in links: return 'Invalid link in tarball: ' + member.name + ' passes through the link ' + \
+        '/'.join(components[:i + 1])
+
+    # Store the link and return.
+    if member.issym() or member.islnk(): links.add(name)
+    return None
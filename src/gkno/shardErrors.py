@@ -0,0 +1,131 @@
+#!/usr/bin/python
+
+from __future__ import print_function
+
+import errors
+from errors import *
+
+import os
+import sys
+
+class shardErrors:
+
+  # Initialise.
+  def __init__(self):
+
+    # Get general error writing and termination methods.
+    self.errors = errors()
+
+    # The error messages are stored in the following list.
+    self.text = []
+
+    # For a list of all error code values, see adminErrors.py.
+    self.errorCode = '18'
+
+  # The number of shards is invalid.
+  def invalidNumberOfShards(self, value):
+    self.text.append('Invalid number of shards.')
+    self.text.append('The value \'' + value + '\' was given to the argument \'--shards (-nsh)\', but the number of shards must be a positive ' + \
+    'integer.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The shard size is invalid.
+  def invalidShardSize(self, value):
+    self.text.append('Invalid shard size.')
+    self.text.append('The value \'' + value + '\' was given to the argument \'--shard-size (-ssz)\', but this is not a valid number of bases. ' + \
+    'The shard size must be a positive value with optional units, e.g. \'500K\' or \'10M\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # Both the number of shards and the shard size were supplied.
+  def numberAndSize(self):
+    self.text.append('Conflicting shard arguments.')
+    self.text.append('The genome can be divided into shards by defining either the number of shards with the argument \'--shards (-nsh)\', ' + \
+    'or the size of the shards with the argument \'--shard-size (-ssz)\', but not both.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The regions to shard were supplied, but neither the number nor the size of the shards.
+  def noNumberOrSize(self):
+    self.text.append('Shards not defined.')
+    self.text.append('The regions to divide into shards were supplied with the argument \'--shard-regions (-shr)\', but the shards were not ' + \
+    'defined. Please define the number of shards with the argument \'--shards (-nsh)\', or the size of the shards with the argument ' + \
+    '\'--shard-size (-ssz)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The pipeline has no tasks that can be divided into shards.
+  def noShardedTasks(self, pipeline):
+    self.text.append('Pipeline cannot be sharded.')
+    self.text.append('The genome was requested to be divided into shards, but the pipeline \'' + pipeline + '\' does not contain any tasks ' + \
+    'that accept genomic shards. Tasks accept shards if the \'shard argument\' is defined for the task in the pipeline configuration file.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The shard argument for a task is invalid.
+  def invalidShardArgument(self, task, tool, argument):
+    self.text.append('Invalid shard argument.')
+    self.text.append('The shard argument \'' + argument + '\' is defined for the task \'' + task + '\', but this is not a valid argument ' + \
+    'for the tool \'' + tool + '\', or the argument accepts multiple values. The shard argument must be an argument that accepts a single ' + \
+    'genomic region.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The shard coordinates for a task are invalid.
+  def invalidShardCoordinates(self, task, value):
+    self.text.append('Invalid shard coordinates.')
+    self.text.append('The shard coordinates \'' + value + '\' are defined for the task \'' + task + '\', but the shard coordinates must be ' + \
+    'either \'0-based\' (e.g. BED coordinates with the end position not included) or \'1-based\' (e.g. samtools regions).')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # Values were supplied to the shard argument.
+  def shardArgumentSet(self, task, argument):
+    self.text.append('Regions supplied with shards.')
+    self.text.append('The genome was requested to be divided into shards, but values were also supplied to the argument \'' + argument + \
+    '\' for the task \'' + task + '\'. The shards are supplied to this argument, so it cannot be set when using shards. To restrict the ' + \
+    'shards to particular regions, supply a BED file with the argument \'--shard-regions (-shr)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # No regions to shard were supplied and no reference index could be found.
+  def noShardRegions(self):
+    self.text.append('No regions to shard.')
+    self.text.append('The genome was requested to be divided into shards, but no reference index (.fai) could be found for the reference ' + \
+    'used by the pipeline. Please supply the reference index or a BED file containing the regions to divide into shards with the argument ' + \
+    '\'--shard-regions (-shr)\'.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The file containing the regions to shard does not exist.
+  def missingShardRegions(self, filename):
+    self.text.append('Unable to open shard regions.')
+    self.text.append('The file \'' + filename + '\' supplied with the argument \'--shard-regions (-shr)\' cannot be found. Please check the ' + \
+    'name of the file and the command line.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # A line in the file containing the regions to shard is invalid.
+  def invalidShardRegions(self, filename, lineNumber):
+    self.text.append('Invalid shard regions.')
+    self.text.append('Line ' + str(lineNumber) + ' of the file \'' + filename + '\' is not valid. The regions to divide into shards must ' + \
+    'be supplied as a reference index (.fai), or a BED file with the reference sequence, start and end of each region in the first three ' + \
+    'columns.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # The file containing the regions to shard contains no regions.
+  def noRegions(self, filename):
+    self.text.append('No shard regions.')
+    self.text.append('The file \'' + filename + '\' does not contain any regions to divide into shards.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
+  # More shards than requested were generated.
+  def additionalShards(self, requested, number):
+    self.text.append('Additional shards.')
+    self.text.append('The genome was requested to be divided into ' + str(requested) + ' shards, but ' + str(number) + ' shards were ' + \
+    'generated. Each shard contains a single region and so each reference sequence (or BED region) is in at least one shard.')
+    self.errors.writeFormattedText(self.text, errorType = 'warning')
+    self.text = []
@@ -0,0 +1,183 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import shardErrors as she
+import stringOperations as strOps
+
+import math
+import os
+
+# Define a class for dividing the genome into balanced shards. The regions to divide are read from a reference
+# index (.fai) or a BED file and each region is split into shards of approximately equal size. The shards are
+# supplied as the values of the shard argument of each task that accepts shards, so these tasks are split into
+# divisions (one for each shard) when the graph is constructed. The shards are kept in coordinate order, so that
+# tasks consolidating the divisions receive the divisions in coordinate order.
+class shards:
+  def __init__(self):
+
+    # Define errors.
+    self.errors = she.shardErrors()
+
+    # The file containing the regions to divide into shards.
+    self.filename = None
+
+    # The regions to divide into shards and the shards themselves. Each is a reference sequence with a 0-based
+    # start and end (the end position is not included), in coordinate order.
+    self.regions = []
+    self.shards  = []
+
+    # The allowed coordinate systems for shard arguments.
+    self.coordinates = ['0-based', '1-based']
+
+  # Determine if the genome is to be divided into shards and, if so, generate the shards. Return True if the
+  # genome is divided into shards.
+  def getShards(self, graph, superpipeline, gkno, arguments):
+    number        = gkno.getGknoArgument('GKNO-SHARDS', arguments)
+    size          = gkno.getGknoArgument('GKNO-SHARD-SIZE', arguments)
+    self.filename = gkno.getGknoArgument('GKNO-SHARD-REGIONS', arguments)
+    if not number and not size:
+      if self.filename: self.errors.noNumberOrSize()
+      return False
+    if number and size: self.errors.numberAndSize()
+
+    # Check that the pipeline contains tasks that accept shards.
+    tasks = [task for task in graph.workflow if graph.getGraphNodeAttribute(task, 'shardArgument')]
+    if not tasks: self.errors.noShardedTasks(superpipeline.pipeline)
+
+    # Read the regions to divide into shards. If no regions were supplied, use the index of the reference used by
+    # the tasks.
+    if not self.filename: self.filename = self.getReferenceIndex(graph, tasks)
+    if not os.path.exists(self.filename): self.errors.missingShardRegions(self.filename)
+    if self.filename.endswith('.fai'): self.readReferenceIndex(self.filename)
+    else: self.readBed(self.filename)
+    if not self.regions: self.errors.noRegions(self.filename)
+
+    # Divide the regions into shards of the requested size. If the number of shards was requested, find the
+    # smallest shard size that does not result in more shards than requested.
+    if size:
+      size = strOps.getBases(size)
+      if not size: self.errors.invalidShardSize(str(gkno.getGknoArgument('GKNO-SHARD-SIZE', arguments)))
+    else:
+      try: number = int(number)
+      except ValueError: self.errors.invalidNumberOfShards(str(number))
+      if number < 1: self.errors.invalidNumberOfShards(str(number))
+      size = self.getShardSize(number)
+    self.divideRegions(size)
+
+    # If more shards than requested were generated (e.g. there are more reference sequences than shards), warn the
+    # user.
+    if number and len(self.shards) > number: self.errors.additionalShards(number, len(self.shards))
+
+    # The genome is divided into shards.
+    return True
+
+  # Find the reference index for the reference used by the tasks accepting shards.
+  def getReferenceIndex(self, graph, tasks):
+    for task in tasks:
+      for nodeId in graph.getInputFileNodes(task):
+        for value in graph.getGraphNodeAttribute(nodeId, 'values'):
+          value = str(value)
+          if value.endswith('.fai') and os.path.exists(value): return value
+          if value.endswith(('.fa', '.fasta', '.fa.gz', '.fasta.gz')) and os.path.exists(value + '.fai'): return value + '.fai'
+
+    # No reference index was found.
+    self.errors.noShardRegions()
+
+  # Read the reference sequences and their lengths from a reference index.
+  def readReferenceIndex(self, filename):
+    with open(filename) as filehandle:
+      for lineNumber, line in enumerate(filehandle):
+        if not line.strip(): continue
+        fields = line.rstrip('\n').split('\t')
+        try: self.regions.append((fields[0], 0, int(fields[1])))
+        except (IndexError, ValueError): self.errors.invalidShardRegions(filename, lineNumber + 1)
+
+  # Read the regions from a BED file. The regions are sorted by position within each reference sequence (with the
+  # reference sequences in the order in which they first appear) and overlapping regions are merged.
+  def readBed(self, filename):
+    regions = {}
+    order   = []
+    with open(filename) as filehandle:
+      for lineNumber, line in enumerate(filehandle):
+        if not line.strip() or line.startswith(('#', 'track', 'browser')): continue
+        fields = line.rstrip('\n').split('\t')
+        try: name, start, end = fields[0], int(fields[1]), int(fields[2])
+        except (IndexError, ValueError): self.errors.invalidShardRegions(filename, lineNumber + 1)
+        if end <= start: continue
+        if name not in regions:
+          regions[name] = []
+          order.append(name)
+        regions[name].append((start, end))
+
+    # Sort and merge the regions.
+    for name in order:
+      merged = []
+      for start, end in sorted(regions[name]):
+        if merged and start < merged[-1][1]: merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else: merged.append((start, end))
+      for start, end in merged: self.regions.append((name, start, end))
+
+  # Return the number of shards that a region is divided into for a given shard size.
+  @staticmethod
+  def getNumberOfShards(length, size):
+    return max(1, int(math.ceil(float(length) / size)))
+
+  # Find the smallest shard size that results in at most the requested number of shards. Each region is in at least
+  # one shard, so if there are more regions than requested shards, each region is a single shard.
+  def getShardSize(self, number):
+    lower = 1
+    upper = max([end - start for name, start, end in self.regions])
+    while lower < upper:
+      size = (lower + upper) // 2
+      if sum([self.getNumberOfShards(end - start, size) for name, start, end in self.regions]) > number: lower = size + 1
+      else: upper = size
+    return upper
+
+  # Divide each region into shards of approximately equal size, no larger than the requested size.
+  def divideRegions(self, size):
+    for name, start, end in self.regions:
+      number = self.getNumberOfShards(end - start, size)
+      for i in range(number):
+        self.shards.append((name, start + (end - start) * i // number, start + (end - start) * (i + 1) // number))
+
+  # Return the shards as genomic regions in the coordinate system used by a task.
+  def getValues(self, task, coordinates):
+    if coordinates not in self.coordinates: self.errors.invalidShardCoordinates(task, str(coordinates))
+    offset = 1 if coordinates == '1-based' else 0
+    return [str(name + ':' + str(start + offset) + '-' + str(end)) for name, start, end in self.shards]
+
+  # Supply the shards to each task that accepts shards. The shards are set as the values of the option node for the
+  # shard argument (creating the node if necessary), replacing any values from parameter sets. Since the argument
+  # accepts a single value, the task is divided into a division for each shard when the graph is constructed.
+  def addShards(self, graph, superpipeline, args, arguments):
+
+    # Find the nodes whose values were set on the command line.
+    commandLineNodeIds = set()
+    for argument in arguments: commandLineNodeIds.update(args.arguments[argument].graphNodeIds)
+
+    # Loop over the tasks accepting shards.
+    for task in graph.workflow:
+      argument = graph.getGraphNodeAttribute(task, 'shardArgument')
+      if not argument: continue
+
+      # Check that the shard argument is valid.
+      tool             = graph.getGraphNodeAttribute(task, 'tool')
+      toolData         = superpipeline.getToolData(tool)
+      longFormArgument = toolData.getLongFormArgument(argument)
+      if not longFormArgument or toolData.getArgumentAttribute(longFormArgument, 'allowMultipleValues'):
+        self.errors.invalidShardArgument(task, tool, argument)
+      values = self.getValues(task, graph.getGraphNodeAttribute(task, 'shardCoordinates'))
+
+      # If no node exists for the argument, create the node.
+      nodeIds = graph.checkIfEdgeExists(task, longFormArgument, True)
+      if not nodeIds:
+        nodeId = str(task + '.' + longFormArgument.split('--', 1)[-1])
+        graph.addOptionNode(nodeId)
+        graph.addEdge(nodeId, str(task), toolData.getArgumentData(longFormArgument))
+        nodeIds = [nodeId]
+
+      # Set the shards as the values for the argument. Values cannot also be supplied on the command line.
+      for nodeId in nodeIds:
+        if nodeId in commandLineNodeIds: self.errors.shardArgumentSet(task, longFormArgument)
+        graph.setGraphNodeAttribute(nodeId, 'values', values)
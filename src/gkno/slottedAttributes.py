@@ -0,0 +1,38 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+# Define a base class for the attributes attached to the nodes and edges of the pipeline graph. There can be tens
+# of thousands of nodes and edges, so rather than each instance holding a dictionary of attributes, the attributes
+# are stored in slots (defined by __slots__ in each derived class). The default values of the attributes are held
+# once for the class in the defaults dictionary and are only stored in an instance when the attribute is set.
+# Attributes listed in __slots__ without a default value are not set until assigned (attempting to get them before
+# raises an AttributeError, as with attributes that were never assigned).
+class slottedAttributes(object):
+  __slots__ = ()
+
+  # The default values of the attributes.
+  defaults = {}
+
+  # If an attribute has not been set, return the default value. Mutable defaults (empty lists and dictionaries) are
+  # created for the instance the first time they are requested, so that they are never shared between instances.
+  def __getattr__(self, attribute):
+    try: value = self.defaults[attribute]
+    except KeyError: raise AttributeError(attribute)
+    if isinstance(value, (list, dict)):
+      value = type(value)()
+      object.__setattr__(self, attribute, value)
+    return value
+
+  # Return the attributes that have been set. This is used when the attributes are copied or pickled, so that the
+  # default values are not stored in the copy.
+  def __getstate__(self):
+    state = {}
+    for attribute in self.__slots__:
+      try: state[attribute] = object.__getattribute__(self, attribute)
+      except AttributeError: pass
+    return state
+
+  # Set the attributes of a copied or unpickled instance.
+  def __setstate__(self, state):
+    for attribute, value in state.iteritems(): object.__setattr__(self, attribute, value)
@@ -0,0 +1,148 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import executorErrors as ee
+import profileReport as pr
+
+import atexit
+import json
+import os
+import resource
+import sys
+import time
+
+# Define a class to record the wall time, CPU time and peak memory of each stage of gkno (e.g. reading the
+# configuration files, building the graph or writing the makefiles). The start of each stage is marked with the name
+# of the stage, which also ends the previous stage. If a stage is entered more than once (e.g. for each sample in a
+# batch), the times for the stage are summed. If requested, each stage is also profiled with cProfile. Nothing is
+# recorded unless profiling has been requested, in which case a summary is written to screen and the stages are
+# written to a json file when gkno exits.
+class stageProfile:
+  def __init__(self):
+
+    # Handle errors.
+    self.errors = ee.executorErrors()
+
+    # Record if profiling was requested, the json file to write the stages to and the directory for the cProfile
+    # output for each stage.
+    self.isProfile = False
+    self.filename  = None
+    self.directory = None
+
+    # Store the stages in the order they were first entered, along with the name and the resource usage at the
+    # start of the current stage. The first stage starts when the object is created.
+    self.stages    = []
+    self.usage     = {}
+    self.current   = 'initialise'
+    self.start     = self.getUsage()
+    self.startTime = time.time()
+
+    # Store the cProfile profiler for each stage.
+    self.profilers = {}
+
+  # Determine if the stages are to be profiled.
+  def setProfile(self, gknoConfiguration, arguments):
+    filename  = gknoConfiguration.getGknoArgument('GKNO-PROFILE', arguments)
+    directory = gknoConfiguration.getGknoArgument('GKNO-PROFILE-DIRECTORY', arguments)
+    if not filename and not directory: return
+
+    # If a directory was supplied for the cProfile output, create it if necessary. If no filename was supplied, the
+    # stages are written to the directory.
+    if directory:
+      if directory == True: self.errors.invalidStageProfile('--gkno-profile-directory (-gpd)', None)
+      if not os.path.isdir(directory):
+        try: os.makedirs(directory)
+        except OSError: self.errors.invalidStageProfile('--gkno-profile-directory (-gpd)', directory)
+      self.directory = directory
+    if filename == True: self.errors.invalidStageProfile('--gkno-profile (-gp)', None)
+    self.filename = filename if filename else os.path.join(directory, 'stages.json')
+    if not os.access(os.path.dirname(os.path.abspath(self.filename)), os.W_OK): self.errors.invalidStageProfile('--gkno-profile (-gp)', self.filename)
+
+    # Write the profile when gkno exits, whether it completes, terminates with an error or fails.
+    self.isProfile = True
+    atexit.register(self.write)
+
+  # Start a new stage, ending the current stage.
+  def stage(self, name):
+    if not self.isProfile: return
+    usage = self.getUsage()
+    self.endStage(usage)
+    self.current = name
+    self.start   = usage
+
+    # Profile the stage if requested.
+    if self.directory:
+      if name not in self.profilers:
+        import cProfile
+        self.profilers[name] = cProfile.Profile()
+      self.profilers[name].enable()
+
+  # End the current stage and add the resource usage to the stage.
+  def endStage(self, usage):
+    if self.current in self.profilers: self.profilers[self.current].disable()
+    if self.current not in self.usage:
+      self.stages.append(self.current)
+      self.usage[self.current] = {'calls' : 0, 'wallTime' : 0., 'cpuTime' : 0., 'peakMemory' : 0, 'memoryIncrease' : 0}
+    stage                    = self.usage[self.current]
+    stage['calls']          += 1
+    stage['wallTime']       += usage[0] - self.start[0]
+    stage['cpuTime']        += usage[1] - self.start[1]
+    stage['peakMemory']      = max(stage['peakMemory'], usage[2])
+    stage['memoryIncrease'] += usage[2] - self.start[2]
+
+  # Write the summary to screen, the stages to the json file and the cProfile output for each stage.
+  def write(self):
+    self.endStage(self.getUsage())
+    self.current = None
+
+    # Write the cProfile output for each stage, numbered in the order the stages were first entered.
+    profiles = {}
+    for index, name in enumerate(self.stages):
+      if name in self.profilers:
+        profiles[name] = os.path.join(self.directory, str(index + 1).zfill(2) + '.' + name + '.prof')
+        self.profilers[name].dump_stats(profiles[name])
+
+    # Write the summary.
+    wallTime = sum([self.usage[name]['wallTime'] for name in self.stages])
+    cpuTime  = sum([self.usage[name]['cpuTime'] for name in self.stages])
+    memory   = max([self.usage[name]['peakMemory'] for name in self.stages])
+    print(file = sys.stdout)
+    print('Stage profile:', file = sys.stdout)
+    rows = [['Stage', 'Calls', 'Wall time', 'CPU time', 'Peak RSS', 'RSS increase']]
+    for name in self.stages:
+      stage = self.usage[name]
+      rows.append([name, stage['calls'], self.formatTime(stage['wallTime']), self.formatTime(stage['cpuTime']),
+      pr.profileReport.formatMemory(stage['peakMemory']), pr.profileReport.formatMemory(stage['memoryIncrease'])])
+    rows.append(['total', '', self.formatTime(wallTime), self.formatTime(cpuTime), pr.profileReport.formatMemory(memory), ''])
+    pr.profileReport.writeTable(rows)
+    sys.stdout.flush()
+
+    # Write the stages to the json file. The times are in seconds and the memory in kilobytes.
+    stages = []
+    for name in self.stages:
+      stage            = dict(self.usage[name])
+      stage['name']    = name
+      stage['profile'] = profiles.get(name)
+      stages.append(stage)
+    profile = {'command' : sys.argv, 'start' : self.startTime, 'wallTime' : wallTime, 'cpuTime' : cpuTime, 'peakMemory' : memory, 'stages' : stages}
+    try:
+      with open(self.filename, 'w') as filehandle: json.dump(profile, filehandle, indent = 2, sort_keys = True)
+    except IOError: print('WARNING: Unable to write the stage profile to ', self.filename, sep = '', file = sys.stderr)
+
+  ######################
+  ### Static methods ###
+  ######################
+
+  # Return the wall time and the CPU time (including any child processes) in seconds and the peak resident set size
+  # in kilobytes.
+  @staticmethod
+  def getUsage():
+    usage    = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.time(), usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime, usage.ru_maxrss
+
+  # Format a time in seconds.
+  @staticmethod
+  def formatTime(seconds):
+    return '%.3fs' % seconds
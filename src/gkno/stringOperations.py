@@ -6,6 +6,7 @@ from difflib import SequenceMatcher
 import json
 import os
 import random
+import re
 import string
 import sys
 
@@ -40,3 +41,89 @@ def findMostSimilar(referenceList, queryString):
 
   # Return the most closely matched string.
   return matchString
+
+# Extensions indicating that a file is compressed. These are removed, along with the file type extension, when
+# generating a key for pairing values.
+compressionExtensions = ['gz', 'bgz', 'bz2', 'xz', 'zip']
+
+# Tokens identifying the mate of a paired end sequencing file (e.g. sample_R1.fastq or sample.2.fq). Only the final token
+# in a filename is treated as the mate, so that sample numbers (e.g. sample_1_R1.fastq) are retained.
+mateToken = re.compile('[._-](r|read|mate)?[12](?=[._-]|$)')
+
+# Generate the key used to pair a value with values of a linked argument. The extensions and the mate token are removed
+# from the filename, and the path is removed unless requested.
+def getPairingKey(value, includePath = False):
+  path, filename = os.path.split(value.lower())
+  stem, extension = os.path.splitext(filename)
+  while extension[1:] in compressionExtensions: stem, extension = os.path.splitext(stem)
+  matches = [match for match in mateToken.finditer(stem)]
+  if matches: stem = stem[:matches[-1].start()] + stem[matches[-1].end():]
+
+  # Return the key.
+  return (path, stem) if includePath else stem
+
+# Order the values in a list to match the values in a reference list (e.g. the second fastq file from paired end
+# sequencing to match the list of first fastq files). Values are paired by their pairing key, first including the path
+# and then with the path removed. Any values that cannot be uniquely paired this way are paired with the most similar
+# remaining value. Return the ordered list, along with a list of pairs that could not be unambiguously determined.
+def pairValues(values, referenceList):
+  pairedList = [None] * len(referenceList)
+  unpaired   = range(len(values))
+  ambiguous  = []
+
+  # Pair the values whose keys are unique in both lists.
+  for includePath in [True, False]:
+    references = {}
+    queries    = {}
+    paired     = set()
+    for i, reference in enumerate(referenceList):
+      if pairedList[i] == None: references.setdefault(getPairingKey(reference, includePath), []).append(i)
+    for i in unpaired: queries.setdefault(getPairingKey(values[i], includePath), []).append(i)
+    for key in references:
+      if len(references[key]) == 1 and len(queries.get(key, [])) == 1:
+        pairedList[references[key][0]] = values[queries[key][0]]
+        paired.add(queries[key][0])
+    unpaired = [i for i in unpaired if i not in paired]
+
+  # Pair the remaining values with the most similar unpaired value. If there are no unpaired values left (the lists
+  # are of different lengths), or multiple values are equally similar, the pairing is ambiguous.
+  for i, reference in enumerate(referenceList):
+    if pairedList[i] != None: continue
+    if not unpaired:
+      pairedList[i] = findMostSimilar(values, reference)
+      ambiguous.append((pairedList[i], reference))
+      continue
+    scores = [(int(100 * SequenceMatcher(None, values[j].lower(), reference.lower()).ratio()), j) for j in unpaired]
+    score  = max(scores)[0]
+    best   = [j for queryScore, j in scores if queryScore == score]
+    pairedList[i] = values[best[0]]
+    unpaired.remove(best[0])
+    if len(best) > 1: ambiguous.append((pairedList[i], reference))
+
+  # Return the paired list and the ambiguous pairs.
+  return pairedList, ambiguous
+
+# Convert a memory value (e.g. '512M', '16G' or '2T') into megabytes. A value with no units is assumed to
+# be in megabytes. If the value is not valid, return None.
+def getMegabytes(value):
+  units = {'K' : 1. / 1024, 'M' : 1, 'G' : 1024, 'T' : 1024 * 1024}
+  value = str(value).strip().upper().rstrip('B')
+  unit  = value[-1] if value and value[-1] in units else 'M'
+  try: megabytes = float(value.rstrip(unit)) * units[unit]
+  except ValueError: return None
+
+  # Return the memory in megabytes.
+  return int(megabytes) if megabytes > 0 else None
+
+# Convert a length of sequence (e.g. '500K', '10Mb' or '1G') into bases. A value with no units is assumed to be
+# in bases. If the value is not valid, return None.
+def getBases(value):
+  units = {'K' : 1000, 'M' : 1000000, 'G' : 1000000000}
+  value = str(value).strip().upper()
+  value = value[:-2] if value.endswith('BP') else value.rstrip('B')
+  unit  = value[-1] if value and value[-1] in units else None
+  try: bases = float(value.rstrip(unit) if unit else value) * (units[unit] if unit else 1)
+  except ValueError: return None
+
+  # Return the number of bases.
+  return int(bases) if bases >= 1 else None
@@ -54,13 +54,20 @@ class superpipelineClass:
     # files to ensure simultaneous executions of gkno will not produced filename conflicts.
     self.randomString = strOps.getRandomString(8)
 
+    # If defined, validated tool and pipeline configuration data are read from, and stored in, an on disk
+    # cache rather than processing the configuration files on every execution.
+    self.configurationCache = None
+
+    # Store the names of all the configuration files (including external parameter set files, whether or not they
+    # exist) used to define the superpipeline.
+    self.configurationFiles = []
+
   # Starting from the defined pipeline, process and validate the configuration file contents,
   # then dig down through all the nested pipelines and validate their configuration files.
   def getNestedPipelineData(self, files, path, userPath, filename):
 
     # Get the top level pipeline configuration file data.
-    pipeline = pipelineConfiguration.pipelineConfiguration()
-    pipeline.getConfigurationData(filename)
+    pipeline      = self.getPipelineConfigurationData(filename)
     pipeline.path = filename.rstrip(str(pipeline.name + '.json'))[:-1]
     self.pipelineConfigurationData[pipeline.name] = pipeline
 
@@ -82,6 +89,7 @@ class superpipelineClass:
 
         # Get the configuration file data.
         data                  = fileHandling.fileHandling.readConfigurationFile(externalFilename, False)
+        self.configurationFiles.append(externalFilename)
         externalParameterSets = parameterSets.parameterSets()
 
         # If the external parameter set file exists, copy the parameter sets to the current pipeline configuration
@@ -120,7 +128,7 @@ class superpipelineClass:
               filename          = str(path + '/' + nestedPipeline + '.json')
 
             # Process the configuration file.
-            pipeline.getConfigurationData(filename)
+            pipeline      = self.getPipelineConfigurationData(filename)
             pipeline.path = configurationPath
   
             # Get the configuration file data.
@@ -295,8 +303,23 @@ class superpipelineClass:
       if tool not in files.tools: self.pipelineErrors.invalidTool(tool)
 
       # Get the configuration file data.
-      toolData.getConfigurationData(tool, filename)
-      self.toolConfigurationData[tool] = toolData
+      self.toolConfigurationData[tool] = self.getToolConfigurationData(tool, filename)
+
+  # Process a pipeline configuration file, using the configuration cache if available.
+  def getPipelineConfigurationData(self, filename):
+    self.configurationFiles.append(filename)
+    if self.configurationCache: return self.configurationCache.getPipelineConfiguration(filename)
+    pipeline = pipelineConfiguration.pipelineConfiguration()
+    pipeline.getConfigurationData(filename)
+    return pipeline
+
+  # Process a tool configuration file, using the configuration cache if available.
+  def getToolConfigurationData(self, tool, filename):
+    self.configurationFiles.append(filename)
+    if self.configurationCache: return self.configurationCache.getToolConfiguration(tool, filename)
+    toolData = toolConfiguration.toolConfiguration()
+    toolData.getConfigurationData(tool, filename)
+    return toolData
 
   # Check that all tool arguments reference in pipeline configuration files are valid.
   def checkArgumentsInPipeline(self):
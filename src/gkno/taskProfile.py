@@ -0,0 +1,86 @@
+#!/usr/bin/python
+
+from __future__ import print_function
+
+import argparse
+import errno
+import os
+import signal
+import sys
+import time
+
+# The columns in the profile file.
+columns = ['task', 'tool', 'phase', 'subphase', 'division', 'predecessors', 'start', 'end', 'wall time', 'user time', 'system time', 'max rss', 'exit status']
+
+# Execute a task from a gkno makefile and record its resource usage. The wall time, the user and system CPU time
+# and the peak resident set size (in kilobytes) of the task are appended, along with the task, tool, phase,
+# subphase, division and the tasks it depends on, as a single tab delimited line to the profile file. Each line is
+# written using a single append, so tasks executed in parallel (or streamed together) can share a profile file.
+# The wrapper exits with the exit status of the task, so the behaviour of the makefile is unchanged.
+def main():
+  parser = argparse.ArgumentParser(description = 'Execute a command and record its resource usage.')
+  parser.add_argument('--profile', required = True)
+  parser.add_argument('--task', required = True)
+  parser.add_argument('--tool', default = '')
+  parser.add_argument('--phase', type = int, default = 1)
+  parser.add_argument('--subphase', type = int, default = 1)
+  parser.add_argument('--division', type = int, default = 1)
+  parser.add_argument('--predecessors', default = '')
+  parser.add_argument('command', nargs = argparse.REMAINDER)
+  args = parser.parse_args()
+  if args.command and args.command[0] == '--': args.command = args.command[1:]
+
+  # Execute the command in a child process. The file descriptors are inherited by the command, so that streams
+  # and process substitutions are unaffected.
+  start = time.time()
+  pid   = os.fork()
+  if pid == 0:
+    try: os.execvp(args.command[0], args.command)
+    except OSError as error:
+      print('gkno: ', args.command[0], ': ', error.strerror, sep = '', file = sys.stderr)
+      os._exit(127)
+
+  # Interrupts are passed on to the command (which is in the same process group), so the profile is written once
+  # the command has terminated.
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  signal.signal(signal.SIGTERM, signal.SIG_IGN)
+  status, usage = waitForCommand(pid)
+  end = time.time()
+
+  # Determine the exit status of the command.
+  returnCode = 128 + os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+
+  # The peak resident set size is reported in bytes on OS X and kilobytes elsewhere.
+  maxRss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+
+  # Write the resource usage to the profile.
+  values = [args.task, args.tool, args.phase, args.subphase, args.division, args.predecessors, '%.3f' % start, '%.3f' % end, '%.3f' % (end - start)]
+  values += ['%.3f' % usage.ru_utime, '%.3f' % usage.ru_stime, maxRss, returnCode]
+  try: writeProfile(args.profile, values)
+  except (IOError, OSError) as error: print('gkno: unable to write profile ', args.profile, ': ', error.strerror, sep = '', file = sys.stderr)
+
+  # Exit with the exit status of the command.
+  sys.exit(returnCode)
+
+# Wait for the command to terminate, returning the exit status and the resource usage.
+def waitForCommand(pid):
+  while True:
+    try:
+      _, status, usage = os.wait4(pid, 0)
+      return status, usage
+    except OSError as error:
+      if error.errno != errno.EINTR: raise
+
+# Append a line to the profile. The header is only written by the task that creates the file.
+def writeProfile(filename, values):
+  try:
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+    os.write(fd, ('#' + '\t'.join(columns) + '\n').encode())
+  except OSError as error:
+    if error.errno != errno.EEXIST: raise
+    fd = os.open(filename, os.O_WRONLY | os.O_APPEND)
+  try: os.write(fd, ('\t'.join([str(value) for value in values]) + '\n').encode())
+  finally: os.close(fd)
+
+if __name__ == "__main__":
+  main()
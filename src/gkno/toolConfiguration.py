@@ -5,110 +5,114 @@ from __future__ import print_function
 import fileHandling
 import generalConfigurationFileMethods as methods
 import parameterSets
+import slottedAttributes as sa
+import stringOperations as strOps
 import toolConfigurationErrors as errors
 
 import json
 import os
 import sys
 
-# Define a class to hold information on the arguments.
-class argumentAttributes:
-  def __init__(self):
-    
+# Define a class to hold information on the arguments. The argument attributes are attached to the edges in the graph.
+class argumentAttributes(sa.slottedAttributes):
+  defaults = {
+
     # If an argument is allowed to be set multiple times.
-    self.allowMultipleValues = False
+    'allowMultipleValues' : False,
 
     # Store the defined long and short form of the argument recognised as well
     # as the argument expected by the tool.
-    self.commandLineArgument = None
-    self.longFormArgument    = None
-    self.shortFormArgument   = None
+    'commandLineArgument' : None,
+    'longFormArgument'    : None,
+    'shortFormArgument'   : None,
 
     # Instructions on how to modify the argument and the value to be used on
     # the command line in the makefile.
-    self.modifyArgument = None
-    self.modifyValue    = None
+    'modifyArgument' : None,
+    'modifyValue'    : None,
 
     # If there are instructions on supplying a command to use in place of the value,
     # store the instructions.
-    self.valueCommand = {}
+    'valueCommand' : {},
 
     # Mark the edge as a stream if necessary.
-    self.isStream = False
+    'isStream' : False,
 
     # Store instructions on how to modify the argument and the value if the tool is
     # accepting a stream as input or is outputting to a stream.
-    self.inputStreamInstructions  = {}
-    self.outputStreamInstructions = {}
+    'inputStreamInstructions'  : {},
+    'outputStreamInstructions' : {},
 
     # Define the extensions allowed for the argument.
-    self.extensions = []
+    'extensions' : [],
 
     # The 'location' field can be used to specifiy a location for the file specified. This
     # location is stored in the fileLocation attribute.
-    self.fileLocation = None
+    'fileLocation' : None,
 
     # An argument can be defined as being linked to another argument for the tool. Linked
     # arguments can be used to make sure that lists of values are ordered such that each
     # value for the argument is most similar to the value for the linked argument. For
     # example, paired end fastq files. The argument for the second mate is linked to the
     # argument for the first mate to ensure that the correct values go together.
-    self.linkedArgument = None
-    
+    'linkedArgument' : None,
+
     # Store instructions on how to construct the filename.
-    self.constructionInstructions = None
+    'constructionInstructions' : None,
 
     # Record the argument description.
-    self.description = None
+    'description' : None,
 
     # Store the data type of the value supplied with this argument.
-    self.dataType = None
+    'dataType' : None,
 
     # Keep track of required arguments.
-    self.isRequired = False
+    'isRequired' : False,
 
     # If an argument accepts a string, the configuration file can contain information
     # on replacing substrings within the string. Store this information.
-    self.isReplaceSubstring = False
-    self.replaceSubstring   = []
+    'isReplaceSubstring' : False,
+    'replaceSubstring'   : [],
 
-    # Record id the argument points to a filename stub and store the 
+    # Record id the argument points to a filename stub and store the
     # associated extensions. Also, store the extension for this specific node.
-    self.isStub            = False
-    self.isPrimaryStubNode = False
-    self.stubExtension     = None
-    self.stubExtensions    = []
-    self.includeStubDot    = True
+    'isStub'            : False,
+    'isPrimaryStubNode' : False,
+    'stubExtension'     : None,
+    'stubExtensions'    : [],
+    'includeStubDot'    : True,
 
     # Record the category to which the argument belongs.
-    self.category = None
+    'category' : None,
 
     # If the argument should be hidden from the user in help messages.
-    self.hideInHelp = False
+    'hideInHelp' : False,
 
     # Record if the argument is for an input or output file.
-    self.isInput  = False
-    self.isOutput = False
+    'isInput'  : False,
+    'isOutput' : False,
 
     # Store if the argument is greedy (e.g. uses all values associated with the node).
-    self.isGreedy = False
+    'isGreedy' : False,
 
     # Store whether the argument can be suggested as a possible tool to use in a
     # pipeline builder.
-    self.isSuggestible = False
+    'isSuggestible' : False,
 
     # Record if the value supplied on the command line should be included in quotations when included
     # in the command line in the makefile.
-    self.includeInQuotations = False
+    'includeInQuotations' : False,
 
     # Record whether the node associated with this argument should be included in a reduced plot.
-    self.includeInReducedPlot = True
+    'includeInReducedPlot' : True,
 
     # Some argument values are commands that are to be evaluated at run time and these commands may require
     # information from other nodes in the pipeline. When this is the case, an edge is included in the graph
     # in order to account for the dependency, but there is no argument associated with the edge. In these
     # cases, the following flag will be set.
-    self.isLinkOnly = False
+    'isLinkOnly' : False
+  }
+  __slots__ = tuple(defaults)
 
 # Define a class to hold information about the tool.
 class toolAttributes:
@@ -167,6 +171,15 @@ class toolConfiguration:
     # Store the URL for the tool.
     self.url = None
 
+    # The resources required by the tool: the number of threads, the memory (in megabytes) and the relative
+    # I/O load. These are used to avoid oversubscribing the available resources when tasks are run in parallel.
+    # If the tool has an argument setting the number of threads, the value given to this argument is used in
+    # place of the number of threads.
+    self.threads         = 1
+    self.threadsArgument = None
+    self.memory          = None
+    self.ioWeight        = 1
+
     # If the tool is untested, but available, the isExperimental flag can be set. This
     # will ensure that the tool is listed as experimental and urge caution in its use.
     self.isDevelopmental = False
@@ -261,6 +274,9 @@ class toolConfiguration:
     # for the tool are included and no others.
     if self.success: self.success = self.checkArgumentOrder()
 
+    # If an argument setting the number of threads is defined, check that it is a valid integer argument.
+    if self.success: self.checkThreadsArgument()
+
     # Check the parameter set information and store.
     if self.success: self.success = self.parameterSets.checkParameterSets(data['parameter sets'], self.allowTermination, self.name, isTool = True)
 
@@ -296,11 +312,15 @@ class toolConfiguration:
     allowedAttributes['executable']         = (str, True, True, 'executable')
     allowedAttributes['hide tool']          = (bool, False, True, 'isHidden')
     allowedAttributes['id']                 = (str, True, True, 'id')
+    allowedAttributes['io weight']          = (int, False, True, 'ioWeight')
+    allowedAttributes['memory']             = (str, False, True, 'memory')
     allowedAttributes['parameter sets']     = (list, True, False, None)
     allowedAttributes['modifier']           = (str, False, True, 'modifier')
     allowedAttributes['path']               = (str, True, True, 'path')
     allowedAttributes['precommand']         = (str, False, True, 'precommand')
     allowedAttributes['R packages']         = (list, False, True, 'rPackages')
+    allowedAttributes['threads']            = (int, False, True, 'threads')
+    allowedAttributes['threads argument']   = (str, False, True, 'threadsArgument')
     allowedAttributes['tools']              = (list, True, True, 'requiredCompiledTools')
     allowedAttributes['url']                = (str, False, True, 'url')
     allowedAttributes['web page']           = (dict, False, True, 'webPage')
@@ -309,7 +329,37 @@ class toolConfiguration:
     helpInfo = (self.name, None, None)
 
     # Check the attributes against the allowed attributes and make sure everything is ok.
-    self = methods.checkAttributes(data, allowedAttributes, self, self.allowTermination, helpInfo)
+    methods.checkAttributes(data, allowedAttributes, self, self.allowTermination, helpInfo)
+
+    # Check the resource requirements and convert the memory to megabytes.
+    self.checkResources()
+
+  # Check that the resources required by the tool are valid.
+  def checkResources(self):
+    if self.threads < 1:
+      if self.allowTermination: self.errors.invalidResource(self.name, 'threads', self.threads, 'The number of threads must be at least 1.')
+      else: self.success = False
+    if self.ioWeight < 0:
+      if self.allowTermination: self.errors.invalidResource(self.name, 'io weight', self.ioWeight, 'The I/O weight cannot be negative.')
+      else: self.success = False
+    if self.memory != None:
+      memory = strOps.getMegabytes(self.memory)
+      if not memory:
+        if self.allowTermination: self.errors.invalidResource(self.name, 'memory', self.memory, 'The memory must be a positive value with optional ' + \
+        'units, e.g. \'512M\' or \'16G\'.')
+        else: self.success = False
+      self.memory = memory
+
+  # Check that the argument setting the number of threads is an integer argument for the tool, and store the long
+  # form of the argument.
+  def checkThreadsArgument(self):
+    if self.threadsArgument == None: return
+    longFormArgument = self.getLongFormArgument(self.threadsArgument)
+    if not longFormArgument or self.getArgumentAttribute(longFormArgument, 'dataType') != 'integer':
+      if self.allowTermination: self.errors.invalidResource(self.name, 'threads argument', self.threadsArgument, 'The value must be an integer ' + \
+      'argument of the tool.')
+      else: self.success = False
+    self.threadsArgument = longFormArgument
 
   # Validate the contents of all input arguments.
   def checkInputArguments(self, arguments):
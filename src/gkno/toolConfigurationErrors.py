@@ -2,9 +2,6 @@
 
 from __future__ import print_function
 
-import inspect
-from inspect import currentframe, getframeinfo
-
 import errors
 from errors import *
 
@@ -66,6 +63,14 @@ class toolErrors:
     self.errors.writeFormattedText(self.text, errorType = 'error')
     self.errors.terminate(self.errorCode)
 
+  # If a resource requirement for the tool is invalid.
+  def invalidResource(self, name, attribute, value, description):
+    self.text.append('Invalid resource requirement.')
+    self.text.append('The configuration file for tool \'' + name + '\' gives the attribute \'' + attribute + '\' the value \'' + str(value) + \
+    '\'. ' + description + ' Please correct the configuration file.')
+    self.errors.writeFormattedText(self.text, errorType = 'error')
+    self.errors.terminate(self.errorCode)
+
   ###########################
   ## Errors with arguments ##
   ###########################
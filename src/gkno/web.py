@@ -1,17 +1,62 @@
 #!/bin/bash/python
 
 from __future__ import print_function
+from multiprocessing import Pool
 from subprocess import Popen, PIPE
 
 import json
+import multiprocessing
 import os
 import subprocess
 import sys
 
+import dataConsistency as dc
 import toolConfiguration as tc
 
+# The function used to build the graph for a pipeline and the plotting class used to plot the pipeline. These are set
+# before the processes generating the content for the pipelines are created, so that they are available in each
+# process.
+buildPipeline = None
+plot          = None
+
+# Generate the web content for a pipeline. The pipeline information, the categories to which the pipeline belongs and
+# the configuration files used by the pipeline are returned (the information is None for pipelines in development). If
+# gkno terminates (e.g. a configuration file is invalid), the error code is returned in place of the content.
+def getPipelineContent(pipeline):
+  try:
+    superpipeline, args, graph = buildPipeline(pipeline)
+    pipelineData               = superpipeline.pipelineConfigurationData[superpipeline.pipeline]
+    if pipelineData.isDevelopment: return pipeline, {'information': None, 'files': superpipeline.configurationFiles}
+
+    # Get the information for the pipeline.
+    content = webContent()
+    content.updateCategories(pipelineData)
+    content.updatePipelineInformation(pipelineData, args.arguments)
+
+    # Generate the workflow for the pipeline.
+    workflow = graph.generateWorkflow()
+
+    # Check for required arguments. This check will create required nodes that are unset, but not terminate gkno,
+    # since we are just trying to create pipeline plots.
+    dc.checkRequiredArguments(graph, superpipeline, args, isTerminate = False)
+
+    # Generate the plot.
+    plot.plot(superpipeline, graph, str(superpipeline.pipeline), isReduced = True)
+    sys.stdout.flush()
+    return pipeline, {'information': content.pipelineInformation, 'categories': content.categories, 'files': superpipeline.configurationFiles}
+  except SystemExit as exception:
+    sys.stdout.flush()
+    return pipeline, exception.code
+
 # Define a class for holding information for web content..
 class webContent:
+
+  # The number of processes used to generate the content for the pipelines, unless defined on the command line.
+  numberJobs = multiprocessing.cpu_count()
+
+  # The name of the file in the cache directory holding the content for each pipeline.
+  cacheFilename = 'web-content.json'
+
   def __init__(self):
 
     # Define a dictionary to hold all the categories to which pipelines belong.
@@ -29,6 +74,74 @@ class webContent:
     # Store information on gkno specific arguments.
     self.gknoArguments = {}
 
+  # Generate the information and plots for all of the pipelines. The pipelines are processed in parallel and the
+  # content for each pipeline is added in the order of the pipelines once all pipelines have been processed. If the
+  # configuration files used by a pipeline are unchanged since the content was last generated (and the plot is still
+  # present), the content stored in the cache is used rather than processing the pipeline again.
+  def generatePipelineContent(self, pipelines, buildPipelineFunction, plotGraph, configurationCache, numberJobs = numberJobs):
+    global buildPipeline, plot
+    buildPipeline = buildPipelineFunction
+    plot          = plotGraph
+
+    # Read the content stored in the cache and determine which pipelines need to be processed.
+    cache    = self.readCache(configurationCache)
+    contents = {}
+    for pipeline in pipelines:
+      if pipeline in cache:
+        contentHash = self.getHash(cache[pipeline]['files'], configurationCache)
+        isPlotted   = cache[pipeline]['information'] is None or os.path.exists(pipeline + '.png')
+        if contentHash == cache[pipeline]['hash'] and isPlotted: contents[pipeline] = cache[pipeline]
+    toProcess = [pipeline for pipeline in pipelines if pipeline not in contents]
+
+    # Process the pipelines, using a pool of processes if there are multiple pipelines to process.
+    if len(toProcess) > 1 and numberJobs > 1:
+      pool = Pool(min(numberJobs, len(toProcess)))
+      try: results = pool.map(getPipelineContent, toProcess, chunksize = 1)
+      finally:
+        pool.close()
+        pool.join()
+    else: results = [getPipelineContent(pipeline) for pipeline in toProcess]
+
+    # If the processing of any pipeline failed, terminate with the error code from the first failed pipeline.
+    for pipeline, content in results:
+      if not isinstance(content, dict): exit(content)
+      content['hash']    = self.getHash(content['files'], configurationCache)
+      contents[pipeline] = content
+    self.writeCache(configurationCache, contents)
+
+    # Add the content for each pipeline.
+    for pipeline in pipelines:
+      if contents[pipeline]['information'] is None: continue
+      for category in contents[pipeline]['categories']:
+        for name in contents[pipeline]['categories'][category]:
+          if category not in self.categories: self.categories[str(category)] = [str(name)]
+          else: self.categories[category].append(str(name))
+      for name in contents[pipeline]['information']: self.pipelineInformation[str(name)] = contents[pipeline]['information'][name]
+
+  # Return a hash of the configuration files used by a pipeline. The version of gkno is included, since the content
+  # generated from the configuration files may change between versions. Optional configuration files (e.g. parameter
+  # set files) may not exist, so missing files are included in the hash as missing.
+  def getHash(self, filenames, configurationCache):
+    hashes = [configurationCache.getContentHash(filename) if os.path.exists(filename) else 'missing' for filename in filenames]
+    return configurationCache.version + ':' + ':'.join(hashes)
+
+  # Read the content for each pipeline stored in the cache.
+  def readCache(self, configurationCache):
+    if not configurationCache.isEnabled: return {}
+    try:
+      with open(os.path.join(configurationCache.path, self.cacheFilename)) as filehandle: return json.load(filehandle)
+    except (IOError, OSError, ValueError): return {}
+
+  # Store the content for each pipeline in the cache. If the cache cannot be written, the pipelines will be processed
+  # again when the web content is next generated.
+  def writeCache(self, configurationCache, contents):
+    if not configurationCache.isEnabled: return
+    filename = os.path.join(configurationCache.path, self.cacheFilename)
+    try:
+      with open(filename + '.' + str(os.getpid()), 'w') as filehandle: json.dump(contents, filehandle)
+      os.rename(filename + '.' + str(os.getpid()), filename)
+    except (IOError, OSError): pass
+
   # Update the categories.
   def updateCategories(self, pipelineData):
 
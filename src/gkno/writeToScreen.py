@@ -5,8 +5,6 @@ from __future__ import print_function
 import helpInformation as hi
 import errors as errors
 
-import inspect
-from inspect import currentframe, getframeinfo
 import os
 import sys
 
@@ -65,7 +63,7 @@ def reordered(graph, reorderedLists):
     'another (for example, the two fastq files from paired end sequencing). In constructing the pipeline, ' + \
     'gkno reordered the values supplied to some tasks, outlined below:')
     text.append('\t')
-    for task, nodeId, linkedNodeId, originalList, reorderedList, referenceList in reorderedLists:
+    for task, nodeId, linkedNodeId, originalList, reorderedList, referenceList, ambiguous in reorderedLists:
       longFormArgument = graph.getGraphNodeAttribute(nodeId, 'longFormArgument')
       text.append('-  task: ' + task + ', argument: ' + longFormArgument)
       string = originalList[0]
@@ -77,10 +75,17 @@ def reordered(graph, reorderedLists):
       string = referenceList[0]
       for i in range(1, len(referenceList)): string += ', ' + referenceList[i]
       text.append('\tto match:    ' + string)
+      if ambiguous:
+        string = ambiguous[0][0] + ' with ' + ambiguous[0][1]
+        for value, reference in ambiguous[1:]: string += ', ' + value + ' with ' + reference
+        text.append('\tambiguous:   ' + string)
       text.append('\t')
 
-    text.append('Please check that these files are ordered correctly. To disable reordering of input values, ' + \
-    'include the argument \'--do-not-reorder (-dnr)\' on the command line.')
+    string = 'Please check that these files are ordered correctly. To disable reordering of input values, ' + \
+    'include the argument \'--do-not-reorder (-dnr)\' on the command line.'
+    if [ambiguous for values in reorderedLists for ambiguous in values[6]]:
+      string = 'Values listed as ambiguous could not be paired by name and were paired with the most similar remaining value. ' + string
+    text.append(string)
 
     # Write the warning to screen.
     errors.errors().writeFormattedText(text, 'warning')
@@ -0,0 +1,211 @@
+#!/usr/bin/python
+
+# Regression checks for behaviour of gkno that is not visible in the error code returned by gkno. Each check is run
+# by the test harness as a separate command, and terminates with a non-zero error code if the check fails.
+#
+# Usage: python regression-checks.py <check>
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(root, 'src'))
+import gkno.executor as ex
+import gkno.fingerprint as fp
+import gkno.gknoConfiguration as gc
+import gkno.resourceDownload as rd
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+import syntheticPipelines as sp
+
+# Terminate the check with a failure.
+def fail(text):
+  print('FAILED - ', text, sep = '', file = sys.stdout)
+  exit(1)
+
+# Return the fingerprint for a set of command line arguments.
+def getFingerprint(gknoConfiguration, arguments):
+  fingerprint = fp.fingerprint('version', 'commit')
+  fingerprint.setArguments(arguments, gknoConfiguration)
+  return fingerprint.getFingerprint()
+
+# Check that options that do not affect the makefile are removed from the fingerprint along with their values, and that
+# flags are removed without the argument that follows them.
+def fingerprintArguments():
+  gknoConfiguration = gc.gknoConfiguration(os.path.join(root, 'config_files'))
+  initial           = getFingerprint(gknoConfiguration, ['freebayes', '-ps', 'test', '-dnl', '-dne'])
+  if getFingerprint(gknoConfiguration, ['freebayes', '-ps', 'test', '-re', '-dnl', '-dne', '-nj', '4']) != initial:
+    fail('ignored options changed the fingerprint')
+  if getFingerprint(gknoConfiguration, ['freebayes', '-ps', 'test', '-re', '-mm', '-dnl', '-dne']) == initial:
+    fail('an argument following an ignored flag did not change the fingerprint')
+
+# Check that a rerun pipeline whose inputs are given in a '.list' file reuses the existing makefile, unless the
+# '.list' file has changed, in which case the makefile is regenerated.
+def fingerprintLists():
+  sandbox = tempfile.mkdtemp()
+  try:
+    pipelines, pipeline = sp.getPipelines('lists', dict(sp.defaults, tasks = 1))
+    sp.createSandbox(sandbox, sp.getTools(), pipelines)
+    directory = os.path.join(sandbox, 'run')
+    os.makedirs(directory)
+    for filename in ['a.dat', 'b.dat']: open(os.path.join(directory, filename), 'w').close()
+
+    # Generate the makefile, then rerun the pipeline with the same list and with a changed list.
+    command     = [sys.executable, os.path.join(sandbox, 'src', 'gkno.py'), pipeline, '--in', 'inputs.list', '-dnl', '-dne']
+    environment = dict(os.environ, GKNOCOMMITID = os.getenv('GKNOCOMMITID', 'regression'))
+    for value, arguments, isReused in [('a.dat', [], False), ('a.dat', ['-re'], True), ('b.dat', ['-re'], False)]:
+      with open(os.path.join(directory, 'inputs.list'), 'w') as filehandle: print(value, file = filehandle)
+      process = subprocess.Popen(command + arguments, cwd = directory, env = environment, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+      output  = process.communicate()[0]
+      if process.returncode != 0: fail('gkno terminated with error code ' + str(process.returncode) + '\n' + output)
+      if isReused and 'Pipeline unchanged' not in output: fail('the makefile was not reused for an unchanged list')
+      if not isReused and 'Pipeline unchanged' in output: fail('the makefile was reused when the list was changed to \'' + value + '\'')
+
+    # The regenerated makefile uses the value in the changed list.
+    makefiles = [filename for filename in os.listdir(directory) if filename.endswith('.make')]
+    if len(makefiles) != 1: fail('expected a single makefile, but found ' + str(len(makefiles)))
+    with open(os.path.join(directory, makefiles[0])) as filehandle: makefile = filehandle.read()
+    if '/b.dat ' not in makefile: fail('the regenerated makefile does not use the changed list')
+  finally: shutil.rmtree(sandbox)
+
+# Check that unique nodes in a pipeline that point to nodes in a nested pipeline, which themselves point to nodes in a
+# further nested pipeline, are found. The synthetic benchmark tools and pipelines are written to a sandbox copy of gkno,
+# and the input to the outermost pipeline must reach the first task of the innermost pipeline.
+def nestedUniqueNodes():
+  sandbox = tempfile.mkdtemp()
+  try:
+    pipelines, pipeline = sp.getPipelines('nested', dict(sp.defaults, tasks = 2, depth = 2))
+    sp.createSandbox(sandbox, sp.getTools(), pipelines)
+    directory = os.path.join(sandbox, 'run')
+    os.makedirs(directory)
+    open(os.path.join(directory, 'sample.dat'), 'w').close()
+
+    command     = [sys.executable, os.path.join(sandbox, 'src', 'gkno.py'), pipeline, '--in', 'sample.dat', '-dnl', '-dne']
+    environment = dict(os.environ, GKNOCOMMITID = os.getenv('GKNOCOMMITID', 'regression'))
+    process     = subprocess.Popen(command, cwd = directory, env = environment, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    output      = process.communicate()[0]
+    if process.returncode != 0: fail('gkno terminated with error code ' + str(process.returncode) + '\n' + output)
+
+    # The first task of the innermost pipeline reads the input file.
+    makefiles = [filename for filename in os.listdir(directory) if filename.endswith('.make')]
+    if not makefiles: fail('no makefile was generated')
+    with open(os.path.join(directory, makefiles[0])) as filehandle: makefile = filehandle.read()
+    task   = 'nested.nested.' + sp.getTaskName(0)
+    blocks = [block for block in makefile.split('### ') if block.startswith(task + ' ')]
+    if not blocks or '--in $(PWD)/sample.dat ' not in blocks[0]: fail('the pipeline input was not used by task ' + task)
+  finally: shutil.rmtree(sandbox)
+
+# Check that the native executor expands make variables as make does, including references within references.
+def executorExpansion():
+  executor           = ex.executor()
+  executor.variables = {'PWD' : '/data', 'NAME' : 'PWD'}
+  expected           = [('$(PWD)/a.bam $(UNDEFINED)', '/data/a.bam '), ('$$HOME', '$HOME'), ('$($(NAME))', '/data'),
+                        ('$(shell ls $(PWD) | wc -l)', '$(ls /data | wc -l)'), ('$(shell echo $$(date))', '$(echo $(date))')]
+  for text, value in expected:
+    if executor.expand(text) != value: fail('\'' + text + '\' was expanded to \'' + executor.expand(text) + '\', not \'' + value + '\'')
+
+# Write the executables for the synthetic tools to the sandbox. Each tool copies the input to the output (or the
+# standard input to the standard output). A 'python' executable that always fails is also written, so that scripts
+# used by the makefile must be run with the python interpreter running gkno.
+def writeExecutables(sandbox, tools):
+  os.makedirs(os.path.join(sandbox, 'bin'))
+  for executable in tools.keys() + ['python']:
+    filename = os.path.join(sandbox, 'bin', executable)
+    with open(filename, 'w') as filehandle:
+      print('#!/bin/bash', file = filehandle)
+      if executable == 'python': print('exit 1', file = filehandle)
+      else:
+        print('input=/dev/stdin; output=/dev/stdout', file = filehandle)
+        print('while [ $# -gt 0 ]; do case $1 in --in) input=$2; shift;; --out) output=$2; shift;; esac; shift; done', file = filehandle)
+        print('cat $input > $output', file = filehandle)
+    os.chmod(filename, 0755)
+
+# Execute a synthetic pipeline in the sandbox with the given executor, check that the final output was created and
+# return the directory in which the pipeline was executed.
+def executePipeline(sandbox, name, tasks, executor, arguments):
+  directory = os.path.join(sandbox, executor + '-' + name)
+  os.makedirs(directory)
+  with open(os.path.join(directory, 'sample.dat'), 'w') as filehandle: print('sample', file = filehandle)
+  command     = [sys.executable, os.path.join(sandbox, 'src', 'gkno.py'), 'synthetic-' + name, '--in', 'sample.dat', '-ex', executor, '-nj', '4', '-dnl']
+  environment = dict(os.environ, GKNOCOMMITID = os.getenv('GKNOCOMMITID', 'regression'), PATH = os.path.join(sandbox, 'bin') + ':' + os.environ['PATH'],
+  PWD = directory)
+  process     = subprocess.Popen(command + arguments, cwd = directory, env = environment, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+  output      = process.communicate()[0]
+  text        = 'the pipeline \'' + name + '\' executed with ' + executor
+  if process.returncode != 0: fail(text + ' terminated with error code ' + str(process.returncode) + '\n' + output)
+  if not os.path.isfile(os.path.join(directory, 'sample' + '_p' * tasks + '.dat')): fail(text + ' created no output\n' + output)
+  return directory
+
+# Check that tasks that require multiple job slots are executed by make and by the native executor, both for a single
+# task and for a set of streamed tasks. The synthetic benchmark tools are given threads and memory. The job slots are
+# only acquired in the makefile, so must not appear in the command lines run by the native executor.
+def jobSlots():
+  sandbox = tempfile.mkdtemp()
+  try:
+    tools = sp.getTools()
+    for tool in tools.values(): tool['threads'], tool['memory'] = 2, '1G'
+    pipelines = {}
+    tests     = [('threaded', {'tasks' : 2}), ('streamed', {'tasks' : 3, 'streams' : 2})]
+    for name, parameters in tests: pipelines.update(sp.getPipelines(name, dict(sp.defaults, **parameters))[0])
+    sp.createSandbox(sandbox, tools, pipelines)
+    writeExecutables(sandbox, tools)
+
+    # Execute each pipeline with each executor and a memory budget.
+    for executor in ['make', 'native']:
+      for name, parameters in tests: executePipeline(sandbox, name, parameters['tasks'], executor, ['-mem', '4G'])
+  finally: shutil.rmtree(sandbox)
+
+# Check that the resource usage of each task is recorded in the profile when the tasks are profiled, using make and
+# the native executor.
+def taskProfile():
+  sandbox = tempfile.mkdtemp()
+  try:
+    tools = sp.getTools()
+    sp.createSandbox(sandbox, tools, sp.getPipelines('profiled', dict(sp.defaults, tasks = 2))[0])
+    writeExecutables(sandbox, tools)
+    for executor in ['make', 'native']:
+      directory = executePipeline(sandbox, 'profiled', 2, executor, ['-pt'])
+      profiles  = [filename for filename in os.listdir(directory) if filename.endswith('.profile')]
+      if not profiles: fail('no profile was written using ' + executor)
+      with open(os.path.join(directory, profiles[0])) as filehandle: tasks = [line.split('\t')[0] for line in filehandle if not line.startswith('#')]
+      if sorted(tasks) != [sp.getTaskName(0), sp.getTaskName(1)]: fail('the profile written using ' + executor + ' contains the tasks ' + ', '.join(tasks))
+  finally: shutil.rmtree(sandbox)
+
+# Check that links in a resource tarball are only extracted if they point to locations within the resources directory.
+def resourceLinks():
+  directory = tempfile.mkdtemp()
+  try:
+    os.makedirs(os.path.join(directory, 'resources'))
+    tarballs = [('inside', [('data/a.fa', None, None), ('a.fa', tarfile.SYMTYPE, 'data/a.fa'), ('b.fa', tarfile.LNKTYPE, 'data/a.fa')], True),
+                ('absolute', [('passwd', tarfile.SYMTYPE, '/etc/passwd')], False),
+                ('parent', [('data/up', tarfile.SYMTYPE, '../..')], False),
+                ('hard', [('passwd', tarfile.LNKTYPE, '../passwd')], False),
+                ('through', [('here', tarfile.SYMTYPE, '.'), ('out', tarfile.SYMTYPE, 'here/here/..')], False),
+                ('write', [('data', tarfile.SYMTYPE, '.'), ('data/a.fa', None, None)], False)]
+    for name, members, isValid in tarballs:
+      filename = os.path.join(directory, name + '.tar')
+      tar      = tarfile.open(filename, 'w')
+      for memberName, memberType, linkname in members:
+        member = tarfile.TarInfo(memberName)
+        if memberType: member.type, member.linkname = memberType, linkname
+        tar.addfile(member)
+      tar.close()
+      error = rd.resourceDownload('file://' + filename).extract(os.path.join(directory, 'resources'))
+      if isValid and error: fail('the tarball \'' + name + '\' was not extracted: ' + error)
+      if not isValid and not error: fail('the tarball \'' + name + '\' was extracted')
+    if not os.path.isfile(os.path.join(directory, 'resources', 'a.fa')): fail('the link in the tarball \'inside\' was not extracted')
+  finally: shutil.rmtree(directory)
+
+# The available checks.
+checks = [('fingerprint arguments', fingerprintArguments), ('fingerprint lists', fingerprintLists), ('nested unique nodes', nestedUniqueNodes), ('executor expansion', executorExpansion),
+          ('resource links', resourceLinks), ('job slots', jobSlots), ('task profile', taskProfile)]
+
+if __name__ == '__main__':
+  names = dict([(name.replace(' ', '-'), check) for name, check in checks])
+  if len(sys.argv) != 2 or sys.argv[1] not in names: print('Usage: python regression-checks.py <', '|'.join(sorted(names)), '>', sep = ''); exit(2)
+  names[sys.argv[1]]()
@@ -1,12 +1,28 @@
 #!/usr/bin/python
 
 from __future__ import print_function
+from multiprocessing.pool import ThreadPool
+from xml.etree import ElementTree
 
+import argparse
+import imp
+import json
+import multiprocessing
 import os.path
-import getpass
+import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import time
+
+# Define the location of the test harness. The tests are run in temporary directories, so all paths are defined
+# relative to the test harness, rather than the working directory.
+harnessPath = os.path.dirname(os.path.abspath(__file__))
+
+# The error categories that do not yet have any malformed configuration files to test.
+untestedCategories = ['admin errors', 'command line errors', 'file handling errors', 'graph construction errors', 'argument errors',
+                      'data consistency errors', 'help request errors', 'plotting graph errors', 'makefile generation errors']
 
 class testHarness:
   def __init__(self, errorCode):
@@ -15,10 +31,7 @@ class testHarness:
     self.errorCode = errorCode
 
     # Define the executable.
-    self.executable = '../gkno'
-
-    # Define devnull.
-    self.devnull = open(os.devnull, 'w')
+    self.executable = os.path.join(harnessPath, '..', 'gkno')
 
     # Initialise the number of test successes and failures.
     self.successes = 0
@@ -40,51 +53,86 @@ class testHarness:
       print('    ===========================================', file = sys.stdout)
       for pipeline in self.failures: print('      ', pipeline, file = sys.stdout)
 
+# Define a test case. The command is run in its own temporary directory, into which any required files are
+# copied, and the test succeeds if gkno terminates with the expected error code.
+class testCase:
+  def __init__(self, suite, name, command, errorCode, copyFiles = []):
+    self.suite     = suite
+    self.name      = name
+    self.command   = command
+    self.errorCode = errorCode
+    self.copyFiles = copyFiles
+
+    # The error code returned by gkno, the time taken (in seconds) and the output from gkno.
+    self.returnCode = None
+    self.time       = 0.
+    self.output     = ''
+
+  # Determine if the test succeeded.
+  def isSuccess(self):
+    return self.returnCode == self.errorCode
+
 # Test harness for gkno. Runs over a host of malformed configuration files and checks
 # that all errors are handled. In addition, all pipelines are executed using the 'test'
-# parameter set using files in the tutorial resources bundle.
+# parameter set using files in the tutorial resources bundle. The tests are run in
+# parallel, each in its own temporary directory.
 def main():
+  parser = argparse.ArgumentParser(description = 'Execute the gkno test harness.')
+  parser.add_argument('-j', '--jobs', type = int, default = multiprocessing.cpu_count(), help = 'The number of tests to run in parallel.')
+  parser.add_argument('--junit', help = 'Write a JUnit XML report of the tests to this file.')
+  parser.add_argument('--json', help = 'Write a JSON report of the tests to this file.')
+  options = parser.parse_args()
+
   print(file = sys.stdout)
   print('============================', file = sys.stdout)
   print('Executing gkno test harness.', file = sys.stdout)
   print('============================', file = sys.stdout)
 
-  # Get a list of all files/directories that should not be deleted.
-  keep, copyFiles = getRequiredFiles()
-
-  # Test all of the included pipelines.
-  testPipelines(keep, copyFiles)
+  # Determine the files that need to be copied for each pipeline.
+  copyFiles = getRequiredFiles()
 
-  # Check that help messages can be requested.
-  testCommands(0, 'gkno help errors', helpCommands(), keep)
+  # Define the suites of tests. First, test all of the included pipelines and check that help
+  # messages can be requested.
+  suites = []
+  suites.append(('defined pipelines', testPipelines(copyFiles)))
+  suites.append(('gkno help errors', testCommands('gkno help errors', helpCommands())))
 
   # Test all of the predefined pipeline configuration files. These fall into a range of
   # different test cases.
-  testErrorCase(2, 'admin errors', keep)
-  testErrorCase(3, 'command line errors', keep)
-  testErrorCase(4, 'file handling errors', keep)
-  testErrorCase(5, 'general configuration file errors', keep)
-  testErrorCase(6, 'tool configuration file errors', keep)
-  testErrorCase(7, 'pipeline configuration file errors', keep)
-  testErrorCase(8, 'graph construction errors', keep)
-  testErrorCase(9, 'argument errors', keep)
-  testCommands(10, 'malformed command line errors', userCommands(), keep)
-  testErrorCase(10, 'data consistency errors', keep)
-  testErrorCase(11, 'help request errors', keep)
-  testErrorCase(12, 'plotting graph errors', keep)
-  testErrorCase(13, 'makefile generation errors', keep)
-
-# Read the keep-files.txt file and store a list of files/directories that should not be deleted.
-# In addition, read the copy-files.txt file and determine the files that need to be copied to the
-# test harness before each task. Ensure that these files exist prior to executing the tests.
+  suites.append(('admin errors', testErrorCase(2, 'admin errors')))
+  suites.append(('command line errors', testErrorCase(3, 'command line errors')))
+  suites.append(('file handling errors', testErrorCase(4, 'file handling errors')))
+  suites.append(('general configuration file errors', testErrorCase(5, 'general configuration file errors')))
+  suites.append(('tool configuration file errors', testErrorCase(6, 'tool configuration file errors')))
+  suites.append(('pipeline configuration file errors', testErrorCase(7, 'pipeline configuration file errors')))
+  suites.append(('graph construction errors', testErrorCase(8, 'graph construction errors')))
+  suites.append(('argument errors', testErrorCase(9, 'argument errors')))
+  suites.append(('malformed command line errors', testCommands('malformed command line errors', userCommands())))
+  suites.append(('data consistency errors', testErrorCase(10, 'data consistency errors')))
+  suites.append(('help request errors', testErrorCase(11, 'help request errors')))
+  suites.append(('plotting graph errors', testErrorCase(12, 'plotting graph errors')))
+  suites.append(('makefile generation errors', testErrorCase(13, 'makefile generation errors')))
+
+  # Run the regression checks for behaviour that is not visible in the error code returned by gkno.
+  suites.append(('regression checks', testCommands('regression checks', regressionCommands())))
+
+  # Run the tests and write the reports.
+  start    = time.time()
+  failures = runTests(suites, max(options.jobs, 1))
+  elapsed  = time.time() - start
+  if options.junit: writeJUnitReport(options.junit, suites, elapsed)
+  if options.json: writeJsonReport(options.json, suites, elapsed)
+
+  # Terminate with a non-zero exit code if any of the tests failed.
+  if failures: exit(1)
+
+# Read the copy-files.txt file and determine the files that need to be copied to the test
+# harness before each task. Ensure that these files exist prior to executing the tests.
 def getRequiredFiles():
-  filehandle   = open('keep-list.txt')
   isTerminate  = False
-  keep         = []
-  resourcePath = os.path.abspath(os.getcwd() + '/../resources/tutorial/current') + '/'
-  for line in filehandle.readlines(): keep.append(line.rstrip('\n'))
+  resourcePath = os.path.abspath(os.path.join(harnessPath, '..', 'resources', 'tutorial', 'current')) + '/'
 
-  filehandle = open('copy-files.txt')
+  filehandle = open(os.path.join(harnessPath, 'copy-files.txt'))
   copy       = {}
   for line in filehandle.readlines():
     task  = line.split(':')[0].replace('"', '').replace(' ', '')
@@ -102,105 +150,41 @@ def getRequiredFiles():
     print('Ensure all files in copy-files.txt are in the resources directory.')
     exit(1)
 
-  return keep, copy
+  return copy
 
 # Loop over all of the pipelines included with gkno and check that they all execute when provided
 # with the test parameter set.
-def testPipelines(keep, copy):
-
-  # Define a test class.
-  harness = testHarness(0)
-
-  # Print to screen the tests being performed.
-  print(file = sys.stdout)
-  print('Testing defined pipelines...', file = sys.stdout)
-  sys.stdout.flush()
-
-  # Loop over all defined pipelines.
-  for filename in os.listdir('../config_files/pipes'):
+def testPipelines(copy):
+  executable = testHarness(0).executable
+  tests      = []
+  for filename in sorted(os.listdir(os.path.join(harnessPath, '..', 'config_files', 'pipes'))):
     if filename.endswith('.json') and not filename.endswith('parameter-sets.json'):
       pipeline = filename.rsplit('.json')[0]
-      print('\t', pipeline, '...', sep = '', end = '', file = sys.stdout)
-      sys.stdout.flush()
-
-      # Copy across any necessary files.
-      copyFiles(copy, pipeline)
-
-      # Execute the command.
-      command  = harness.executable + ' ' + pipeline + ' -ps test'
-      success  = subprocess.call(command.split(), stdout = harness.devnull, stderr = harness.devnull)
-      if success == harness.errorCode:
-        harness.successes += 1
-        print('succeeded.', file = sys.stdout)
-        sys.stdout.flush()
-      else:
-        harness.failures.append(str(pipeline + '. Command: '  + command))
-        print('failed.', file = sys.stdout)
-        sys.stdout.flush()
-
-      # Delete created files.
-      deleteFiles(keep)
-
-  # Print the results.
-  harness.printResults()
-
-# Copy across necessary files.
-def copyFiles(copy, pipeline):
-  if pipeline in copy:
-    for filename in copy[pipeline]: shutil.copy(filename, '.')
-
-# Check help messages.
-def testCommands(code, text, commands, keep):
-
-  # Get the gkno executable.
-  harness = testHarness(code)
-
-  # Print to screen the tests being performed.
-  print(file = sys.stdout)
-  print('Testing \'' + text + '\'...', end = '', file = sys.stdout)
-  sys.stdout.flush()
-
-  # Loop over all the commands and test them.
-  for name, command, code in commands:
-    success = subprocess.call(command.split(), stdout = harness.devnull, stderr = harness.devnull)
-    if success == code: harness.successes += 1
-    else: harness.failures.append(str(name + '. Command: ' + command))
-
-    # Delete created files.
-    deleteFiles(keep)
-
-  # Print the results.
-  print('complete.', file = sys.stdout)
-  sys.stdout.flush()
-  harness.printResults()
-
-# Check all instances of error and ensure that gkno terminates with the correct error code.
-def testErrorCase(code, text, keep):
-
-  # Define a test class.
-  harness = testHarness(code)
-  path    = './' + text.replace(' ', '-')
-
-  # Print to screen the tests being performed.
-  print(file = sys.stdout)
-  print('Testing \'' + text + '\'...', end = '', file = sys.stdout)
-  sys.stdout.flush()
-
-  # Loop over all the malformed configuration files.
-  for filename in os.listdir(path):
+      tests.append(testCase('defined pipelines', pipeline, executable + ' ' + pipeline + ' -ps test', 0, copy.get(pipeline, [])))
+
+  return tests
+
+# Define the tests for a list of commands.
+def testCommands(text, commands):
+  return [testCase(text, name, command, code) for name, command, code in commands]
+
+# Check all instances of error and ensure that gkno terminates with the correct error code. Only the
+# categories listed in untestedCategories can have no directory of malformed configuration files. If the
+# directory for any other category is missing, a failing test is returned, so that the missing tests are
+# not silently ignored.
+def testErrorCase(code, text):
+  executable = testHarness(code).executable
+  path       = os.path.join(harnessPath, text.replace(' ', '-'))
+  if not os.path.isdir(path):
+    if text in untestedCategories: return []
+    return [testCase(text, 'missing directory', 'test -d ' + path, 0)]
+
+  tests = []
+  for filename in sorted(os.listdir(path)):
     pipeline = filename.rsplit('.json')[0]
-    command  = harness.executable + ' ' + pipeline + ' -dnl -ps test -cp ' + path
-    success  = subprocess.call(command.split(), stdout = harness.devnull, stderr = harness.devnull)
-    if success == harness.errorCode: harness.successes += 1
-    else: harness.failures.append(str(pipeline + '. Command: '  + command))
-
-    # Delete created files.
-    deleteFiles(keep)
+    tests.append(testCase(text, pipeline, executable + ' ' + pipeline + ' -dnl -ps test -cp ' + path, code))
 
-  # Print the results.
-  print('complete.', file = sys.stdout)
-  sys.stdout.flush()
-  harness.printResults()
+  return tests
 
 # Get commands for testing gkno help.
 def helpCommands():
@@ -243,12 +227,104 @@ def userCommands():
 
   return commands
 
-# Delete all created files.
-def deleteFiles(keep):
-  for filename in os.listdir('.'):
-    if filename not in keep and not filename.startswith('.'):
-      if os.path.isfile(filename): os.remove(filename)
-      elif os.path.isdir(filename): shutil.rmtree(filename)
+# Get the commands for running each of the regression checks.
+def regressionCommands():
+  filename = os.path.join(harnessPath, 'regression-checks.py')
+  checks   = imp.load_source('regressionChecks', filename).checks
+
+  return [(name, sys.executable + ' ' + filename + ' ' + name.replace(' ', '-'), 0) for name, check in checks]
+
+# Run a test in a temporary directory, recording the error code, the time taken and the output from
+# gkno. The directory, along with any created files, is deleted once the test is complete.
+def runTest(test):
+  directory = tempfile.mkdtemp(prefix = 'gkno-test.')
+  try:
+    for filename in test.copyFiles: shutil.copy(filename, directory)
+    start   = time.time()
+    process = subprocess.Popen(test.command.split(), cwd = directory, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    test.output     = process.communicate()[0]
+    test.returnCode = process.returncode
+    test.time       = time.time() - start
+  except OSError as exception:
+    test.output = str(exception)
+  finally: shutil.rmtree(directory, ignore_errors = True)
+
+  return test
+
+# Run all of the tests using a pool of workers. The results are printed in the order that the
+# suites and tests were defined, as each test completes. Return the number of failed tests.
+def runTests(suites, jobs):
+  pool    = ThreadPool(jobs)
+  results = pool.imap(runTest, [test for text, tests in suites for test in tests])
+  try:
+    failures = 0
+    for text, tests in suites:
+      harness = testHarness(None)
+
+      # Print to screen the tests being performed.
+      print(file = sys.stdout)
+      print('Testing \'' + text + '\'...', file = sys.stdout)
+      sys.stdout.flush()
+
+      # Print the result of each test as it completes.
+      for i in range(len(tests)):
+        test = results.next()
+        if test.isSuccess():
+          harness.successes += 1
+          print('\t', test.name, '...succeeded (', formatTime(test.time), ').', sep = '', file = sys.stdout)
+        else:
+          harness.failures.append(str(test.name + '. Command: ' + test.command))
+          print('\t', test.name, '...failed (', formatTime(test.time), ').', sep = '', file = sys.stdout)
+        sys.stdout.flush()
+
+      # Print the results.
+      harness.printResults()
+      failures += len(harness.failures)
+  finally:
+    pool.terminate()
+    pool.join()
+
+  return failures
+
+# Format a time in seconds.
+def formatTime(seconds):
+  return '%.2fs' % seconds
+
+# Return the output from gkno as text that can be included in a report. Any characters that are
+# not valid in XML (e.g. terminal control characters) are removed.
+def getReportText(output):
+  return re.sub(u'[^\u0009\u000a\u000d\u0020-\ud7ff\ue000-\ufffd]', '', output.decode('utf-8', 'replace'))
+
+# Write a JUnit XML report of the tests, with a test suite for each of the test cases.
+def writeJUnitReport(filename, suites, elapsed):
+  allTests = [test for text, tests in suites for test in tests]
+  root     = ElementTree.Element('testsuites', name = 'gkno', tests = str(len(allTests)), time = '%.3f' % elapsed,
+  failures = str(len([test for test in allTests if not test.isSuccess()])))
+  for text, tests in suites:
+    suite = ElementTree.SubElement(root, 'testsuite', name = text, tests = str(len(tests)), time = '%.3f' % sum([test.time for test in tests]),
+    failures = str(len([test for test in tests if not test.isSuccess()])))
+    for test in tests:
+      case = ElementTree.SubElement(suite, 'testcase', classname = 'gkno.' + text.replace(' ', '-'), name = test.name, time = '%.3f' % test.time)
+      if not test.isSuccess():
+        message         = 'Expected error code ' + str(test.errorCode) + ', but gkno terminated with ' + str(test.returnCode) + '. Command: ' + test.command
+        failure         = ElementTree.SubElement(case, 'failure', message = message)
+        failure.text    = getReportText(test.output)
+  ElementTree.ElementTree(root).write(filename, encoding = 'utf-8', xml_declaration = True)
+
+# Write a JSON report of the tests. The output from gkno is only included for failed tests.
+def writeJsonReport(filename, suites, elapsed):
+  allTests = [test for text, tests in suites for test in tests]
+  report   = {'tests' : len(allTests), 'failures' : len([test for test in allTests if not test.isSuccess()]), 'time' : elapsed, 'suites' : []}
+  for text, tests in suites:
+    suite = {'name' : text, 'tests' : len(tests), 'failures' : len([test for test in tests if not test.isSuccess()]), 'time' : sum([test.time for test in tests]),
+    'testcases' : []}
+    for test in tests:
+      case = {'name' : test.name, 'command' : test.command, 'expectedCode' : test.errorCode, 'returnCode' : test.returnCode, 'success' : test.isSuccess(),
+      'time' : test.time}
+      if not test.isSuccess(): case['output'] = getReportText(test.output)
+      suite['testcases'].append(case)
+    report['suites'].append(suite)
+  with open(filename, 'w') as filehandle: json.dump(report, filehandle, indent = 2, separators = (',', ': '), sort_keys = True)
 
 if __name__ == "__main__":
   main()